@@ -3,6 +3,11 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+This is the preferred entry point: the AI-backed career views are async,
+so one process can hold many concurrent LLM generations, e.g.
+
+    uvicorn backend.asgi:application --workers 2
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
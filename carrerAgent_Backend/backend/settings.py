@@ -16,7 +16,8 @@ import os
 from dotenv import load_dotenv
 load_dotenv()  # ensures .env is loaded before we access keys
 
-HUGGINGFACE_API_KEY = os.environ["HF_TOKEN"]
+# Only the "hf" LLM backend needs it (see LLM_BACKEND below)
+HUGGINGFACE_API_KEY = os.environ.get("HF_TOKEN", "")
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     # Third-party
     'rest_framework',
     'rest_framework_simplejwt',
+    'adrf',
     'corsheaders',
 
     # Local apps
@@ -93,6 +95,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+# The AI-backed career views are async; serve them with an ASGI server
+# (e.g. `uvicorn backend.asgi:application`, see README.md and
+# requirements.txt) to get real concurrency.
+ASGI_APPLICATION = 'backend.asgi.application'
+
 # JWT Settings
 from datetime import timedelta
 
@@ -112,6 +119,131 @@ DATABASES = {
     }
 }
 
+# LLM response cache (career/llm_cache.py)
+# Tier 1 is a per-process LRU, tier 2 the shared LLMCacheEntry table.
+LLM_CACHE = {
+    'ENABLED': True,
+    'MEMORY_MAX_ENTRIES': 512,
+    'MEMORY_TTL': 60 * 60,
+    'DB_MAX_ENTRIES': 10000,
+    'DB_TTL': 7 * 24 * 60 * 60,
+    'DB_EVICT_EVERY': 50,
+}
+
+# Single-flight coalescing of identical roadmap generations / scrapes
+# (career/singleflight.py). Set LOCK_DIR to a path shared by all workers
+# on the host to coalesce across processes as well as threads.
+SINGLEFLIGHT = {
+    'LOCK_DIR': os.getenv('SINGLEFLIGHT_LOCK_DIR'),
+    'LOCK_TIMEOUT': 120,
+}
+
+# Roadmap reference refresh (career/references.py,
+# `manage.py refresh_references [--loop]`). Times are in seconds.
+REFERENCE_REFRESH = {
+    'INTERVAL': 7 * 24 * 60 * 60,
+    'RETRY_DELAY': 60 * 60,
+    'WORKERS': 4,
+    'POLL_INTERVAL': 5 * 60,
+}
+
+# roadmap.sh scraper (career/scraper.py): pooled session, timeouts and
+# a gzip response cache so re-scrapes go conditional (ETag / 304).
+SCRAPER = {
+    'BASE_URL': 'https://roadmap.sh',
+    'CONNECT_TIMEOUT': 5,
+    'READ_TIMEOUT': 15,
+    'POOL_MAXSIZE': 16,
+    'CACHE_DIR': BASE_DIR / '.scrape_cache',
+    'CACHE_TTL': 60 * 60,
+}
+
+# Roadmap version storage (career/deltas.py): versions are stored as
+# step-level deltas against their parent, with a full snapshot at
+# least every SNAPSHOT_EVERY versions to bound read cost.
+ROADMAP_STORAGE = {
+    'SNAPSHOT_EVERY': 10,
+    'MAX_DELTA_RATIO': 0.5,
+}
+
+# Shared mock-interview question bank (career/question_bank.py)
+QUESTION_BANK = {
+    'TARGET_SIZE': 50,
+    'LOW_WATER': 25,
+    'BATCH_SIZE': 25,
+    'SAMPLE_SIZE': 10,
+    'BACKGROUND_TOPUP': True,
+}
+
+# Batch step explanations (career/artifacts.py): packed prompts or
+# parallel calls, and optional background prefetch after each save.
+EXPLAIN = {
+    'MODE': 'packed',
+    'CONCURRENCY': 4,
+    'PACK_SIZE': 4,
+    'PREFETCH': False,
+}
+
+# Background generation jobs (career/jobs.py): ?async=true on preview,
+# regenerate and chat queues the work in the GenerationJob table.
+# Jobs are run by `python manage.py run_jobs --workers N`. For local
+# development (DEBUG) each web process also starts EMBEDDED_WORKERS
+# threads on its first submit; under gunicorn/uvicorn that is
+# EMBEDDED_WORKERS x web workers hidden pollers, and their running
+# jobs die with the process (to be retried after LEASE), so it is
+# off unless DEBUG or JOBS_EMBEDDED_WORKERS is set.
+JOBS = {
+    'WORKERS': 2,
+    'EMBEDDED_WORKERS': int(os.environ.get('JOBS_EMBEDDED_WORKERS', 2 if DEBUG else 0)),
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 5,
+    'LEASE': 10 * 60,
+}
+
+# Career name resolution (career/names.py, references.resolve_reference):
+# spellings share one RoadmapReference; typos fall back to a trigram
+# match, which is stored as a CareerAlias when it scores ALIAS_THRESHOLD.
+# `python manage.py bench_career_lookup` measures lookup latency.
+CAREER_NAMES = {
+    'FUZZY_THRESHOLD': 0.6,
+    'TOKEN_THRESHOLD': 0.4,
+    'FUZZY_MARGIN': 0.1,
+    'LEARN_ALIASES': True,
+    'ALIAS_THRESHOLD': 0.8,
+}
+
+# Roadmap chat context (career/chat_context.py): roadmaps larger than
+# BUDGET characters are sent as the message's relevant steps in full
+# plus a short outline of the rest. LOG logs the context size of
+# each turn to the "career.chat_context" logger.
+CHAT_CONTEXT = {
+    'BUDGET': 4000,
+    'OUTLINE_CHARS': 48,
+    'LOG': True,
+}
+
+# The career app logs to the console (INFO and up).
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'career': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+# LLM backend (career/llm.py): "hf" (HuggingFace router), "fake"
+# (local canned JSON, for offline runs / CI / benchmarks), "record"
+# (hf + save fixtures to FIXTURE_DIR) or "replay" (fixtures only).
+LLM_BACKEND = {
+    'BACKEND': os.environ.get('LLM_BACKEND', 'hf'),
+    'FAKE_LATENCY': float(os.environ.get('LLM_FAKE_LATENCY', 0.0)),
+    'FAKE_JITTER': float(os.environ.get('LLM_FAKE_JITTER', 0.0)),
+    'FAKE_ERROR_RATE': float(os.environ.get('LLM_FAKE_ERROR_RATE', 0.0)),
+}
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 
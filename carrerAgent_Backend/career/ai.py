@@ -1,51 +1,124 @@
 # ai.py
-import os
 import json
-from openai import OpenAI
+from asgiref.sync import sync_to_async
 
-
-# ============================================================
-# Initialize HuggingFace Router Client
-# ============================================================
-client = OpenAI(
-    base_url="https://router.huggingface.co/v1",
-    api_key=os.getenv("HF_TOKEN"),
-)
+from .chat_context import build_context, log_context
+from .llm import get_backend
+from .llm_cache import llm_cache, make_cache_key
+from .parsing import IncrementalJSONParser, extract_steps, is_step_key, parse_json_lenient
+from .patches import resolve_chat_answer
 
 
 # ============================================================
 # Utility: Safe JSON Parse
+# Tolerates fences, trailing garbage and max_tokens truncation
+# (see parsing.py) before giving up on the structure.
 # ============================================================
 def safe_json(text):
+    parsed = parse_json_lenient(text)
+    if isinstance(parsed, dict):
+        return parsed
+
+    # Fallback into a generic structure
+    return {"steps": {"Step 1": text}}
+
+
+def is_valid_json(text):
     try:
-        return json.loads(text)
+        json.loads(text)
+        return True
     except Exception:
-        # Fallback into a generic structure
-        return {"steps": {"Step 1": text}}
+        return False
+
+
+# ============================================================
+# Cached Chat Completion
+# The model is reached through the configured backend (llm.py):
+# HuggingFace router, or the local fake / fixtures offline.
+# use_cache=False skips the lookup (fresh answer) but still
+# stores the new result for later callers.
+# Only parseable JSON is cached so bad outputs aren't replayed.
+# ============================================================
+def _cache_key(backend, messages, max_tokens, temperature):
+    # Keyed on the backend's model: fake answers never mix with real ones
+    return make_cache_key(
+        backend.model, messages, max_tokens=max_tokens, temperature=temperature
+    )
+
+
+def chat_completion(messages, max_tokens, temperature, use_cache=True):
+    backend = get_backend()
+    key = _cache_key(backend, messages, max_tokens, temperature)
+
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    output = backend.complete(messages, max_tokens, temperature)
+
+    if is_valid_json(output.strip()):
+        llm_cache.set(key, backend.model, output)
+
+    return output
+
+
+async def achat_completion(messages, max_tokens, temperature, use_cache=True):
+    backend = get_backend()
+    key = _cache_key(backend, messages, max_tokens, temperature)
+
+    if use_cache:
+        cached = await sync_to_async(llm_cache.get)(key)
+        if cached is not None:
+            return cached
+
+    output = await backend.acomplete(messages, max_tokens, temperature)
+
+    if is_valid_json(output.strip()):
+        await sync_to_async(llm_cache.set)(key, backend.model, output)
+
+    return output
 
 
 # ============================================================
 # Generic AI JSON Response Caller
 # Used by:
 #   - weekly plan
-#   - step explainer
+#   - step explainer (single, packed batches)
 #   - skill gap analysis
-#   - mock interview
+#   - mock interview question bank
 #   - roadmap chat wrapper
 # ============================================================
-def generate_ai_response(prompt):
+def build_response_messages(prompt):
+    return [
+        {"role": "system", "content": "Return strictly valid JSON. No markdown, no ```."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_ai_response(prompt, use_cache=True, max_tokens=800):
     try:
-        completion = client.chat.completions.create(
-            model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
-            messages=[
-                {"role": "system", "content": "Return strictly valid JSON. No markdown, no ```."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=800,
+        output = chat_completion(
+            messages=build_response_messages(prompt),
+            max_tokens=max_tokens,
             temperature=0.6,
+            use_cache=use_cache,
         )
+        return safe_json(output)
+
+    except Exception as e:
+        print("AI Error:", e)
+        return {"error": "AI generation failed", "details": str(e)}
+
 
-        output = completion.choices[0].message.content
+async def agenerate_ai_response(prompt, use_cache=True, max_tokens=800):
+    try:
+        output = await achat_completion(
+            messages=build_response_messages(prompt),
+            max_tokens=max_tokens,
+            temperature=0.6,
+            use_cache=use_cache,
+        )
         return safe_json(output)
 
     except Exception as e:
@@ -57,18 +130,7 @@ def generate_ai_response(prompt):
 # ============================================================
 # Roadmap Generator (Core)
 # ============================================================
-def generate_ai_roadmap(user_id, career_name, reference_content=None, preferences={}):
-    """
-    Generate a personalized roadmap using LLaMA 4 model.
-    MUST return ONLY:
-    {
-        "steps": {
-            "Step 1": "...",
-            "Step 2": "..."
-        }
-    }
-    """
-
+def build_roadmap_messages(career_name, reference_content=None, preferences={}):
     # Prepare reference text
     if reference_content:
         steps_text = json.dumps(reference_content.get("steps", {}))
@@ -107,80 +169,173 @@ def generate_ai_roadmap(user_id, career_name, reference_content=None, preference
         "{ \"steps\": { \"Step 1\": \"...\", \"Step 2\": \"...\" } }"
     )
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def parse_roadmap(ai_message, parsed=None):
+    # Parse JSON safely, keeping every complete step of a cut-off answer
+    if parsed is None:
+        parsed = parse_json_lenient(ai_message)
+
+    steps = extract_steps(parsed)
+    if steps:
+        return {"steps": steps}
+
+    print("❌ JSON decode failed, returning fallback")
+    return {"steps": {"Step 1": ai_message}}
+
+
+GENERATION_FAILED = "AI generation failed, try again."
+
+
+def generation_failed(roadmap_dict):
+    """True for the placeholder roadmap returned when the LLM call errored."""
+    return roadmap_dict.get("steps") == {"Step 1": GENERATION_FAILED}
+
+
+def generate_ai_roadmap(user_id, career_name, reference_content=None, preferences={}, use_cache=True):
+    """
+    Generate a personalized roadmap using LLaMA 4 model.
+    MUST return ONLY:
+    {
+        "steps": {
+            "Step 1": "...",
+            "Step 2": "..."
+        }
+    }
+    """
+    try:
+        ai_message = chat_completion(
+            messages=build_roadmap_messages(career_name, reference_content, preferences),
+            max_tokens=700,
+            temperature=0.6,
+            use_cache=use_cache,
+        ).strip()
+
+        return parse_roadmap(ai_message)
+
+    except Exception as e:
+        print("❌ LLM backend error:", e)
+        return {"steps": {"Step 1": GENERATION_FAILED}}
+
+
+async def agenerate_ai_roadmap(user_id, career_name, reference_content=None, preferences={}, use_cache=True):
+    """Async twin of generate_ai_roadmap (same prompt, cache and fallback)."""
     try:
-        completion = client.chat.completions.create(
-            model="meta-llama/Llama-4-Scout-17B-16E-Instruct",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+        ai_message = (await achat_completion(
+            messages=build_roadmap_messages(career_name, reference_content, preferences),
             max_tokens=700,
             temperature=0.6,
-        )
+            use_cache=use_cache,
+        )).strip()
+
+        return parse_roadmap(ai_message)
+
+    except Exception as e:
+        print("❌ LLM backend error:", e)
+        return {"steps": {"Step 1": GENERATION_FAILED}}
+
+
 
-        ai_message = completion.choices[0].message.content.strip()
+# ============================================================
+# Streaming Roadmap Generator (SSE preview)
+# Yields ("step", name, text) as soon as each "Step N" value is
+# fully received, then ("done", None, roadmap_dict).
+# ============================================================
+async def areplay_roadmap(roadmap_dict):
+    """Stream events for a roadmap that is already complete."""
+    for name, text in roadmap_dict.get("steps", {}).items():
+        yield ("step", name, text)
+    yield ("done", None, roadmap_dict)
+
+
+async def astream_ai_roadmap(career_name, reference_content=None, preferences={}, use_cache=True):
+    messages = build_roadmap_messages(career_name, reference_content, preferences)
+    backend = get_backend()
+    key = _cache_key(backend, messages, 700, 0.6)
 
-        # Parse JSON safely
-        try:
-            roadmap_dict = json.loads(ai_message)
-        except Exception:
-            print("❌ JSON decode failed, returning fallback")
-            roadmap_dict = {"steps": {"Step 1": ai_message}}
+    # Cache hit: replay every step immediately
+    if use_cache:
+        cached = await sync_to_async(llm_cache.get)(key)
+        if cached is not None:
+            async for event in areplay_roadmap(parse_roadmap(cached.strip())):
+                yield event
+            return
 
-        return roadmap_dict
+    buffer = ""
+    parser = IncrementalJSONParser()
+
+    try:
+        async for delta in backend.astream(messages, 700, 0.6):
+            buffer += delta
+            for name, value in parser.feed(delta):
+                if is_step_key(name) and isinstance(value, str):
+                    yield ("step", name, value)
 
     except Exception as e:
-        print("❌ Hugging Face API error:", e)
-        return {"steps": {"Step 1": "AI generation failed, try again."}}
+        print("❌ LLM backend error:", e)
+        if not buffer:
+            yield ("done", None, {"steps": {"Step 1": GENERATION_FAILED}})
+            return
+
+    output = buffer.strip()
+    if is_valid_json(output):
+        await sync_to_async(llm_cache.set)(key, backend.model, output)
+
+    roadmap_dict = parse_roadmap(output, parsed=parser.result())
+    yield ("done", None, roadmap_dict)
 
 
 
 # ============================================================
 # CHAT MODEL — Modify roadmap dynamically
 # ============================================================
-def roadmap_chat_ai(user_message, roadmap, preferences):
-    """
-    Chat mode for the split-screen UI.
-    Two possible outputs:
+ABBREVIATED_NOTE = (
+    'Steps ending in "..." are abbreviated: refer to them by name, '
+    'never copy their text into a patch.'
+)
 
-    1️⃣ Normal chat:
-        {
-            "message": "answer..."
-        }
 
-    2️⃣ Roadmap update request:
-        {
-            "message": "I updated the roadmap.",
-            "updated_roadmap": {
-                "Step 1": "...",
-                "Step 2": "..."
-            }
-        }
-    """
+def build_chat_prompt(user_message, roadmap, preferences):
+    # Long roadmaps: only the steps relevant to the message in full (chat_context.py)
+    context, abbreviated = build_context(user_message, roadmap)
+    log_context(roadmap, context, abbreviated)
+
+    roadmap_section = json.dumps(context)
+    if abbreviated:
+        roadmap_section += f"\n\n{ABBREVIATED_NOTE}"
 
-    prompt = f"""
+    return f"""
 You are an AI Roadmap Mentor.
 
 User is chatting about their roadmap.
 
 Your tasks:
 1. Answer questions clearly.
-2. If user REQUESTS CHANGES, update the roadmap.
+2. If user REQUESTS CHANGES, return a patch: only the step operations needed.
 3. If NOT, return a normal message.
 
 STRICT RULES:
 - Always return valid JSON ONLY.
 - No markdown.
 - No ```.
+- Never repeat steps you don't change.
 
 If updating roadmap, respond ONLY as:
 {{
   "message": "<your explanation>",
-  "updated_roadmap": {{
-      "Step 1": "...",
-      "Step 2": "..."
-  }}
+  "patch": [
+      {{"op": "replace", "step": "Step 2", "text": "<new text for Step 2>"}},
+      {{"op": "insert", "after": "Step 3", "text": "<text of the new step>"}},
+      {{"op": "delete", "step": "Step 5"}},
+      {{"op": "reorder", "order": ["Step 1", "Step 3", "Step 2"]}}
+  ]
 }}
+Step names always mean the CURRENT roadmap below; steps are
+renumbered for you. Insert with "after": null to add a first step.
 
 If NOT updating:
 {{
@@ -192,11 +347,41 @@ User message:
 {user_message}
 
 Current roadmap:
-{json.dumps(roadmap)}
+{roadmap_section}
 
 User preferences:
 {json.dumps(preferences)}
 ------------------------------------
 """
 
-    return generate_ai_response(prompt)
+
+def roadmap_chat_ai(user_message, roadmap, preferences, use_cache=True):
+    """
+    Chat mode for the split-screen UI.
+    Two possible outputs:
+
+    1️⃣ Normal chat:
+        {
+            "message": "answer..."
+        }
+
+    2️⃣ Roadmap update request:
+        {
+            "message": "I updated the roadmap.",
+            "updated_roadmap": {
+                "Step 1": "...",
+                "Step 2": "..."
+            }
+        }
+
+    The model only returns a patch of step operations; the complete
+    updated_roadmap is built here from it (patches.py).
+    """
+    prompt = build_chat_prompt(user_message, roadmap, preferences)
+    return resolve_chat_answer(generate_ai_response(prompt, use_cache=use_cache), roadmap)
+
+
+async def aroadmap_chat_ai(user_message, roadmap, preferences, use_cache=True):
+    """Async twin of roadmap_chat_ai."""
+    prompt = build_chat_prompt(user_message, roadmap, preferences)
+    return resolve_chat_answer(await agenerate_ai_response(prompt, use_cache=use_cache), roadmap)
@@ -0,0 +1,276 @@
+# artifacts.py
+import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+
+from .ai import agenerate_ai_response
+from .models import CareerRoadmap, DerivedArtifact
+from .singleflight import SingleFlight
+
+
+# ============================================================
+# Prompts for the derived views (skill gap, weekly plan, step explainer)
+# ============================================================
+def skill_gap_prompt(roadmap, args):
+    return f"""
+        Given this roadmap:
+        {json.dumps(roadmap.roadmap)}
+
+        And user skills (preferences):
+        {json.dumps(roadmap.preferences)}
+
+        Return JSON:
+        {{
+            "missing_skills": [],
+            "priority_skills": [],
+            "suggestions": ""
+        }}
+        """
+
+
+def weekly_plan_prompt(roadmap, args):
+    return f"""
+        Convert this roadmap:
+        {json.dumps(roadmap.roadmap)}
+
+        Into a 6-week learning plan.
+
+        Return JSON:
+        {{
+            "week_1": [],
+            "week_2": [],
+            "week_3": [],
+            "week_4": [],
+            "week_5": [],
+            "week_6": []
+        }}
+        """
+
+
+def explain_step_prompt(roadmap, args):
+    step = args["step"]
+    return f"""
+        Explain this step in detail:
+        {step}: {roadmap.roadmap.get(step)}
+
+        Provide examples, resources.
+        JSON only:
+        {{
+            "explanation": "",
+            "resources": [],
+            "examples": []
+        }}
+        """
+
+
+# kind -> (prompt builder, keys a usable answer has at least one of)
+ARTIFACTS = {
+    "skill_gap": (skill_gap_prompt, ("missing_skills", "priority_skills", "suggestions")),
+    "weekly_plan": (weekly_plan_prompt, ("week_1",)),
+    "explain_step": (explain_step_prompt, ("explanation",)),
+}
+
+
+# ============================================================
+# Per-version artifact store
+#
+# Keyed on (roadmap, hash of the inputs the prompts read, kind,
+# hash of the args). Editing a version in place changes the content
+# hash, so an old artifact can never be served for new content;
+# ApplyChatUpdateView also deletes them outright on overwrite.
+# ============================================================
+def _digest(value):
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def content_hash(roadmap):
+    return _digest({
+        "career_name": roadmap.career_name,
+        "roadmap": roadmap.roadmap,
+        "preferences": roadmap.preferences,
+    })
+
+
+def is_usable(kind, result):
+    expected = ARTIFACTS[kind][1]
+    return isinstance(result, dict) and "error" not in result and any(k in result for k in expected)
+
+
+def artifact_key(roadmap, kind, args, digest=None):
+    return {
+        "roadmap": roadmap,
+        "kind": kind,
+        "content_hash": digest or content_hash(roadmap),
+        "args_hash": _digest(args),
+    }
+
+
+async def astore_artifact(key, args, result):
+    # Failures and unparseable answers are returned but never stored
+    if not is_usable(key["kind"], result):
+        return
+    try:
+        await DerivedArtifact.objects.aupdate_or_create(
+            **key, defaults={"args": args, "result": result}
+        )
+    except IntegrityError:
+        pass  # a concurrent request stored it first
+
+
+async def agenerate_artifact(roadmap, kind, args, key, refresh=False):
+    build_prompt = ARTIFACTS[kind][0]
+    result = await agenerate_ai_response(build_prompt(roadmap, args), use_cache=not refresh)
+    await astore_artifact(key, args, result)
+    return result
+
+
+async def aget_artifact(roadmap, kind, args=None, refresh=False):
+    """
+    Stored artifact for this version, or generate + store it.
+    `roadmap` must have its steps loaded (aload_roadmap()).
+    `refresh=True` regenerates, bypassing the LLM response cache too.
+    """
+    args = args or {}
+    key = artifact_key(roadmap, kind, args)
+
+    if not refresh:
+        stored = await DerivedArtifact.objects.filter(**key).values_list("result", flat=True).afirst()
+        if stored is not None:
+            return stored
+
+    return await agenerate_artifact(roadmap, kind, args, key, refresh)
+
+
+def invalidate_artifacts(roadmap):
+    DerivedArtifact.objects.filter(roadmap=roadmap).delete()
+
+
+# ============================================================
+# Batch step explanations
+#
+# Steps already explained for this version come from one query.
+# The rest are either packed several to a prompt ("packed": fewer,
+# longer LLM calls) or fanned out one call per step ("parallel"),
+# both capped at EXPLAIN["CONCURRENCY"] calls in flight. Every
+# answer is stored as a regular explain_step artifact, so a later
+# single-step click is a store hit.
+# ============================================================
+EXPLAIN_DEFAULTS = {
+    "MODE": "packed",        # packed | parallel
+    "CONCURRENCY": 4,        # LLM calls in flight per batch
+    "PACK_SIZE": 4,          # steps per packed prompt
+    "TOKENS_PER_STEP": 350,  # max_tokens budget per packed step
+    "PREFETCH": False,       # explain every step in the background after a save
+}
+EXPLAIN_MODES = ("packed", "parallel")
+
+prefetch_flight = SingleFlight("explain_prefetch")
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="explain-prefetch")
+
+
+def explain_config():
+    config = dict(EXPLAIN_DEFAULTS)
+    config.update(getattr(settings, "EXPLAIN", {}))
+    return config
+
+
+def packed_explain_prompt(roadmap, steps):
+    return f"""
+        Explain each of these roadmap steps in detail:
+        {json.dumps({step: roadmap.roadmap.get(step) for step in steps})}
+
+        Provide examples, resources for every step.
+        JSON only, one entry per step name:
+        {{
+            "<step name>": {{
+                "explanation": "",
+                "resources": [],
+                "examples": []
+            }}
+        }}
+        """
+
+
+async def _aexplain_packed(roadmap, steps, digest, refresh):
+    prompt = packed_explain_prompt(roadmap, steps)
+    answer = await agenerate_ai_response(
+        prompt,
+        use_cache=not refresh,
+        max_tokens=explain_config()["TOKENS_PER_STEP"] * len(steps) + 200,
+    )
+
+    results = {}
+    for step in steps:
+        result = answer.get(step) if isinstance(answer, dict) else None
+        if is_usable("explain_step", result):
+            args = {"step": step}
+            await astore_artifact(artifact_key(roadmap, "explain_step", args, digest), args, result)
+            results[step] = result
+    return results
+
+
+async def aexplain_steps(roadmap, steps, mode=None, refresh=False):
+    """
+    {step: explanation} for `steps` of a version whose steps are loaded.
+    Steps a packed answer left out are retried one call each.
+    """
+    config = explain_config()
+    mode = mode or config["MODE"]
+    digest = content_hash(roadmap)
+    keys = {step: artifact_key(roadmap, "explain_step", {"step": step}, digest) for step in steps}
+
+    results = {}
+    if not refresh:
+        stored = DerivedArtifact.objects.filter(
+            roadmap=roadmap, kind="explain_step", content_hash=digest,
+            args_hash__in=[key["args_hash"] for key in keys.values()],
+        ).values_list("args", "result")
+        async for args, result in stored:
+            results[args["step"]] = result
+
+    missing = [step for step in steps if step not in results]
+    semaphore = asyncio.Semaphore(config["CONCURRENCY"])
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    if mode == "packed" and missing:
+        size = config["PACK_SIZE"]
+        packs = [missing[i:i + size] for i in range(0, len(missing), size)]
+        for answer in await asyncio.gather(*(
+            limited(_aexplain_packed(roadmap, pack, digest, refresh)) for pack in packs
+        )):
+            results.update(answer)
+        missing = [step for step in missing if step not in results]
+
+    answers = await asyncio.gather(*(
+        limited(agenerate_artifact(roadmap, "explain_step", {"step": step}, keys[step], refresh))
+        for step in missing
+    ))
+    results.update(zip(missing, answers))
+
+    return {step: results[step] for step in steps}
+
+
+def _prefetch(roadmap_id):
+    try:
+        roadmap = CareerRoadmap.objects.get(pk=roadmap_id)
+        steps = list(roadmap.roadmap or {})
+        prefetch_flight.do(str(roadmap_id), async_to_sync(aexplain_steps), roadmap, steps)
+    except Exception as e:
+        print("Explain prefetch error:", e)
+    finally:
+        close_old_connections()
+
+
+def schedule_prefetch(roadmap, force=False):
+    """Explain every step of a just-saved version in the background."""
+    if (force or explain_config()["PREFETCH"]) and not prefetch_flight.in_flight(str(roadmap.pk)):
+        _prefetch_pool.submit(_prefetch, roadmap.pk)
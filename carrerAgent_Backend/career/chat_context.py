@@ -0,0 +1,186 @@
+# chat_context.py
+import json
+import logging
+import math
+import re
+
+from django.conf import settings
+
+
+# ============================================================
+# Relevance-pruned roadmap context for chat turns
+#
+# A chat message usually concerns a few steps, yet every turn used
+# to send the whole roadmap. When the roadmap JSON is larger than
+# CHAT_CONTEXT["BUDGET"] characters, the steps the message refers to
+# ("step 4", "steps 2-5") or shares keywords with are sent in full
+# and every other step as a short outline, all within the budget.
+#
+# Chat edits come back as step patches (patches.py), which name the
+# abbreviated steps instead of copying them. A model that still sends
+# a full updated_roadmap may write "UNCHANGED: Step N" or echo an
+# outline (possibly under a new step number after an insert);
+# expand_update() puts the original text back.
+# Roadmaps under the budget are sent whole.
+# ============================================================
+DEFAULTS = {
+    "BUDGET": 4000,         # max characters of roadmap JSON per chat prompt
+    "OUTLINE_CHARS": 48,    # text kept of a step that isn't relevant
+    "LOG": True,            # log the prompt context size per turn
+}
+
+logger = logging.getLogger(__name__)
+
+UNCHANGED = "UNCHANGED"
+ELLIPSIS = "..."
+
+STOPWORDS = frozenset("""
+    a about add after all also an and any are as at be before but by can could do does for from
+    how i if in into is it its make me more my need of on or please remove should so step steps
+    than that the their them then there this to too update want what when where which why will
+    with would you your
+""".split())
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_SEPARATOR = r"\s*(,|and|&|or|-|–|to|through)\s*(?:steps?\s*)?"
+_STEP_REF_RE = re.compile(rf"\bsteps?\s*(\d+(?:{_SEPARATOR}\d+)*)", re.I)
+_RANGE_WORDS = ("-", "–", "to", "through")
+_UNCHANGED_RE = re.compile(rf"^\s*{UNCHANGED}\s*(?:[:(\-]\s*(.+?)\)?)?\s*$", re.I)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "CHAT_CONTEXT", {}))
+    return config
+
+
+def _size(value):
+    return len(json.dumps(value))
+
+
+def _words(text):
+    return {word for word in _WORD_RE.findall(str(text).lower()) if len(word) > 2 and word not in STOPWORDS}
+
+
+def referenced_steps(message, roadmap):
+    """Step names the message points at by number ("step 4", "steps 2-5", "step 3 and 7")."""
+    referenced = []
+    for match in _STEP_REF_RE.finditer(message or ""):
+        parts = re.split(_SEPARATOR, match.group(1), flags=re.I)
+        numbers = [int(parts[0])]
+        for separator, number in zip(parts[1::2], parts[2::2]):
+            number = int(number)
+            if separator.lower() in _RANGE_WORDS:
+                numbers.extend(range(numbers[-1] + 1, min(number, numbers[-1] + len(roadmap)) + 1))
+            else:
+                numbers.append(number)
+
+        for number in numbers:
+            name = f"Step {number}"
+            if name in roadmap and name not in referenced:
+                referenced.append(name)
+    return referenced
+
+
+def rank_steps(message, roadmap):
+    """Steps by relevance to the message: referenced first, then by IDF-weighted keyword overlap."""
+    referenced = referenced_steps(message, roadmap)
+    query = _words(message)
+
+    step_words = {step: _words(f"{step} {text}") for step, text in roadmap.items()}
+    frequency = {}
+    for words in step_words.values():
+        for word in words & query:
+            frequency[word] = frequency.get(word, 0) + 1
+
+    scores = {
+        step: sum(math.log(1 + len(roadmap) / frequency[word]) for word in words & query)
+        for step, words in step_words.items()
+        if step not in referenced
+    }
+    matched = sorted((step for step, score in scores.items() if score > 0), key=lambda s: -scores[s])
+    return referenced + matched
+
+
+def _outline(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit].rstrip() + ELLIPSIS
+
+
+def build_context(message, roadmap, budget=None):
+    """
+    (roadmap JSON for the prompt, abbreviated step names).
+    Nothing is abbreviated when the whole roadmap fits the budget.
+    """
+    config = get_config()
+    budget = budget or config["BUDGET"]
+    if not isinstance(roadmap, dict) or _size(roadmap) <= budget:
+        return roadmap, []
+
+    # Relevant steps first, in full, as long as the other steps still
+    # fit as bare names; then the longest outlines that stay in budget
+    full = set()
+    used = _size({step: ELLIPSIS for step in roadmap})
+    for step in rank_steps(message, roadmap):
+        extra = _size(roadmap[step]) - _size(ELLIPSIS)
+        if used + extra <= budget:
+            full.add(step)
+            used += extra
+
+    limit = config["OUTLINE_CHARS"]
+    while True:
+        context = {step: text if step in full else _outline(text, limit) for step, text in roadmap.items()}
+        if _size(context) <= budget or limit == 0:
+            break
+        limit //= 2
+
+    abbreviated = [step for step in roadmap if context[step] != roadmap[step]]
+    return context, abbreviated
+
+
+def _is_outline_of(text, original):
+    if not isinstance(text, str) or not text.endswith(ELLIPSIS) or original is None:
+        return False
+    return " ".join(str(original).split()).startswith(text[:-len(ELLIPSIS)].rstrip())
+
+
+def _outline_source(text, step, roadmap):
+    """
+    Original step an echoed outline came from: the step of the same
+    name if it matches, else the only original step it matches.
+    Steps move when the model inserts or deletes around them.
+    """
+    if _is_outline_of(text, roadmap.get(step)):
+        return step
+    matches = [name for name, original in roadmap.items() if _is_outline_of(text, original)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def expand_update(result, roadmap):
+    """Replace "UNCHANGED[: Step N]" values of an updated_roadmap with the original step text."""
+    updated = result.get("updated_roadmap") if isinstance(result, dict) else None
+    if not isinstance(updated, dict):
+        return result
+
+    expanded = {}
+    for step, text in updated.items():
+        match = _UNCHANGED_RE.match(text) if isinstance(text, str) else None
+        source = (match.group(1) or step).strip() if match else None
+        if source is not None and source in roadmap:
+            text = roadmap[source]
+        else:
+            # The model echoed an outline back, maybe under a new number
+            source = _outline_source(text, step, roadmap)
+            if source is not None:
+                text = roadmap[source]
+        expanded[step] = text
+
+    return {**result, "updated_roadmap": expanded}
+
+
+def log_context(roadmap, context, abbreviated):
+    if get_config()["LOG"]:
+        logger.info(
+            "Chat context: %d/%d chars, %d/%d steps in full",
+            _size(context), _size(roadmap), len(roadmap) - len(abbreviated), len(roadmap),
+        )
@@ -0,0 +1,185 @@
+# crawler.py
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RoadmapReference
+from .names import career_key
+from .references import next_refresh_at, reference_fields
+from .scraper import ScrapeError, fetch_roadmap, roadmap_url
+
+
+# ============================================================
+# Per-host rate limiter
+# Spaces request starts to at most `rate` per second per host,
+# shared by every crawler thread.
+# ============================================================
+class HostRateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def is_retryable(error):
+    if isinstance(error, ScrapeError):
+        return error.status is None or error.status == 429 or error.status >= 500
+    return True  # timeouts, connection resets, DNS hiccups
+
+
+# ============================================================
+# Crawl one career with retry + exponential backoff (jittered)
+# ============================================================
+def crawl_one(career_name, limiter, retries=3, backoff=1.0, etag=None, last_modified=None):
+    host = urlsplit(roadmap_url(career_name)).netloc
+    attempts = 0
+
+    while True:
+        attempts += 1
+        limiter.wait(host)
+        try:
+            scraped = fetch_roadmap(career_name, etag=etag, last_modified=last_modified)
+            return {"career": career_name, "ok": True, "scraped": scraped, "attempts": attempts}
+
+        except Exception as e:
+            if attempts > retries or not is_retryable(e):
+                return {"career": career_name, "ok": False, "error": str(e), "attempts": attempts}
+
+            delay = backoff * (2 ** (attempts - 1))
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def crawl(careers, workers=8, rate=2.0, retries=3, backoff=1.0, refresh_existing=True):
+    """
+    Scrape many careers concurrently and bulk-write RoadmapReference.
+    Returns a report dict (counts, throughput, failures).
+    """
+    started = time.perf_counter()
+    # One scrape per career, however many spellings of it were passed
+    unique = {}
+    for career in careers:
+        if career and career_key(career):
+            unique.setdefault(career_key(career), career.strip())
+    careers = list(unique.values())
+
+    existing = {
+        ref.name_key: ref
+        for ref in RoadmapReference.objects
+        .filter(name_key__in=[career_key(c) for c in careers])
+        .order_by("-id")
+    }
+    if not refresh_existing:
+        careers = [c for c in careers if career_key(c) not in existing]
+
+    limiter = HostRateLimiter(rate)
+    results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for career in careers:
+            ref = existing.get(career_key(career))
+            futures.append(pool.submit(
+                crawl_one, career, limiter, retries, backoff,
+                etag=(ref.etag or None) if ref else None,
+                last_modified=(ref.last_modified or None) if ref else None,
+            ))
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    written = write_results(results, existing)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requested": len(careers),
+        "created": written["created"],
+        "updated": written["updated"],
+        "not_modified": written["not_modified"],
+        "failed": [
+            {"career": r["career"], "error": r["error"], "attempts": r["attempts"]}
+            for r in results if not r["ok"]
+        ],
+        "retries": sum(r["attempts"] - 1 for r in results),
+        "elapsed_s": round(elapsed, 3),
+        "careers_per_s": round(len(careers) / elapsed, 2) if elapsed else 0,
+    }
+
+
+UPDATE_FIELDS = ["content", "source_url", "etag", "last_modified", "auto_refresh_at", "last_updated"]
+
+
+def _insert(to_create, to_update, batch_size):
+    """Insert new references; returns how many rows were actually written."""
+    try:
+        with transaction.atomic():
+            RoadmapReference.objects.bulk_create(to_create, batch_size=batch_size)
+        return len(to_create)
+    except IntegrityError:
+        pass
+
+    # Some were stored meanwhile (another crawl, a request-time scrape):
+    # insert row by row and update the ones that lost the race
+    created = 0
+    for new in to_create:
+        fields = {field: getattr(new, field) for field in UPDATE_FIELDS if field != "last_updated"}
+        try:
+            with transaction.atomic():
+                RoadmapReference.objects.create(name=new.name, **fields)
+            created += 1
+        except IntegrityError:
+            ref = RoadmapReference.objects.get(name_key=new.name_key)
+            for field, value in fields.items():
+                setattr(ref, field, value)
+            ref.last_updated = timezone.now()
+            to_update.append(ref)
+    return created
+
+
+def write_results(results, existing, batch_size=500):
+    now = timezone.now()
+    to_create, to_update, not_modified = [], [], []
+
+    for r in results:
+        if not r["ok"]:
+            continue
+
+        ref = existing.get(career_key(r["career"]))
+        scraped = r["scraped"]
+
+        if scraped.get("not_modified"):
+            ref.auto_refresh_at = next_refresh_at()
+            not_modified.append(ref)
+            continue
+
+        fields = reference_fields(r["career"], scraped)
+        if ref is None:
+            # bulk_create skips save(), which fills name_key
+            to_create.append(RoadmapReference(name=r["career"], name_key=career_key(r["career"]), **fields))
+        else:
+            for field, value in fields.items():
+                setattr(ref, field, value)
+            ref.last_updated = now  # auto_now isn't applied by bulk_update
+            to_update.append(ref)
+
+    created = _insert(to_create, to_update, batch_size)
+    RoadmapReference.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=batch_size)
+    RoadmapReference.objects.bulk_update(not_modified, ["auto_refresh_at"], batch_size=batch_size)
+
+    return {"created": created, "updated": len(to_update), "not_modified": len(not_modified)}
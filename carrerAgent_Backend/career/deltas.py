@@ -0,0 +1,80 @@
+# deltas.py
+import json
+
+from django.conf import settings
+
+
+# ============================================================
+# Step-level roadmap deltas
+#
+# A roadmap is an ordered {step_name: text} dict. A version that
+# only differs from its parent in a few steps is stored as:
+#
+#   {"set": {step: text}, "del": [step, ...], "order": [step, ...]}
+#
+# "set" holds changed/added steps, "del" removed ones and "order"
+# is only present when the key order can't be derived from the
+# parent (reordering, or insertions before the last step).
+# ============================================================
+DEFAULTS = {
+    "SNAPSHOT_EVERY": 10,   # a full snapshot at least every N versions of a chain
+    "MAX_DELTA_RATIO": 0.5, # store a snapshot if the delta isn't this much smaller
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "ROADMAP_STORAGE", {}))
+    return config
+
+
+def make_delta(old, new):
+    old = old or {}
+    new = new or {}
+
+    delta = {
+        "set": {k: v for k, v in new.items() if k not in old or old[k] != v},
+        "del": [k for k in old if k not in new],
+    }
+
+    if list(apply_delta(old, delta)) != list(new):
+        delta["order"] = list(new)
+
+    return {k: v for k, v in delta.items() if v}
+
+
+def apply_delta(old, delta):
+    result = {k: v for k, v in (old or {}).items() if k not in delta.get("del", ())}
+    result.update(delta.get("set", {}))
+
+    order = delta.get("order")
+    if order:
+        result = {k: result[k] for k in order}
+    return result
+
+
+def encoded_size(value):
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def worth_storing(delta, content):
+    """True if `delta` is small enough, relative to the full content, to store instead."""
+    return encoded_size(delta) < encoded_size(content) * get_config()["MAX_DELTA_RATIO"]
+
+
+def rebuild(target_id, rows):
+    """
+    Reconstruct the content of `target_id` from `rows`: {id: row} dicts
+    with "snapshot", "delta" and "delta_parent_id", covering the target's
+    chain back to its snapshot.
+    """
+    deltas = []
+    row = rows[target_id]
+    while row["snapshot"] is None:
+        deltas.append(row["delta"])
+        row = rows[row["delta_parent_id"]]
+
+    content = row["snapshot"]
+    for delta in reversed(deltas):
+        content = apply_delta(content, delta)
+    return content
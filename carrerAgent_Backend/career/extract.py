@@ -0,0 +1,83 @@
+# extract.py
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:  # optional: fall back to the stdlib parser
+    HTML_PARSER = "html.parser"
+
+
+# ============================================================
+# Targeted roadmap extraction
+#
+# Instead of building a tree for the whole page and taking every
+# <li> (nav menus and footer links included), only the content
+# containers are parsed (SoupStrainer), with lxml when available,
+# and only list items outside navigation chrome are kept (a group
+# <li> contributes its own title, its nested items count once).
+# ============================================================
+CONTENT_TAGS = ["main", "article"]
+CHROME_TAGS = {"nav", "header", "footer", "aside", "menu"}
+CHROME_ROLES = {"navigation", "banner", "contentinfo", "menu", "menubar"}
+
+MIN_STEP_LENGTH = 2  # "Go", "C#" are real topics
+
+
+def _is_chrome(node, stop):
+    for parent in node.parents:
+        if parent is stop:
+            return False
+        if parent.name in CHROME_TAGS or parent.get("role") in CHROME_ROLES:
+            return True
+    return False
+
+
+def _own_text(node):
+    """Text of an <li> without its nested lists (those are steps of their own)."""
+    if node.find("li") is None:
+        return node.get_text(" ", strip=True)
+
+    parts = []
+    for child in node.children:
+        if getattr(child, "name", None) in ("ul", "ol"):
+            continue
+        text = child.get_text(" ", strip=True) if hasattr(child, "get_text") else child.strip()
+        if text:
+            parts.append(text)
+    return " ".join(parts)
+
+
+def _collect_steps(root):
+    steps = []
+    seen = set()
+
+    for node in root.find_all("li"):
+        if _is_chrome(node, root):
+            continue
+
+        text = _own_text(node)
+        if len(text) < MIN_STEP_LENGTH or text in seen:
+            continue
+
+        seen.add(text)
+        steps.append(text)
+
+    return steps
+
+
+def extract_steps_from_html(html, parser=None):
+    """Return the roadmap step texts from a roadmap.sh page, in document order."""
+    parser = parser or HTML_PARSER
+
+    content = BeautifulSoup(html, parser, parse_only=SoupStrainer(CONTENT_TAGS))
+    steps = _collect_steps(content)
+    if steps:
+        return steps
+
+    # No <main>/<article> (or nothing in them): strain to list containers
+    # and skip the chrome by ancestry instead.
+    lists = BeautifulSoup(
+        html, parser, parse_only=SoupStrainer(["ul", "ol"] + sorted(CHROME_TAGS))
+    )
+    return _collect_steps(lists)
@@ -0,0 +1,67 @@
+# http_cache.py
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+# ============================================================
+# Small on-disk, gzip-compressed HTTP response cache
+#
+# One file per URL holding the body plus its validators
+# (ETag / Last-Modified), so re-scrapes can go conditional
+# and tests can replay pages without touching the network.
+# ============================================================
+class ResponseCache:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json.gz")
+
+    def get(self, url):
+        try:
+            with gzip.open(self._path(url), "rt", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, url, body, etag=None, last_modified=None):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+
+        # Write-then-rename so concurrent readers never see half a file;
+        # each writer (thread or process) gets its own temp file
+        path = self._path(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return entry
+
+    def touch(self, url):
+        """Mark an entry fresh again after a 304."""
+        entry = self.get(url)
+        if entry is not None:
+            self.set(url, entry["body"], entry.get("etag"), entry.get("last_modified"))
+        return entry
+
+    @staticmethod
+    def is_fresh(entry, ttl):
+        return bool(entry) and ttl > 0 and time.time() - entry["fetched_at"] < ttl
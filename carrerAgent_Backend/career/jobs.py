@@ -0,0 +1,313 @@
+# jobs.py
+import hashlib
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ai import generate_ai_roadmap, generation_failed, roadmap_chat_ai
+from .artifacts import schedule_prefetch
+from .models import CareerRoadmap, GenerationJob
+from .payloads import chat_payload, preview_payload, regenerate_payload
+from .names import career_key
+from .references import generation_name, get_or_scrape_reference, resolve_reference
+from .singleflight import canonical_key, roadmap_flight, scrape_flight
+from .versions import create_version
+
+
+# ============================================================
+# Background generation jobs
+#
+# Slow LLM work (preview, regenerate, chat) can be queued instead
+# of run inside the request: the endpoint answers 202 with a job id
+# and the client polls jobs/<id>/. Jobs live in the GenerationJob
+# table and are run by `manage.py run_jobs` worker threads (for
+# local development, also embedded in the web process with
+# EMBEDDED_WORKERS). No broker.
+#
+#   - claiming is a compare-and-swap UPDATE on status, so any number
+#     of workers / processes can poll the same table
+#   - a failed attempt is re-queued with exponential backoff until
+#     max_attempts (a permanent error, e.g. the roadmap was deleted,
+#     fails at once); a worker that died mid-job loses its lease
+#   - an identical live request (same user, kind, params) returns
+#     the existing job instead of queueing a second one
+# ============================================================
+DEFAULTS = {
+    "WORKERS": 2,               # threads for `manage.py run_jobs`
+    "EMBEDDED_WORKERS": 0,      # threads started inside each web process (0: off, use run_jobs)
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 5,         # seconds, doubled per failed attempt
+    "LEASE": 10 * 60,           # a running job older than this is re-queued
+    "POLL_INTERVAL": 1.0,       # idle worker sleep
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "JOBS", {}))
+    return config
+
+
+class JobError(Exception):
+    """A job attempt failed; retried until max_attempts."""
+
+
+# Retrying these can't succeed: the job fails on the first attempt
+PERMANENT_ERRORS = (ObjectDoesNotExist,)
+
+
+# ============================================================
+# Handlers: job.params -> response body
+# ============================================================
+def run_preview(job):
+    params = job.params
+    career_name = params["career_name"]
+    preferences = params.get("preferences", {})
+
+    reference = resolve_reference(career_name)
+    if not reference:
+        try:
+            reference = scrape_flight.do(canonical_key(career_key(career_name)), get_or_scrape_reference, career_name)
+        except Exception:
+            reference = None
+
+    ai_output = roadmap_flight.do(
+        canonical_key(career_key(career_name), preferences),
+        generate_ai_roadmap,
+        user_id=job.user_id,
+        career_name=generation_name(career_name, reference),
+        reference_content=reference.content if reference else None,
+        preferences=preferences,
+        use_cache=params.get("use_cache", True),
+    )
+    if generation_failed(ai_output):
+        raise JobError("AI generation failed")
+
+    return preview_payload(job.user_id, career_name, ai_output.get("steps", {}), reference)
+
+
+def run_regenerate(job):
+    old = CareerRoadmap.objects.get(pk=job.params["roadmap_id"], user_id=job.user_id, is_deleted=False)
+    preferences = job.params.get("preferences", {})
+
+    new_data = generate_ai_roadmap(
+        user_id=job.user_id,
+        career_name=old.career_name,
+        reference_content=old.reference.content if old.reference else None,
+        preferences=preferences,
+        use_cache=False  # regenerate must never replay a cached roadmap
+    )
+    if generation_failed(new_data):
+        raise JobError("AI generation failed")
+
+    new_steps = new_data.get("steps", {})
+    new_entry = create_version(
+        user=old.user,
+        career_name=old.career_name,
+        roadmap=new_steps,
+        preferences=preferences,
+        reference=old.reference,
+        progress={step: "not_started" for step in new_steps.keys()},
+        parent=old,
+    )
+    schedule_prefetch(new_entry, force=job.params.get("prefetch", False))
+    return regenerate_payload(new_entry)
+
+
+def run_chat(job):
+    roadmap = CareerRoadmap.objects.get(pk=job.params["roadmap_id"], user_id=job.user_id, is_deleted=False)
+
+    ai_response = roadmap_chat_ai(
+        user_message=job.params.get("message"),
+        roadmap=roadmap.roadmap,
+        preferences=roadmap.preferences
+    )
+    if "error" in ai_response:
+        raise JobError(ai_response["error"])
+
+    return chat_payload(ai_response)
+
+
+HANDLERS = {
+    "preview": run_preview,
+    "regenerate": run_regenerate,
+    "chat": run_chat,
+}
+
+
+# ============================================================
+# Queue
+# ============================================================
+def dedupe_key(user_id, kind, params):
+    return hashlib.sha256(canonical_key(user_id, kind, params).encode("utf-8")).hexdigest()
+
+
+def submit_job(user, kind, params):
+    """Queue a job, or return the identical one already queued / running."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    key = dedupe_key(user.id, kind, params)
+    live = GenerationJob.objects.filter(dedupe_key=key, status__in=[GenerationJob.QUEUED, GenerationJob.RUNNING])
+
+    job = live.first()
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = GenerationJob.objects.create(
+                    user=user,
+                    kind=kind,
+                    params=params,
+                    dedupe_key=key,
+                    max_attempts=get_config()["MAX_ATTEMPTS"],
+                    run_after=timezone.now(),
+                )
+        except IntegrityError:
+            job = live.first()  # a concurrent identical submit won
+
+    ensure_embedded_workers()
+    return job
+
+
+def claim_next(worker_id):
+    """Take the next runnable job (CAS on status), or None."""
+    now = timezone.now()
+    candidates = list(
+        GenerationJob.objects
+        .filter(status=GenerationJob.QUEUED, run_after__lte=now)
+        .order_by("run_after")
+        .values_list("id", flat=True)[:10]
+    )
+
+    for pk in candidates:
+        claimed = GenerationJob.objects.filter(pk=pk, status=GenerationJob.QUEUED).update(
+            status=GenerationJob.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return GenerationJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    try:
+        result = HANDLERS[job.kind](job)
+    except Exception as e:
+        print(f"Job {job.id} ({job.kind}) attempt {job.attempts} error:", e)
+        finish_failed_attempt(job, e)
+        return False
+
+    GenerationJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=GenerationJob.SUCCEEDED,
+        result=result,
+        error="",
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def finish_failed_attempt(job, error):
+    now = timezone.now()
+    if job.attempts < job.max_attempts and not isinstance(error, PERMANENT_ERRORS):
+        delay = get_config()["RETRY_BACKOFF"] * (2 ** (job.attempts - 1))
+        fields = {"status": GenerationJob.QUEUED, "run_after": now + timedelta(seconds=delay)}
+    else:
+        fields = {"status": GenerationJob.FAILED, "finished_at": now}
+
+    GenerationJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        error=str(error) or error.__class__.__name__, updated_at=now, **fields
+    )
+
+
+def requeue_expired():
+    """Give the job of a worker that died (or hung) past its lease to another worker."""
+    cutoff = timezone.now() - timedelta(seconds=get_config()["LEASE"])
+    expired = GenerationJob.objects.filter(status=GenerationJob.RUNNING, locked_at__lt=cutoff)
+
+    requeued = expired.filter(attempts__lt=F("max_attempts")).update(
+        status=GenerationJob.QUEUED, locked_by="", run_after=timezone.now(), error="Lease expired"
+    )
+    expired.update(status=GenerationJob.FAILED, finished_at=timezone.now(), error="Lease expired")
+    return requeued
+
+
+def run_pending(worker_id=None, limit=None):
+    """Run runnable jobs in this thread until none are left; returns how many ran."""
+    worker_id = worker_id or default_worker_id()
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_next(worker_id)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+# ============================================================
+# Worker threads
+# ============================================================
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+class WorkerPool:
+    def __init__(self, size, poll_interval=None):
+        self.size = size
+        self.poll_interval = poll_interval or get_config()["POLL_INTERVAL"]
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.size):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self):
+        worker_id = default_worker_id()
+        while not self._stop.is_set():
+            try:
+                requeue_expired()
+                ran = run_pending(worker_id, limit=1)
+            except Exception as e:
+                print("Job worker error:", e)
+                ran = 0
+            finally:
+                close_old_connections()
+
+            if not ran:
+                self._stop.wait(self.poll_interval)
+
+
+_embedded = None
+_embedded_lock = threading.Lock()
+
+
+def ensure_embedded_workers():
+    """Start this process's worker threads on first submit (EMBEDDED_WORKERS > 0)."""
+    global _embedded
+    size = get_config()["EMBEDDED_WORKERS"]
+    if not size or _embedded is not None:
+        return
+
+    with _embedded_lock:
+        if _embedded is None:
+            _embedded = WorkerPool(size).start()
@@ -0,0 +1,116 @@
+# lineage.py
+from django.db.models import Q
+
+from .deltas import apply_delta
+from .models import CareerRoadmap
+
+
+# ============================================================
+# Version lineage
+#
+# Every version carries the id of its lineage's first version
+# (`root`), so the whole tree is read in one query and ancestors /
+# descendants are walked in memory: two queries at any depth.
+# Soft-deleted versions are left out unless asked for; their
+# children hang from the nearest version that is still there.
+# ============================================================
+NODE_FIELDS = (
+    "id", "career_name", "version", "parent_id", "is_deleted", "created_at",
+    "progress_total", "progress_completed",
+)
+STORAGE_VALUES = ("snapshot", "delta", "delta_parent_id")
+
+
+def _contents(rows):
+    """Rebuild every row's steps from the tree itself (deltas point at parents)."""
+    cache = {}
+
+    def content(pk):
+        if pk not in cache:
+            row = rows.get(pk)
+            if row is None:  # delta parent outside this tree
+                cache[pk] = CareerRoadmap.objects.get(pk=pk).load_roadmap()
+            elif row["snapshot"] is not None:
+                cache[pk] = row["snapshot"]
+            else:
+                cache[pk] = apply_delta(content(row["delta_parent_id"]), row["delta"])
+        return cache[pk]
+
+    return {pk: content(pk) for pk in rows}
+
+
+def _skip_deleted(rows):
+    """Live rows only, each parent_id pointing at its nearest live ancestor."""
+    live = {}
+    for pk, row in rows.items():
+        if row["is_deleted"]:
+            continue
+        parent_id = row["parent_id"]
+        while parent_id in rows and rows[parent_id]["is_deleted"]:
+            parent_id = rows[parent_id]["parent_id"]
+        live[pk] = {**row, "parent_id": parent_id}
+    return live
+
+
+def version_lineage(roadmap_id, user, include_roadmap=False, include_deleted=False):
+    """
+    {"roadmap_id", "root_id", "ancestors": [root ... parent],
+     "node": {..., "children": [...]}} or None if not the user's
+    (or deleted, unless include_deleted).
+    """
+    target = CareerRoadmap.objects.filter(pk=roadmap_id, user=user)
+    if not include_deleted:
+        target = target.filter(is_deleted=False)
+    target = target.values("id", "root_id").first()
+    if target is None:
+        return None
+
+    root_id = target["root_id"] or target["id"]
+    fields = NODE_FIELDS + (STORAGE_VALUES if include_roadmap else ())
+    rows = {
+        row["id"]: row
+        for row in CareerRoadmap.objects
+        .filter(Q(pk=root_id) | Q(root_id=root_id), user=user)
+        .order_by("id")
+        .values(*fields)
+    }
+
+    # Deleted rows stay in `rows`: live deltas may be based on them
+    steps = _contents(rows) if include_roadmap else {}
+    if not include_deleted:
+        rows = _skip_deleted(rows)
+
+    children = {}
+    for row in rows.values():
+        children.setdefault(row["parent_id"], []).append(row["id"])
+
+    def node(pk):
+        data = {field: rows[pk][field] for field in NODE_FIELDS}
+        if include_roadmap:
+            data["roadmap"] = steps[pk]
+        return data
+
+    def subtree(pk):
+        # Iterative: a long linear history would blow the recursion limit
+        top = {**node(pk), "children": []}
+        stack = [(pk, top)]
+        while stack:
+            current, data = stack.pop()
+            for child in children.get(current, []):
+                child_data = {**node(child), "children": []}
+                data["children"].append(child_data)
+                stack.append((child, child_data))
+        return top
+
+    ancestors = []
+    parent_id = rows[roadmap_id]["parent_id"]
+    while parent_id in rows:
+        ancestors.append(node(parent_id))
+        parent_id = rows[parent_id]["parent_id"]
+
+    return {
+        "roadmap_id": roadmap_id,
+        "root_id": root_id,
+        "ancestors": list(reversed(ancestors)),
+        "node": subtree(roadmap_id),
+    }
@@ -0,0 +1,287 @@
+# llm.py
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from openai import AsyncOpenAI, OpenAI
+
+from .llm_cache import make_cache_key
+
+
+# ============================================================
+# LLM backends
+#
+# ai.py talks to the model only through get_backend(), chosen by
+# settings.LLM_BACKEND["BACKEND"]:
+#
+#   hf      HuggingFace router (OpenAI-compatible), the default
+#   fake    local canned JSON, with configurable latency / jitter /
+#           error rate: offline runs, CI, load benchmarks
+#   record  calls RECORD_FROM and writes every answer to FIXTURE_DIR
+#   replay  answers only from FIXTURE_DIR (a missing fixture errors)
+#
+# Every backend offers complete() / acomplete() / astream() on
+# OpenAI-style messages and returns the raw text of the answer.
+# ============================================================
+HF_ROUTER_URL = "https://router.huggingface.co/v1"
+
+DEFAULTS = {
+    "BACKEND": "hf",
+    "MODEL": "meta-llama/Llama-4-Scout-17B-16E-Instruct",
+    "BASE_URL": HF_ROUTER_URL,
+    "API_KEY": None,                # None: $HF_TOKEN
+    "FAKE_LATENCY": 0.0,            # seconds per call
+    "FAKE_JITTER": 0.0,             # +/- seconds, uniform
+    "FAKE_ERROR_RATE": 0.0,         # share of calls that raise
+    "FAKE_SEED": None,              # fixed seed: reproducible latencies / errors
+    "FAKE_STREAM_CHUNK": 24,        # characters per streamed delta
+    "RECORD_FROM": "hf",
+    "FIXTURE_DIR": Path(__file__).resolve().parent / "testdata" / "llm_fixtures",
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "LLM_BACKEND", {}))
+    return config
+
+
+class LLMError(Exception):
+    pass
+
+
+class FixtureMissing(LLMError):
+    pass
+
+
+# ============================================================
+# HuggingFace router
+# ============================================================
+class HFRouterBackend:
+    def __init__(self, config):
+        self.model = config["MODEL"]
+        self.base_url = config["BASE_URL"]
+        self.api_key = config["API_KEY"] or os.getenv("HF_TOKEN")
+        self._client = None
+        self._async_client = None
+
+    # Clients are built on first use: importing ai.py needs no token
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key)
+        return self._async_client
+
+    def complete(self, messages, max_tokens, temperature):
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return completion.choices[0].message.content
+
+    async def acomplete(self, messages, max_tokens, temperature):
+        completion = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return completion.choices[0].message.content
+
+    async def astream(self, messages, max_tokens, temperature):
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# ============================================================
+# Local fake
+#
+# Answers are canned JSON in the shape each prompt asks for,
+# picked by markers in the prompt and varied by its hash, so the
+# same prompt always gets the same answer.
+# ============================================================
+def _prompt(messages):
+    return "\n".join(m["content"] for m in messages)
+
+
+def _fake_steps(seed, count=8):
+    return {f"Step {i}": f"Topic {seed[i % len(seed)]}{i}: practice and build a small project" for i in range(1, count + 1)}
+
+
+def _fake_explanation(seed):
+    return {"explanation": f"Explanation {seed[:8]}", "resources": ["https://roadmap.sh"], "examples": [f"Example {seed[8:12]}"]}
+
+
+def fake_answer(messages):
+    prompt = _prompt(messages)
+    seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    if "AI Roadmap Mentor" in prompt:
+        return {"message": f"Fake mentor answer {seed[:8]}."}
+    if "career roadmap generator" in prompt:
+        return {"steps": _fake_steps(seed)}
+    if "mock interview questions" in prompt:
+        count = int((re.search(r"Generate (\d+)", prompt) or [0, 10])[1])
+        return {"questions": [f"Interview question {seed[:6]}-{i}?" for i in range(1, count + 1)]}
+    if "missing_skills" in prompt:
+        return {"missing_skills": ["Testing"], "priority_skills": ["Docker"], "suggestions": f"Suggestion {seed[:8]}"}
+    if "week_1" in prompt:
+        return {f"week_{i}": [f"Week {i} task {seed[i]}"] for i in range(1, 7)}
+    if "one entry per step name" in prompt:
+        steps = json.loads(re.search(r"in detail:\s*(\{.*\})\s*$", prompt, re.M)[1])
+        return {step: _fake_explanation(hashlib.sha256(step.encode()).hexdigest()) for step in steps}
+    if "explanation" in prompt:
+        return _fake_explanation(seed)
+    return {"steps": _fake_steps(seed)}
+
+
+class FakeBackend:
+    def __init__(self, config):
+        self.model = "fake"
+        self.latency = config["FAKE_LATENCY"]
+        self.jitter = config["FAKE_JITTER"]
+        self.error_rate = config["FAKE_ERROR_RATE"]
+        self.chunk = config["FAKE_STREAM_CHUNK"]
+        self._random = random.Random(config["FAKE_SEED"])
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """(delay, fail) for one call."""
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.error_rate
+        return delay, fail
+
+    def _answer(self, messages, fail):
+        if fail:
+            raise LLMError("Fake backend error (FAKE_ERROR_RATE)")
+        return json.dumps(fake_answer(messages))
+
+    def complete(self, messages, max_tokens, temperature):
+        delay, fail = self._draw()
+        time.sleep(delay)
+        return self._answer(messages, fail)
+
+    async def acomplete(self, messages, max_tokens, temperature):
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        return self._answer(messages, fail)
+
+    async def astream(self, messages, max_tokens, temperature):
+        # The delay is the time to first token; the rest arrives at once
+        output = await self.acomplete(messages, max_tokens, temperature)
+        for i in range(0, len(output), self.chunk):
+            yield output[i:i + self.chunk]
+
+
+# ============================================================
+# Record / replay fixtures
+#
+# One JSON file per distinct request, named by its cache key over
+# the recorded model, so replays match exactly what was recorded.
+# ============================================================
+class ReplayBackend:
+    def __init__(self, config):
+        self.recorded_model = config["MODEL"]
+        self.model = f"replay:{self.recorded_model}"
+        self.fixture_dir = Path(config["FIXTURE_DIR"])
+
+    def fixture_path(self, messages, max_tokens, temperature):
+        key = make_cache_key(self.recorded_model, messages, max_tokens=max_tokens, temperature=temperature)
+        return self.fixture_dir / f"{key}.json"
+
+    def complete(self, messages, max_tokens, temperature):
+        path = self.fixture_path(messages, max_tokens, temperature)
+        try:
+            return json.loads(path.read_text())["output"]
+        except FileNotFoundError:
+            raise FixtureMissing(f"No recorded answer: {path.name}")
+
+    async def acomplete(self, messages, max_tokens, temperature):
+        return self.complete(messages, max_tokens, temperature)
+
+    async def astream(self, messages, max_tokens, temperature):
+        yield self.complete(messages, max_tokens, temperature)
+
+
+class RecordBackend(ReplayBackend):
+    def __init__(self, config):
+        super().__init__(config)
+        self.inner = BACKENDS[config["RECORD_FROM"]](config)
+        self.model = self.inner.model
+
+    def save(self, messages, max_tokens, temperature, output):
+        path = self.fixture_path(messages, max_tokens, temperature)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "model": self.recorded_model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "output": output,
+        }, indent=2, ensure_ascii=False))
+
+    def complete(self, messages, max_tokens, temperature):
+        output = self.inner.complete(messages, max_tokens, temperature)
+        self.save(messages, max_tokens, temperature, output)
+        return output
+
+    async def acomplete(self, messages, max_tokens, temperature):
+        output = await self.inner.acomplete(messages, max_tokens, temperature)
+        self.save(messages, max_tokens, temperature, output)
+        return output
+
+    async def astream(self, messages, max_tokens, temperature):
+        output = ""
+        async for delta in self.inner.astream(messages, max_tokens, temperature):
+            output += delta
+            yield delta
+        self.save(messages, max_tokens, temperature, output)
+
+
+BACKENDS = {
+    "hf": HFRouterBackend,
+    "fake": FakeBackend,
+    "record": RecordBackend,
+    "replay": ReplayBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend():
+    """The configured backend, one instance per distinct configuration."""
+    config = get_config()
+    if config["BACKEND"] not in BACKENDS:
+        raise LLMError(f"Unknown LLM backend: {config['BACKEND']}")
+
+    key = json.dumps(config, sort_keys=True, default=str)
+    if key not in _backends:
+        with _backends_lock:
+            if key not in _backends:
+                _backends[key] = BACKENDS[config["BACKEND"]](config)
+    return _backends[key]
@@ -0,0 +1,246 @@
+# llm_cache.py
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MEMORY_MAX_ENTRIES": 512,
+    "MEMORY_TTL": 60 * 60,          # seconds
+    "DB_MAX_ENTRIES": 10000,
+    "DB_TTL": 7 * 24 * 60 * 60,     # seconds
+    "DB_EVICT_EVERY": 50,           # inserts between eviction passes
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "LLM_CACHE", {}))
+    return config
+
+
+# ============================================================
+# Cache Key
+# ============================================================
+def normalize_prompt(text):
+    """Collapse whitespace so indentation changes don't split the cache."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_cache_key(model, messages, **params):
+    """
+    Content-addressed key over model, normalized messages and
+    sampling params (max_tokens, temperature, ...).
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": m["role"], "content": normalize_prompt(m["content"])}
+            for m in messages
+        ],
+        "params": params,
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# Tier 1: In-process LRU with TTL
+# ============================================================
+class MemoryTier:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ============================================================
+# Tier 2: Shared DB table (visible to every worker)
+# ============================================================
+class DatabaseTier:
+    # Eviction (a COUNT over the table) runs once per `evict_every`
+    # inserts, so the table may briefly exceed max_entries by that much
+    def __init__(self, max_entries, ttl, evict_every=1):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evict_every = max(1, evict_every)
+        self.evictions = 0
+        self._inserts = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        from .models import LLMCacheEntry
+
+        entry = (
+            LLMCacheEntry.objects
+            .filter(key=key, expires_at__gt=timezone.now())
+            .only("id", "response")
+            .first()
+        )
+        if entry is None:
+            return None
+
+        LLMCacheEntry.objects.filter(pk=entry.pk).update(
+            hits=F("hits") + 1, last_hit_at=timezone.now()
+        )
+        return entry.response
+
+    def set(self, key, model, value):
+        from .models import LLMCacheEntry
+
+        now = timezone.now()
+        _, created = LLMCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                "model": model,
+                "response": value,
+                "expires_at": now + timedelta(seconds=self.ttl),
+                "last_hit_at": now,
+            },
+        )
+        if not created:
+            return  # same number of rows: nothing to evict
+
+        with self._lock:
+            self._inserts += 1
+            due = self._inserts % self.evict_every == 0
+        if due:
+            self._evict(now)
+
+    def _evict(self, now):
+        from .models import LLMCacheEntry
+
+        self.evictions += LLMCacheEntry.objects.filter(expires_at__lte=now).delete()[0]
+
+        overflow = LLMCacheEntry.objects.count() - self.max_entries
+        if overflow > 0:
+            stale_ids = list(
+                LLMCacheEntry.objects
+                .order_by("last_hit_at")
+                .values_list("id", flat=True)[:overflow]
+            )
+            self.evictions += LLMCacheEntry.objects.filter(id__in=stale_ids).delete()[0]
+
+    def clear(self):
+        from .models import LLMCacheEntry
+
+        LLMCacheEntry.objects.all().delete()
+
+
+# ============================================================
+# Two-tier facade
+# ============================================================
+class LLMResponseCache:
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.memory = MemoryTier(
+            self.config["MEMORY_MAX_ENTRIES"], self.config["MEMORY_TTL"]
+        )
+        self.db = DatabaseTier(
+            self.config["DB_MAX_ENTRIES"], self.config["DB_TTL"], self.config["DB_EVICT_EVERY"]
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "sets": 0}
+
+    @property
+    def enabled(self):
+        return self.config["ENABLED"]
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        try:
+            value = self.db.get(key)
+        except Exception as e:
+            print("LLM cache read error:", e)
+            value = None
+
+        if value is not None:
+            self._count("db_hits")
+            self.memory.set(key, value)
+            return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key, model, value):
+        if not self.enabled:
+            return
+
+        self._count("sets")
+        self.memory.set(key, value)
+        try:
+            self.db.set(key, model, value)
+        except Exception as e:
+            print("LLM cache write error:", e)
+
+    def clear(self):
+        self.memory.clear()
+        self.db.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0
+        )
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_evictions"] = self.memory.evictions
+        stats["db_evictions"] = self.db.evictions
+        return stats
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,410 @@
+import json
+import math
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext, override_settings, setup_databases, teardown_databases
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from career.jobs import run_pending, submit_job
+from career.llm_cache import llm_cache
+from career.models import CareerRoadmap, RoadmapReference
+from career.versions import create_version
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None
+
+
+BASELINE = Path(__file__).resolve().parents[2] / "testdata" / "bench_api_baseline.json"
+PASSWORD = "Bench-pass-2024!"
+
+SAVED_CAREERS = [
+    "Backend Developer", "Frontend Developer", "DevOps Engineer", "Data Scientist", "Android Developer",
+    "Cloud Architect", "Security Analyst", "Game Developer", "QA Engineer", "Product Manager",
+]
+PREVIEW_CAREERS = ["Full Stack Developer", "Machine Learning Engineer", "iOS Developer", "Data Engineer"]
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KiB on Linux
+
+
+def make_steps(seed, count=12):
+    return {f"Step {i}": f"{seed} topic {i}: concepts, tools and a hands-on project" for i in range(1, count + 1)}
+
+
+# ============================================================
+# Synthetic data
+# ============================================================
+class Seed:
+    """N users x M careers x K versions, plus a reference per career (no scraping)."""
+
+    def __init__(self, n_users, n_careers, n_versions):
+        self.password_hash = make_password(PASSWORD)  # hashed once, shared by every seeded user
+        self.created = 0
+
+        careers = SAVED_CAREERS[:n_careers]
+        for career in careers + PREVIEW_CAREERS:
+            RoadmapReference.objects.create(
+                name=career, content={"name": career, "steps": make_steps(career, 8), "source_url": None}
+            )
+
+        self.users = [self.new_user() for _ in range(n_users)]
+        self.roadmaps = []  # (user, latest version) per user x career
+        for user in self.users:
+            for career in careers:
+                parent = None
+                for k in range(n_versions):
+                    parent = create_version(
+                        user, career, roadmap=make_steps(f"{career} v{k + 1}"),
+                        progress={f"Step {i}": "not_started" for i in range(1, 13)},
+                        parent=parent,
+                    )
+                self.roadmaps.append((user, parent))
+
+        self._tokens = {}
+
+    def new_user(self):
+        self.created += 1
+        User = get_user_model()
+        return User.objects.create(
+            username=f"bench-user-{self.created}",
+            email=f"bench-user-{self.created}@bench.local",
+            password=self.password_hash,
+        )
+
+    def tokens(self, user):
+        if user.pk not in self._tokens:
+            refresh = RefreshToken.for_user(user)
+            self._tokens[user.pk] = (str(refresh.access_token), str(refresh))
+        return self._tokens[user.pk]
+
+    def pick(self, i):
+        """(user, roadmap) for request i, spread over users and careers."""
+        user, roadmap = self.roadmaps[i % len(self.roadmaps)]
+        return user, CareerRoadmap.objects.get(pk=roadmap.pk)
+
+    def preview_job(self, user, i):
+        job = submit_job(user, "preview", {"career_name": PREVIEW_CAREERS[i % len(PREVIEW_CAREERS)]})
+        run_pending()
+        return job
+
+
+# ============================================================
+# Scenarios: name -> builder(seed, i) -> (user, method, path, body)
+#
+# Builders run untimed and create whatever the request consumes
+# (a version to delete, a user to remove, a finished job), so every
+# timed request is a valid one.
+# ============================================================
+def roadmap_request(method, suffix, body=None):
+    def build(seed, i):
+        user, roadmap = seed.pick(i)
+        return user, method, f"/api/career/roadmap/{roadmap.pk}/{suffix}", body(roadmap, i) if body else None
+    return build
+
+
+def build_preview(seed, i):
+    career = PREVIEW_CAREERS[i % len(PREVIEW_CAREERS)]
+    return seed.users[i % len(seed.users)], "get", f"/api/career/roadmap/{career}/", None
+
+
+def build_preview_async(seed, i):
+    career = PREVIEW_CAREERS[i % len(PREVIEW_CAREERS)]
+    return seed.users[i % len(seed.users)], "get", f"/api/career/roadmap/{career}/?async=true&refresh=true", None
+
+
+def build_saved(seed, i):
+    user, roadmap = seed.pick(i)
+    return user, "get", f"/api/career/roadmap/{roadmap.career_name}/", None
+
+
+def build_save_version(seed, i):
+    user, roadmap = seed.pick(i)
+    return user, "post", "/api/career/roadmap/save-version/", {
+        "career_name": roadmap.career_name, "roadmap": make_steps(f"saved {i}"),
+    }
+
+
+def build_delete(seed, i):
+    user, roadmap = seed.pick(i)
+    spare = create_version(user, roadmap.career_name, roadmap=make_steps(f"spare {i}"), parent=roadmap)
+    return user, "delete", f"/api/career/roadmap/{spare.pk}/delete/", None
+
+
+def build_job(suffix):
+    def build(seed, i):
+        user = seed.users[i % len(seed.users)]
+        return user, "get", f"/api/career/jobs/{seed.preview_job(user, i).pk}/{suffix}", None
+    return build
+
+
+def users_request(method, suffix, body=None):
+    def build(seed, i):
+        user = seed.users[i % len(seed.users)]
+        return user, method, f"/api/users/{suffix}", body(seed, user, i) if body else None
+    return build
+
+
+def build_register(seed, i):
+    return None, "post", "/api/users/register/", {
+        "username": f"bench-new-{i}", "email": f"bench-new-{i}@bench.local",
+        "password": PASSWORD, "password2": PASSWORD,
+    }
+
+
+def build_delete_user(seed, i):
+    return seed.new_user(), "delete", "/api/users/delete/", None
+
+
+SCENARIOS = {
+    # career/urls.py
+    "career.preview": build_preview,
+    "career.preview_async": build_preview_async,
+    "career.saved_roadmap": build_saved,
+    "career.save_version": build_save_version,
+    "career.my_roadmaps": lambda seed, i: (seed.users[i % len(seed.users)], "get", "/api/career/my-roadmaps/", None),
+    "career.detail": roadmap_request("get", ""),
+    "career.delete": build_delete,
+    "career.regenerate": roadmap_request("post", "regenerate/", lambda r, i: {"preferences": {"pace": i % 3}}),
+    "career.skills_gap": roadmap_request("get", "skills-gap/"),
+    "career.weekly_plan": roadmap_request("get", "weekly-plan/"),
+    "career.explain_step": roadmap_request("post", "explain-step/", lambda r, i: {"step": f"Step {i % 12 + 1}"}),
+    "career.explain_steps": roadmap_request("post", "explain-steps/", lambda r, i: {"steps": "all"}),
+    "career.mock_interview": roadmap_request("get", "mock-interview/"),
+    "career.update_progress": roadmap_request(
+        "post", "update-progress/", lambda r, i: {"step": f"Step {i % 12 + 1}", "status": "completed"}
+    ),
+    "career.progress_batch": roadmap_request(
+        "post", "progress/batch/", lambda r, i: {"progress": {f"Step {s}": "in_progress" for s in range(1, 7)}}
+    ),
+    "career.progress_summary": roadmap_request("get", "progress-summary/"),
+    "career.progress_dashboard": lambda seed, i: (
+        seed.users[i % len(seed.users)], "get", "/api/career/progress/dashboard/", None
+    ),
+    "career.chat": roadmap_request("post", "chat/", lambda r, i: {"message": f"How long does step {i % 12 + 1} take?"}),
+    "career.chat_apply": roadmap_request("post", "chat/apply/", lambda r, i: {
+        "candidate_roadmap": make_steps(f"chat {i}"), "save_mode": ("new_version", "overwrite")[i % 2],
+    }),
+    "career.insights": roadmap_request("get", "insights/"),
+    "career.lineage": roadmap_request("get", "lineage/?include=roadmap"),
+    "career.job_status": build_job(""),
+    "career.job_result": build_job("result/"),
+    # users/urls.py
+    "users.register": build_register,
+    "users.token": users_request("post", "token/", lambda seed, u, i: {"username": u.username, "password": PASSWORD}),
+    "users.token_refresh": users_request("post", "token/refresh/", lambda seed, u, i: {"refresh": seed.tokens(u)[1]}),
+    "users.profile": users_request("get", "profile/"),
+    "users.self": users_request("get", "self/"),
+    "users.update": users_request("put", "update/", lambda seed, u, i: {"email": f"{u.username}-{i}@bench.local"}),
+    "users.change_password": users_request(
+        "post", "change-password/", lambda seed, u, i: {"old_password": PASSWORD, "new_password": PASSWORD}
+    ),
+    "users.delete": build_delete_user,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end API benchmark: seeds N users x M careers x K versions, drives every career/ and "
+        "users/ endpoint against the fake LLM backend and compares with a baseline file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--careers", type=int, default=4, help=f"Saved careers per user (max {len(SAVED_CAREERS)})")
+        parser.add_argument("--versions", type=int, default=5, help="Versions per user and career")
+        parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint")
+        parser.add_argument("--only", default="", help="Comma-separated scenario name prefixes")
+        parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake LLM seconds per call")
+        parser.add_argument("--llm-jitter", type=float, default=0.0)
+        parser.add_argument(
+            "--warm-llm-cache", action="store_true",
+            help="Keep the LLM response cache between requests (default: every LLM call is a miss)",
+        )
+        parser.add_argument("--seed", type=int, default=7, help="Fake LLM random seed")
+        parser.add_argument("--baseline", default=str(BASELINE), help="Baseline JSON to compare with ('' to skip)")
+        parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+        parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p95 slowdown vs baseline (0.5: +50%%)")
+        parser.add_argument("--check", action="store_true", help="Exit with an error on regressions")
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+        parser.add_argument(
+            "--current-db", action="store_true",
+            help="Seed the configured database inside a rolled-back transaction instead of a throwaway one "
+                 "(for running under the test runner, which already provides one)",
+        )
+
+    def handle(self, *args, **options):
+        scenarios = {
+            name: build for name, build in SCENARIOS.items()
+            if not options["only"] or any(name.startswith(p.strip()) for p in options["only"].split(","))
+        }
+        config = {
+            key: options[key]
+            for key in ("users", "careers", "versions", "requests", "llm_latency", "llm_jitter", "warm_llm_cache", "seed")
+        }
+
+        bench_settings = override_settings(
+            ALLOWED_HOSTS=["testserver"],
+            LLM_BACKEND={
+                "BACKEND": "fake",
+                "FAKE_LATENCY": options["llm_latency"],
+                "FAKE_JITTER": options["llm_jitter"],
+                "FAKE_SEED": options["seed"],
+            },
+            # Each request measured alone: no work left to background threads
+            JOBS={"EMBEDDED_WORKERS": 0},
+            QUESTION_BANK={"BACKGROUND_TOPUP": False},
+            EXPLAIN={"PREFETCH": False},
+            CHAT_CONTEXT={"LOG": False},
+        )
+
+        with bench_settings:
+            if options["current_db"]:
+                report = self.run_in_transaction(scenarios, options)
+            else:
+                report = self.run_in_throwaway_db(scenarios, options)
+
+        report = {"config": config, **report}
+        if options["baseline"]:
+            report["regressions"] = self.compare(report, options)
+
+        if options["save_baseline"]:
+            baseline = {key: value for key, value in report.items() if key != "regressions"}
+            Path(options["baseline"] or BASELINE).write_text(json.dumps(baseline, indent=2) + "\n")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_table(report)
+
+        if options["check"] and report.get("regressions"):
+            raise CommandError(f"{len(report['regressions'])} endpoint(s) regressed against the baseline")
+
+    def run_in_throwaway_db(self, scenarios, options):
+        # A fresh test database (in-memory on SQLite): the developer's
+        # database is neither seeded nor locked by the run
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS}, serialized_aliases=set()
+        )
+        try:
+            return self.run(scenarios, options)
+        finally:
+            llm_cache.memory.clear()  # entries from the throwaway database
+            teardown_databases(old_config, verbosity=0)
+
+    def run_in_transaction(self, scenarios, options):
+        try:
+            with transaction.atomic():
+                report = self.run(scenarios, options)
+                raise Rollback
+        except Rollback:
+            llm_cache.memory.clear()
+        return report
+
+    def run(self, scenarios, options):
+        seed = Seed(options["users"], min(options["careers"], len(SAVED_CAREERS)), options["versions"])
+        client = APIClient()
+
+        endpoints = {}
+        started = time.perf_counter()
+        for name, build in scenarios.items():
+            latencies, queries, errors = [], 0, []
+            for i in range(options["requests"]):
+                user, method, path, body = build(seed, i)
+                if not options["warm_llm_cache"]:
+                    llm_cache.clear()  # LLM-backed requests pay for their calls (--llm-latency)
+                reset_queries()  # the query log is capped: a full log would count nothing
+                client.credentials(**({"HTTP_AUTHORIZATION": f"Bearer {seed.tokens(user)[0]}"} if user else {}))
+
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, body, format="json")
+                    latencies.append((time.perf_counter() - start) * 1000)
+                queries += len(captured)
+
+                if response.status_code >= 400:
+                    errors.append(f"{response.status_code} {method.upper()} {path}")
+
+            latencies.sort()
+            total_s = sum(latencies) / 1000
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": len(errors),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "mean_ms": round(total_s * 1000 / len(latencies), 3),
+                "throughput_rps": round(len(latencies) / total_s, 1) if total_s else None,
+                "queries_per_request": round(queries / len(latencies), 2),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            if errors:
+                endpoints[name]["first_error"] = errors[0]
+
+        return {
+            "endpoints": endpoints,
+            "elapsed_s": round(time.perf_counter() - started, 3),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def compare(self, report, options):
+        """Endpoints slower (p95 beyond tolerance) or chattier (more queries) than the baseline."""
+        path = Path(options["baseline"])
+        if not path.exists():
+            return []
+        baseline = json.loads(path.read_text()).get("endpoints", {})
+
+        regressions = []
+        for name, current in report["endpoints"].items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            reasons = []
+            # 1 ms floor: sub-millisecond endpoints jitter by more than any ratio
+            if current["p95_ms"] > base["p95_ms"] * (1 + options["tolerance"]) + 1:
+                reasons.append(f"p95 {base['p95_ms']} -> {current['p95_ms']} ms")
+            if current["queries_per_request"] > base["queries_per_request"] + 0.5:
+                reasons.append(f"queries {base['queries_per_request']} -> {current['queries_per_request']}")
+            if current["errors"] > base.get("errors", 0):
+                reasons.append(f"errors {base.get('errors', 0)} -> {current['errors']}")
+            if reasons:
+                regressions.append({"endpoint": name, "reasons": reasons})
+        return regressions
+
+    def print_table(self, report):
+        header = (
+            f"{'endpoint':<26}{'req':>5}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'req/s':>9}{'queries':>9}{'rss MB':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, r in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<26}{r['requests']:>5}{r['errors']:>5}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+                f"{r['throughput_rps'] or '-':>9}{r['queries_per_request']:>9}{r['peak_rss_mb'] or '-':>8}"
+            )
+        self.stdout.write(f"elapsed {report['elapsed_s']} s, peak RSS {report['peak_rss_mb']} MB")
+
+        for regression in report.get("regressions", []):
+            self.stdout.write(self.style.WARNING(f"REGRESSION {regression['endpoint']}: {'; '.join(regression['reasons'])}"))
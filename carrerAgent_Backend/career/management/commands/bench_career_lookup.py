@@ -0,0 +1,123 @@
+import itertools
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from career.models import RoadmapReference
+from career.names import career_key
+from career.references import reference_index, resolve_reference
+
+
+class Rollback(Exception):
+    pass
+
+
+LEVELS = ["", "Senior", "Lead", "Junior"]
+AREAS = [
+    "Backend", "Frontend", "Full Stack", "Data", "Machine Learning", "Cloud", "Mobile", "Game",
+    "Security", "Embedded", "Platform", "Blockchain", "Network", "Database", "Test Automation",
+]
+STACKS = [
+    "Python", "Java", "Go", "Rust", "Ruby", "PHP", "Kotlin", "Swift", "Scala", "Elixir",
+    "TypeScript", "Haskell", "Clojure", "Perl", "Dart", "Julia", "Erlang", "Fortran", "Lua", "Zig",
+]
+ROLES = ["Developer", "Architect", "Analyst", "Consultant", "Specialist"]
+
+
+def reference_names(count):
+    names = (" ".join(filter(None, parts)) for parts in itertools.product(LEVELS, AREAS, STACKS, ROLES))
+    return list(itertools.islice(names, count))
+
+
+def typo(name, rng):
+    """Drop one letter from the longest word."""
+    words = name.split()
+    i = max(range(len(words)), key=lambda j: len(words[j]))
+    word = words[i]
+    cut = rng.randrange(1, len(word))
+    words[i] = word[:cut] + word[cut + 1:]
+    return " ".join(words)
+
+
+VARIANTS = {
+    "exact": lambda name, rng: name,
+    "case/punctuation": lambda name, rng: "-".join(name.lower().split()),
+    "synonym": lambda name, rng: name.replace("Developer", "Engineer").replace("Full Stack", "full-stack"),
+    "typo": typo,
+}
+
+
+class Command(BaseCommand):
+    help = "Measure career name -> RoadmapReference lookup latency and hit rate (iexact vs normalized + fuzzy)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--references", type=int, default=5000, help="Stored references")
+        parser.add_argument("--lookups", type=int, default=500, help="Names looked up per variant")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    def handle(self, *args, **options):
+        try:
+            # Everything runs in one transaction that is rolled back at the end
+            with transaction.atomic():
+                report = self.run(options["references"], options["lookups"], options["seed"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['references']} references, trigram index built in {report['index_build_ms']} ms"
+        )
+        header = f"{'variant':<18}{'method':<12}{'hit %':>8}{'us/lookup':>12}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in report["rows"]:
+            self.stdout.write(f"{r['variant']:<18}{r['method']:<12}{r['hit_pct']:>8}{r['us_per_lookup']:>12}")
+
+    def run(self, n_references, n_lookups, seed):
+        rng = random.Random(seed)
+        names = reference_names(n_references)
+        RoadmapReference.objects.bulk_create(
+            [RoadmapReference(name=name, name_key=career_key(name), content={"steps": {}}) for name in names],
+            batch_size=500,
+        )
+        ids = dict(RoadmapReference.objects.filter(name__in=names).values_list("name", "id"))
+
+        start = time.perf_counter()
+        reference_index()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        sample = rng.sample(names, min(n_lookups, len(names)))
+        methods = {
+            "iexact": lambda query: RoadmapReference.objects.filter(name__iexact=query).first(),
+            # cold: every fuzzy hit searches the index; warm: the learned aliases answer
+            "cold": lambda query: resolve_reference(query),
+            "warm": lambda query: resolve_reference(query),
+        }
+
+        rows = []
+        for variant, make in VARIANTS.items():
+            queries = [(name, make(name, rng)) for name in sample]
+            for method, lookup in methods.items():
+                with override_settings(CAREER_NAMES={"LEARN_ALIASES": method == "cold"}):
+                    start = time.perf_counter()
+                    found = [lookup(query) for _, query in queries]
+                    elapsed = time.perf_counter() - start
+
+                hits = sum(ref is not None and ref.pk == ids[name] for (name, _), ref in zip(queries, found))
+                rows.append({
+                    "variant": variant,
+                    "method": method,
+                    "hit_pct": round(hits / len(queries) * 100, 1),
+                    "us_per_lookup": round(elapsed / len(queries) * 1e6, 1),
+                })
+
+        return {"references": len(names), "index_build_ms": round(build_ms, 1), "rows": rows}
@@ -0,0 +1,75 @@
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+
+from career.extract import HTML_PARSER, extract_steps_from_html
+
+
+HTML_FIXTURES = Path(__file__).resolve().parents[2] / "testdata" / "html"
+
+
+def legacy_extract(html):
+    """The pre-extract.py scraper: full html.parser tree, every <li>."""
+    soup = BeautifulSoup(html, "html.parser")
+    return [t for t in (node.get_text(strip=True) for node in soup.find_all("li")) if t]
+
+
+def measure(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        items = fn(html)
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(items), round(elapsed_ms, 2), round(peak / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = "Compare parse time and peak memory of the targeted HTML extractor with the old full-tree scrape."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        engines = [
+            ("legacy html.parser", legacy_extract),
+            ("targeted html.parser", lambda html: extract_steps_from_html(html, "html.parser")),
+        ]
+        if HTML_PARSER == "lxml":
+            engines.append(("targeted lxml", lambda html: extract_steps_from_html(html, "lxml")))
+
+        rows = []
+        for path in sorted(HTML_FIXTURES.glob("*.html")):
+            html = path.read_text(encoding="utf-8")
+            for engine, fn in engines:
+                items, ms, peak_kib = measure(fn, html, repeat)
+                rows.append({
+                    "fixture": path.stem,
+                    "kib": round(len(html.encode("utf-8")) / 1024, 1),
+                    "engine": engine,
+                    "items": items,
+                    "ms": ms,
+                    "peak_kib": peak_kib,
+                })
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        header = f"{'fixture':<16}{'KiB':>8}  {'engine':<22}{'items':>7}{'ms':>10}{'peak KiB':>11}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows:
+            self.stdout.write(
+                f"{r['fixture']:<16}{r['kib']:>8}  {r['engine']:<22}{r['items']:>7}{r['ms']:>10}{r['peak_kib']:>11}"
+            )
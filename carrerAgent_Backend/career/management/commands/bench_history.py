@@ -0,0 +1,93 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from career.deltas import encoded_size, get_config
+from career.models import CareerRoadmap
+from career.versions import create_version
+
+
+class Rollback(Exception):
+    pass
+
+
+def build_history(user, career, steps, depth):
+    """`depth` versions, each a one-step chat edit of the previous one."""
+    parent = None
+    for i in range(depth):
+        parent = create_version(user, career, roadmap=steps, parent=parent)
+        steps = {**steps, f"Step {i % len(steps) + 1}": f"Edited in version {i + 2}: " + "x" * 60}
+    return parent.pk
+
+
+def stored_bytes(career):
+    rows = CareerRoadmap.objects.filter(career_name=career).values_list("snapshot", "delta")
+    return sum(encoded_size(snapshot) if snapshot is not None else encoded_size(delta) for snapshot, delta in rows)
+
+
+def read_ms(pk, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        CareerRoadmap.objects.get(pk=pk).roadmap
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare storage size and read latency of full-copy vs delta-compressed roadmap history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--depths", default="1,5,10,25,50,100", help="Comma-separated history depths")
+        parser.add_argument("--steps", type=int, default=20, help="Steps per roadmap")
+        parser.add_argument("--repeat", type=int, default=50, help="Reads per measurement")
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    def handle(self, *args, **options):
+        depths = [int(d) for d in options["depths"].split(",")]
+        try:
+            # Everything runs in one transaction that is rolled back at the end
+            with transaction.atomic():
+                rows = self.run(depths, options["steps"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        header = f"{'depth':>6}{'full KiB':>11}{'delta KiB':>11}{'ratio':>8}{'full ms':>10}{'delta ms':>10}"
+        self.stdout.write(f"snapshot every {get_config()['SNAPSHOT_EVERY']} versions")
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows:
+            self.stdout.write(
+                f"{r['depth']:>6}{r['full_kib']:>11}{r['delta_kib']:>11}{r['ratio']:>8}"
+                f"{r['full_read_ms']:>10}{r['delta_read_ms']:>10}"
+            )
+
+    def run(self, depths, n_steps, repeat):
+        user = get_user_model().objects.create_user(username="__bench_history__", password=None)
+        steps = {f"Step {i}": f"Topic {i}: " + "lorem ipsum " * 8 for i in range(1, n_steps + 1)}
+
+        rows = []
+        for depth in depths:
+            full_career, delta_career = f"full-{depth}", f"delta-{depth}"
+
+            with override_settings(ROADMAP_STORAGE={"SNAPSHOT_EVERY": 1}):  # every version a full copy
+                full_pk = build_history(user, full_career, steps, depth)
+            delta_pk = build_history(user, delta_career, steps, depth)
+
+            full, delta = stored_bytes(full_career), stored_bytes(delta_career)
+            rows.append({
+                "depth": depth,
+                "full_kib": round(full / 1024, 1),
+                "delta_kib": round(delta / 1024, 1),
+                "ratio": round(delta / full, 3),
+                "full_read_ms": round(read_ms(full_pk, repeat), 3),
+                "delta_read_ms": round(read_ms(delta_pk, repeat), 3),
+            })
+        return rows
@@ -0,0 +1,75 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from career.parsing import IncrementalJSONParser, extract_steps, parse_json_lenient
+
+
+LLM_OUTPUTS = Path(__file__).resolve().parents[2] / "testdata" / "llm_outputs"
+
+
+def legacy_safe_json(text):
+    """The pre-parsing.py behaviour, kept here as the baseline."""
+    try:
+        return json.loads(text)
+    except Exception:
+        return None  # old code wrapped the raw text as a single junk step
+
+
+def count_steps(value):
+    steps = extract_steps(value)
+    return len(steps) if steps else 0
+
+
+def time_per_call(fn, raw, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(raw)
+    return (time.perf_counter() - start) / repeat * 1e6  # µs
+
+
+def feed_in_chunks(raw, size=8):
+    parser = IncrementalJSONParser()
+    for i in range(0, len(raw), size):
+        parser.feed(raw[i:i + size])
+    return parser.result()
+
+
+class Command(BaseCommand):
+    help = "Benchmark the tolerant LLM JSON parser against the old safe_json over the fixture corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=2000)
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        rows = []
+
+        for path in sorted(LLM_OUTPUTS.glob("*.txt")):
+            name, raw = path.stem, path.read_text()
+            rows.append({
+                "fixture": name,
+                "bytes": len(raw),
+                "legacy_steps": count_steps(legacy_safe_json(raw)),
+                "lenient_steps": count_steps(parse_json_lenient(raw)),
+                "legacy_us": round(time_per_call(legacy_safe_json, raw, repeat), 2),
+                "lenient_us": round(time_per_call(parse_json_lenient, raw, repeat), 2),
+                "streamed_us": round(time_per_call(feed_in_chunks, raw, repeat), 2),
+            })
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        header = f"{'fixture':<26}{'bytes':>7}{'steps old/new':>15}{'legacy µs':>11}{'lenient µs':>12}{'stream µs':>11}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows:
+            self.stdout.write(
+                f"{r['fixture']:<26}{r['bytes']:>7}"
+                f"{str(r['legacy_steps']) + '/' + str(r['lenient_steps']):>15}"
+                f"{r['legacy_us']:>11}{r['lenient_us']:>12}{r['streamed_us']:>11}"
+            )
@@ -0,0 +1,83 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from career.models import CareerRoadmap
+from career.progress import apply_progress
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_update(roadmap_id, step, status):
+    """The pre-progress.py write: load the whole row, save() every column."""
+    roadmap = CareerRoadmap.objects.get(pk=roadmap_id)
+    roadmap.progress[step] = status
+    roadmap.save()
+
+
+class Command(BaseCommand):
+    help = "Compare progress-update throughput: full-row save(), atomic per-step writes and one batch write."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--steps", type=int, default=50, help="Steps in the benchmark roadmap")
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    def handle(self, *args, **options):
+        try:
+            # Everything runs in one transaction that is rolled back at the end
+            with transaction.atomic():
+                rows = self.run(options["steps"], options["rounds"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        header = f"{'mode':<14}{'requests':>10}{'updates':>10}{'ms/request':>13}{'updates/s':>12}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for r in rows:
+            self.stdout.write(
+                f"{r['mode']:<14}{r['requests']:>10}{r['updates']:>10}{r['ms_per_request']:>13}{r['updates_per_s']:>12}"
+            )
+
+    def run(self, n_steps, rounds):
+        user = get_user_model().objects.create_user(username="__bench_progress__", password=None)
+        steps = {f"Step {i}": f"Topic {i} " * 20 for i in range(1, n_steps + 1)}
+        roadmap = CareerRoadmap.objects.create(
+            user=user, career_name="Bench", roadmap=steps,
+            progress={step: "not_started" for step in steps},
+        )
+
+        statuses = ["in_progress", "completed"]
+        modes = {
+            "legacy save()": lambda status: [legacy_update(roadmap.pk, s, status) for s in steps],
+            "atomic step": lambda status: [apply_progress(roadmap.pk, {s: status}, steps) for s in steps],
+            "batch": lambda status: [apply_progress(roadmap.pk, {s: status for s in steps}, steps)],
+        }
+
+        rows = []
+        for mode, fn in modes.items():
+            requests = 0
+            start = time.perf_counter()
+            for i in range(rounds):
+                requests += len(fn(statuses[i % 2]))
+            elapsed = time.perf_counter() - start
+
+            updates = rounds * n_steps
+            rows.append({
+                "mode": mode,
+                "requests": requests,
+                "updates": updates,
+                "ms_per_request": round(elapsed / requests * 1000, 3),
+                "updates_per_s": round(updates / elapsed),
+            })
+        return rows
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from career.crawler import crawl
+
+
+class Command(BaseCommand):
+    help = "Concurrently scrape roadmap.sh for many careers and bulk-store RoadmapReference rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("careers", nargs="*", help="Career names, e.g. 'backend' 'devops'")
+        parser.add_argument("--file", help="Text file with one career per line")
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches")
+        parser.add_argument("--rate", type=float, default=2.0, help="Max requests per second per host")
+        parser.add_argument("--retries", type=int, default=3, help="Retries per career on transient errors")
+        parser.add_argument("--backoff", type=float, default=1.0, help="Base backoff in seconds (doubles per retry)")
+        parser.add_argument("--skip-existing", action="store_true", help="Don't re-crawl careers already stored")
+        parser.add_argument("--json", action="store_true", help="Machine-readable report")
+
+    def handle(self, *args, **options):
+        careers = list(options["careers"])
+        if options["file"]:
+            with open(options["file"], encoding="utf-8") as fh:
+                careers += [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
+        if not careers:
+            raise CommandError("Give career names or --file")
+
+        report = crawl(
+            careers,
+            workers=options["workers"],
+            rate=options["rate"],
+            retries=options["retries"],
+            backoff=options["backoff"],
+            refresh_existing=not options["skip_existing"],
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"crawled {report['requested']} careers in {report['elapsed_s']}s "
+            f"({report['careers_per_s']}/s): created={report['created']} "
+            f"updated={report['updated']} not_modified={report['not_modified']} "
+            f"failed={len(report['failed'])} retries={report['retries']}"
+        )
+        for failure in report["failed"]:
+            self.stdout.write(self.style.WARNING(
+                f"  {failure['career']}: {failure['error']} (attempts={failure['attempts']})"
+            ))
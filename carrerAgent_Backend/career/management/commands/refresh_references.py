@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from career.references import get_config, refresh_due_references
+
+
+class Command(BaseCommand):
+    help = "Re-scrape RoadmapReference rows whose auto_refresh_at has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Concurrent scrapes (default REFERENCE_REFRESH['WORKERS'])")
+        parser.add_argument("--limit", type=int, help="Refresh at most this many references per pass")
+        parser.add_argument("--force", action="store_true", help="Refresh every reference, due or not")
+        parser.add_argument("--loop", action="store_true", help="Keep running as a scheduler loop")
+        parser.add_argument("--interval", type=int, help="Seconds between passes with --loop")
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or get_config()["POLL_INTERVAL"]
+
+        while True:
+            result = refresh_due_references(
+                workers=options["workers"],
+                limit=options["limit"],
+                force=options["force"],
+            )
+
+            self.stdout.write(
+                f"due={result['due']} refreshed={result['refreshed']} failed={len(result['failed'])}"
+            )
+            for name in result["failed"]:
+                self.stdout.write(self.style.WARNING(f"  failed: {name}"))
+
+            if not options["loop"]:
+                break
+            time.sleep(interval)
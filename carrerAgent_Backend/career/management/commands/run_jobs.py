@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from career.jobs import WorkerPool, get_config, requeue_expired, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued GenerationJob rows (preview / regenerate / chat) with a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Worker threads (default JOBS['WORKERS'])")
+        parser.add_argument("--once", action="store_true", help="Run what is runnable now, then exit")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            requeued = requeue_expired()
+            ran = run_pending()
+            self.stdout.write(f"ran={ran} requeued={requeued}")
+            return
+
+        workers = options["workers"] or get_config()["WORKERS"]
+        pool = WorkerPool(workers).start()
+        self.stdout.write(f"{workers} job workers running (Ctrl+C to stop)")
+
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stdout.write("stopping workers...")
+            pool.stop()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from career.models import CareerRoadmap, InterviewQuestionBank
+from career.question_bank import fill_bank, normalize_career
+
+
+class Command(BaseCommand):
+    help = "Pre-generate the shared mock-interview question bank for careers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("careers", nargs="*", help="Career names, e.g. 'Backend Developer'")
+        parser.add_argument("--file", help="Text file with one career per line")
+        parser.add_argument("--from-roadmaps", action="store_true", help="Every career users have roadmaps for")
+        parser.add_argument("--size", type=int, help="Questions per bank (default QUESTION_BANK['TARGET_SIZE'])")
+
+    def handle(self, *args, **options):
+        careers = list(options["careers"])
+        if options["file"]:
+            with open(options["file"], encoding="utf-8") as fh:
+                careers += [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+        if options["from_roadmaps"]:
+            careers += CareerRoadmap.objects.values_list("career_name", flat=True).distinct()
+
+        # One bank per normalized career
+        careers = list({normalize_career(c): c for c in careers if c.strip()}.values())
+        if not careers:
+            raise CommandError("Give career names, --file or --from-roadmaps")
+
+        for career in careers:
+            try:
+                size = fill_bank(career, target=options["size"])
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"{career}: failed ({e})"))
+                continue
+            self.stdout.write(f"{career}: {size} questions")
+
+        self.stdout.write(f"{InterviewQuestionBank.objects.count()} banks stored")
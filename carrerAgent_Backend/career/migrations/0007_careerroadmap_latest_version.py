@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_latest_pointers(apps, schema_editor):
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+    LatestRoadmapVersion = apps.get_model('career', 'LatestRoadmapVersion')
+
+    latest = {}
+    rows = (
+        CareerRoadmap.objects
+        .filter(is_deleted=False)
+        .order_by('user_id', 'career_name', '-version', '-id')
+        .values_list('id', 'user_id', 'career_name', 'version')
+    )
+    for roadmap_id, user_id, career_name, version in rows.iterator():
+        latest.setdefault((user_id, career_name), (roadmap_id, version))
+
+    LatestRoadmapVersion.objects.bulk_create([
+        LatestRoadmapVersion(user_id=user_id, career_name=career_name, roadmap_id=roadmap_id, version=version)
+        for (user_id, career_name), (roadmap_id, version) in latest.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0006_roadmapreference_etag_roadmapreference_last_modified'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestRoadmapVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('career_name', models.CharField(max_length=100)),
+                ('version', models.IntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='careerroadmap',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', 'career_name', '-version'], name='roadmap_user_career_ver_idx'),
+        ),
+        migrations.AddField(
+            model_name='latestroadmapversion',
+            name='roadmap',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='career.careerroadmap'),
+        ),
+        migrations.AddField(
+            model_name='latestroadmapversion',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='latestroadmapversion',
+            constraint=models.UniqueConstraint(fields=('user', 'career_name'), name='latest_roadmap_per_career'),
+        ),
+        migrations.RunPython(backfill_latest_pointers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0008_careerroadmap_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='progress_revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
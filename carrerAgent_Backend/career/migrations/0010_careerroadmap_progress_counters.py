@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:49
+
+from django.db import migrations, models
+
+
+def backfill_progress_counters(apps, schema_editor):
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+    fields = ['progress_total', 'progress_completed', 'progress_in_progress', 'progress_skipped']
+
+    batch = []
+    for roadmap in CareerRoadmap.objects.only('id', 'progress').iterator(chunk_size=500):
+        statuses = list((roadmap.progress or {}).values())
+        roadmap.progress_total = len(statuses)
+        roadmap.progress_completed = statuses.count('completed')
+        roadmap.progress_in_progress = statuses.count('in_progress')
+        roadmap.progress_skipped = statuses.count('skipped')
+        batch.append(roadmap)
+
+        if len(batch) >= 500:
+            CareerRoadmap.objects.bulk_update(batch, fields)
+            batch = []
+
+    CareerRoadmap.objects.bulk_update(batch, fields)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0009_careerroadmap_progress_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='progress_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='progress_in_progress',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='progress_skipped',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='progress_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_progress_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,202 @@
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of career.deltas as of this migration: later changes
+# to that module or to settings.ROADMAP_STORAGE must not change what
+# this migration does.
+SNAPSHOT_EVERY = 10
+MAX_DELTA_RATIO = 0.5
+STORAGE_FIELDS = ['snapshot', 'delta', 'delta_parent', 'chain_base', 'chain_depth']
+
+
+def make_delta(old, new):
+    old = old or {}
+    new = new or {}
+
+    delta = {
+        'set': {k: v for k, v in new.items() if k not in old or old[k] != v},
+        'del': [k for k in old if k not in new],
+    }
+
+    if list(apply_delta(old, delta)) != list(new):
+        delta['order'] = list(new)
+
+    return {k: v for k, v in delta.items() if v}
+
+
+def apply_delta(old, delta):
+    result = {k: v for k, v in (old or {}).items() if k not in delta.get('del', ())}
+    result.update(delta.get('set', {}))
+
+    order = delta.get('order')
+    if order:
+        result = {k: result[k] for k in order}
+    return result
+
+
+def encoded_size(value):
+    return len(json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+
+def worth_storing(delta, content):
+    return encoded_size(delta) < encoded_size(content) * MAX_DELTA_RATIO
+
+
+def _remaining_children(parent_ids):
+    """id -> number of rows that still need it as their parent."""
+    counts = {}
+    for parent in parent_ids:
+        if parent is not None:
+            counts[parent] = counts.get(parent, 0) + 1
+    return counts
+
+
+def _flush(CareerRoadmap, batch):
+    CareerRoadmap.objects.bulk_update(batch, STORAGE_FIELDS)
+    batch.clear()
+
+
+def _release(parent, content, remaining):
+    """Drop a parent's content once its last child has been handled."""
+    remaining[parent] -= 1
+    if not remaining[parent]:
+        content.pop(parent, None)
+
+
+def compress_history(apps, schema_editor):
+    """
+    Re-store existing versions as deltas against their parent, in the
+    same way CareerRoadmap.save() does for new ones. One (user, career)
+    history at a time; parents are always created before their
+    children, so one pass in id order is enough, and a row's content
+    is only kept while a later row still has it as parent.
+    """
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+
+    histories = list(CareerRoadmap.objects.values_list('user_id', 'career_name').distinct().order_by())
+    for user_id, career_name in histories:
+        history = CareerRoadmap.objects.filter(user_id=user_id, career_name=career_name)
+        remaining = _remaining_children(history.values_list('parent_id', flat=True))
+        kept = {}  # id -> (steps, (chain_base_id, chain_depth)), for rows still needed as parent
+        batch = []
+
+        for row in history.order_by('id').only('id', 'parent_id', 'snapshot').iterator(chunk_size=500):
+            steps = row.snapshot or {}
+            position = (None, 0)
+
+            parent = row.parent_id
+            if parent in kept and kept[parent][1][1] + 1 < SNAPSHOT_EVERY:
+                parent_steps, (base, depth) = kept[parent]
+                delta = make_delta(parent_steps, steps)
+                if worth_storing(delta, steps):
+                    position = (base or parent, depth + 1)
+
+                    row.snapshot = None
+                    row.delta = delta
+                    row.delta_parent_id = parent
+                    row.chain_base_id, row.chain_depth = position
+                    batch.append(row)
+
+            if parent in remaining:
+                _release(parent, kept, remaining)
+            if remaining.get(row.id):
+                kept[row.id] = (steps, position)
+
+            if len(batch) >= 500:
+                _flush(CareerRoadmap, batch)
+
+        _flush(CareerRoadmap, batch)
+
+
+def expand_history(apps, schema_editor):
+    """Turn every delta back into a full snapshot, one delta chain at a time."""
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+
+    bases = list(
+        CareerRoadmap.objects
+        .filter(chain_base__isnull=False)
+        .values_list('chain_base_id', flat=True)
+        .distinct()
+        .order_by()
+    )
+    for base_id in bases:
+        base = CareerRoadmap.objects.only('id', 'snapshot').get(pk=base_id)
+        chain = CareerRoadmap.objects.filter(chain_base_id=base_id)
+        remaining = _remaining_children(chain.values_list('delta_parent_id', flat=True))
+        content = {base.id: base.snapshot}
+        batch = []
+
+        # Delta parents are created before their children: id order
+        for row in chain.order_by('id').iterator(chunk_size=500):
+            parent = row.delta_parent_id
+            steps = apply_delta(content[parent], row.delta)
+            _release(parent, content, remaining)
+            if remaining.get(row.id):
+                content[row.id] = steps
+
+            row.snapshot = steps
+            row.delta = None
+            row.delta_parent_id = None
+            row.chain_base_id = None
+            row.chain_depth = 0
+            batch.append(row)
+
+            if len(batch) >= 500:
+                _flush(CareerRoadmap, batch)
+
+        _flush(CareerRoadmap, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0010_careerroadmap_progress_counters'),
+    ]
+
+    operations = [
+        # `roadmap` becomes a property; the column keeps its name and
+        # now only holds full snapshots.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='careerroadmap',
+                    name='roadmap',
+                    field=models.JSONField(blank=True, null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='careerroadmap',
+                    name='roadmap',
+                ),
+                migrations.AddField(
+                    model_name='careerroadmap',
+                    name='snapshot',
+                    field=models.JSONField(blank=True, db_column='roadmap', null=True),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='chain_base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='career.careerroadmap'),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='chain_depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='delta',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='delta_parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='delta_children', to='career.careerroadmap'),
+        ),
+        migrations.RunPython(compress_history, expand_history),
+    ]
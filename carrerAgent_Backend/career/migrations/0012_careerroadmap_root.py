@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_roots(apps, schema_editor):
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+
+    roots, batch = {}, []  # id -> root id (None for roots)
+    rows = CareerRoadmap.objects.order_by('id').only('id', 'parent_id')
+    for row in rows.iterator(chunk_size=500):
+        parent = row.parent_id
+        roots[row.id] = (roots.get(parent) or parent) if parent else None
+        if roots[row.id]:
+            row.root_id = roots[row.id]
+            batch.append(row)
+
+        if len(batch) >= 500:
+            CareerRoadmap.objects.bulk_update(batch, ['root'])
+            batch = []
+
+    CareerRoadmap.objects.bulk_update(batch, ['root'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0011_careerroadmap_delta_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerroadmap',
+            name='root',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='career.careerroadmap'),
+        ),
+        migrations.RunPython(backfill_roots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0012_careerroadmap_root'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivedArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('args_hash', models.CharField(max_length=64)),
+                ('args', models.JSONField(default=dict)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('roadmap', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='career.careerroadmap')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('roadmap', 'kind', 'content_hash', 'args_hash'), name='derived_artifact_key')],
+            },
+        ),
+    ]
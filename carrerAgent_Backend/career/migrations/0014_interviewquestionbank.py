@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0013_derivedartifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewQuestionBank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('career_key', models.CharField(max_length=100, unique=True)),
+                ('career_name', models.CharField(max_length=100)),
+                ('questions', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from career.names import career_key
+
+
+def backfill_name_keys(apps, schema_editor):
+    RoadmapReference = apps.get_model('career', 'RoadmapReference')
+
+    batch = []
+    for ref in RoadmapReference.objects.only('id', 'name').iterator(chunk_size=500):
+        ref.name_key = career_key(ref.name)
+        batch.append(ref)
+
+        if len(batch) >= 500:
+            RoadmapReference.objects.bulk_update(batch, ['name_key'])
+            batch = []
+
+    RoadmapReference.objects.bulk_update(batch, ['name_key'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0015_generationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmapreference',
+            name='name_key',
+            field=models.CharField(db_index=True, default='', max_length=100),
+        ),
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='CareerAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reference', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='career.roadmapreference')),
+            ],
+        ),
+    ]
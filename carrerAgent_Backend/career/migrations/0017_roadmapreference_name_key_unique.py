@@ -0,0 +1,45 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+from career.names import career_key
+
+
+def merge_duplicate_keys(apps, schema_editor):
+    # Spellings stored before name_key existed ("Backend Developer" /
+    # "backend developer") collapse onto the oldest row
+    RoadmapReference = apps.get_model('career', 'RoadmapReference')
+    CareerRoadmap = apps.get_model('career', 'CareerRoadmap')
+    CareerAlias = apps.get_model('career', 'CareerAlias')
+
+    # 0016 gave names made only of noise words ("Roadmap", "Career
+    # Path") an empty key; they are distinct careers, not duplicates
+    for ref in RoadmapReference.objects.filter(name_key=''):
+        ref.name_key = career_key(ref.name)
+        ref.save(update_fields=['name_key'])
+
+    duplicates = (
+        RoadmapReference.objects.values('name_key')
+        .annotate(count=Count('id'), keep=Min('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        others = RoadmapReference.objects.filter(name_key=row['name_key']).exclude(pk=row['keep'])
+        CareerRoadmap.objects.filter(reference__in=others).update(reference_id=row['keep'])
+        CareerAlias.objects.filter(reference__in=others).update(reference_id=row['keep'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0016_roadmapreference_name_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='roadmapreference',
+            name='name_key',
+            field=models.CharField(default='', max_length=100, unique=True),
+        ),
+    ]
@@ -1,10 +1,37 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.conf import settings  # use this instead of auth.User
 
+from .deltas import apply_delta, get_config as storage_config, make_delta, rebuild, worth_storing
+from .names import career_key
+
+def progress_counts(progress):
+    """Denormalized counters for a progress dict (see CareerRoadmap.progress_*)."""
+    statuses = list((progress or {}).values())
+    return {
+        "progress_total": len(statuses),
+        "progress_completed": statuses.count("completed"),
+        "progress_in_progress": statuses.count("in_progress"),
+        "progress_skipped": statuses.count("skipped"),
+    }
+
+
 class CareerRoadmap(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)  # FIXED
     career_name = models.CharField(max_length=100)
-    roadmap = models.JSONField()
+    # Steps are stored as a full `snapshot` or as a `delta` against
+    # `delta_parent` (deltas.py); `chain_base` is the snapshot a delta
+    # chain starts from. Read and assign them through `.roadmap`.
+    snapshot = models.JSONField(null=True, blank=True, db_column="roadmap")
+    delta = models.JSONField(null=True, blank=True)
+    delta_parent = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.RESTRICT, related_name="delta_children"
+    )
+    chain_base = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.RESTRICT, related_name="+"
+    )
+    chain_depth = models.PositiveSmallIntegerField(default=0)
     preferences = models.JSONField(default=dict)
     reference = models.ForeignKey(
         'RoadmapReference', on_delete=models.SET_NULL, null=True, blank=True
@@ -14,21 +41,295 @@ class CareerRoadmap(models.Model):
     parent = models.ForeignKey(
         "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="children"
     )
+    # First version of the lineage (null on the root itself): the whole
+    # version tree is `pk=root OR root=root`, one indexed query.
+    root = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
     progress = models.JSONField(default=dict)
+    progress_revision = models.PositiveIntegerField(default=0)  # CAS token, see progress.py
+    # Kept in step with `progress` by save() and progress.apply_progress()
+    progress_total = models.PositiveIntegerField(default=0)
+    progress_completed = models.PositiveIntegerField(default=0)
+    progress_in_progress = models.PositiveIntegerField(default=0)
+    progress_skipped = models.PositiveIntegerField(default=0)
     is_deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Latest live version per (user, career): preview / save-version
+            models.Index(
+                fields=["user", "career_name", "-version"],
+                condition=models.Q(is_deleted=False),
+                name="roadmap_user_career_ver_idx",
+            ),
+            # my-roadmaps/ keyset pagination: newest first per user
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(is_deleted=False),
+                name="roadmap_user_created_idx",
+            ),
+        ]
+
+    STORAGE_FIELDS = ("snapshot", "delta", "delta_parent", "chain_base", "chain_depth")
+
+    # ---------- roadmap content (reconstructed on read) ----------
+    @property
+    def roadmap(self):
+        return self.load_roadmap()
+
+    @roadmap.setter
+    def roadmap(self, value):
+        self.__dict__["_roadmap"] = value
+        self.__dict__["_roadmap_dirty"] = True
+
+    def _chain_rows(self):
+        """The whole snapshot group of this row: one indexed query."""
+        return (
+            CareerRoadmap.objects
+            .filter(models.Q(pk=self.chain_base_id) | models.Q(chain_base_id=self.chain_base_id))
+            .values("id", "snapshot", "delta", "delta_parent_id")
+        )
+
+    def _rebuild(self, group):
+        if self.snapshot is not None or self.delta_parent_id is None:
+            return self.snapshot
+
+        rows = {row["id"]: row for row in group}
+        rows[self.pk] = {"snapshot": None, "delta": self.delta, "delta_parent_id": self.delta_parent_id}
+        return rebuild(self.pk, rows)
+
+    def load_roadmap(self):
+        if "_roadmap" not in self.__dict__:
+            group = self._chain_rows() if self.snapshot is None and self.delta_parent_id else []
+            self.__dict__["_roadmap"] = self._rebuild(list(group))
+        return self.__dict__["_roadmap"]
+
+    async def aload_roadmap(self):
+        """load_roadmap() for async views (the ORM can't be hit synchronously there)."""
+        if "_roadmap" not in self.__dict__:
+            group = []
+            if self.snapshot is None and self.delta_parent_id:
+                group = [row async for row in self._chain_rows()]
+            self.__dict__["_roadmap"] = self._rebuild(group)
+        return self.__dict__["_roadmap"]
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or set(fields) & {"snapshot", "delta", "delta_parent", "delta_parent_id"}:
+            self.__dict__.pop("_roadmap", None)
+            self.__dict__.pop("_roadmap_dirty", None)
+
+    # ---------- roadmap content (stored on save) ----------
+    def _store_new(self, content):
+        candidate = self.delta_parent or self.parent
+        if candidate is not None and candidate.chain_depth + 1 < storage_config()["SNAPSHOT_EVERY"]:
+            delta = make_delta(candidate.load_roadmap(), content)
+            if worth_storing(delta, content):
+                self.snapshot = None
+                self.delta = delta
+                self.delta_parent = candidate
+                self.chain_base_id = candidate.chain_base_id or candidate.pk
+                self.chain_depth = candidate.chain_depth + 1
+                return
+
+        self.snapshot = content
+        self.delta = None
+        self.delta_parent = None
+        self.chain_base = None
+        self.chain_depth = 0
+
+    def _store_existing(self, content):
+        """
+        Overwrite in place. The row keeps its chain position, and rows
+        stored as deltas against it are re-diffed so they still rebuild
+        to the same content. Returns the (id, delta) updates for those.
+        """
+        children = list(CareerRoadmap.objects.filter(delta_parent_id=self.pk).values("id", "delta"))
+        rebased = []
+        if children:
+            old = CareerRoadmap.objects.get(pk=self.pk).load_roadmap()
+            rebased = [
+                (child["id"], make_delta(content, apply_delta(old, child["delta"])))
+                for child in children
+            ]
+
+        if self.delta_parent_id:
+            self.snapshot = None
+            self.delta = make_delta(self.delta_parent.load_roadmap(), content)
+        else:
+            self.snapshot = content
+            self.delta = None
+        return rebased
+
+    def save(self, *args, **kwargs):
+        for field, value in progress_counts(self.progress).items():
+            setattr(self, field, value)
+
+        if self._state.adding and self.parent_id:
+            self.root_id = self.parent.root_id or self.parent_id
+
+        if not self.__dict__.pop("_roadmap_dirty", False):
+            return super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = (set(update_fields) - {"roadmap"}) | set(self.STORAGE_FIELDS)
+
+        content = self.__dict__["_roadmap"]
+        with transaction.atomic():
+            if self._state.adding:
+                self._store_new(content)
+                rebased = []
+            else:
+                rebased = self._store_existing(content)
+
+            super().save(*args, **kwargs)
+
+            for child_id, delta in rebased:
+                CareerRoadmap.objects.filter(pk=child_id).update(delta=delta)
+
     def __str__(self):
         return f"{self.user.username} - {self.career_name} (v{self.version})"
 
+
+class LatestRoadmapVersion(models.Model):
+    """
+    Pointer to the newest live CareerRoadmap per (user, career_name),
+    maintained by career/versions.py so the preview path is one
+    indexed read instead of a sort over the version history.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    career_name = models.CharField(max_length=100)
+    roadmap = models.ForeignKey(CareerRoadmap, on_delete=models.CASCADE, related_name="+")
+    version = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "career_name"], name="latest_roadmap_per_career"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.career_name} -> v{self.version}"
+
 class RoadmapReference(models.Model):
     name = models.CharField(max_length=100, unique=True)
     content = models.JSONField()
     source_url = models.URLField(blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True)
     auto_refresh_at = models.DateTimeField(null=True, blank=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    name_key = models.CharField(max_length=100, unique=True, default="")  # career_key(name), see names.py
+
+    def save(self, *args, **kwargs):
+        self.name_key = career_key(self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
+
+class CareerAlias(models.Model):
+    """Another spelling of a reference's career (keyed by career_key), see references.resolve_reference."""
+    alias = models.CharField(max_length=100, unique=True)
+    reference = models.ForeignKey(RoadmapReference, on_delete=models.CASCADE, related_name="aliases")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.alias} -> {self.reference_id}"
+
+class LLMCacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=200)
+    response = models.TextField()
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.model} - {self.key[:12]}"
+
+
+class DerivedArtifact(models.Model):
+    """LLM output derived from one roadmap version (skill gap, weekly plan, ...), see artifacts.py."""
+    roadmap = models.ForeignKey(CareerRoadmap, on_delete=models.CASCADE, related_name="artifacts")
+    kind = models.CharField(max_length=32)
+    content_hash = models.CharField(max_length=64)
+    args_hash = models.CharField(max_length=64)
+    args = models.JSONField(default=dict)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["roadmap", "kind", "content_hash", "args_hash"], name="derived_artifact_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} - roadmap {self.roadmap_id}"
+
+
+class InterviewQuestionBank(models.Model):
+    """Mock interview questions shared by every roadmap of one career, see question_bank.py."""
+    career_key = models.CharField(max_length=100, unique=True)  # normalized career name
+    career_name = models.CharField(max_length=100)
+    questions = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.career_name} ({len(self.questions)} questions)"
+
+
+class GenerationJob(models.Model):
+    """A queued LLM generation (preview / regenerate / chat), run by career/jobs.py workers."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUSES = [(s, s) for s in (QUEUED, RUNNING, SUCCEEDED, FAILED)]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=32)
+    params = models.JSONField(default=dict)
+    dedupe_key = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Worker poll: next runnable job
+            models.Index(
+                fields=["run_after"],
+                condition=models.Q(status="queued"),
+                name="generation_job_queue_idx",
+            ),
+        ]
+        constraints = [
+            # At most one live job per identical request
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="generation_job_live_dedupe",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} ({self.status})"
@@ -0,0 +1,209 @@
+# names.py
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+
+# ============================================================
+# Career name normalization
+#
+# "Backend Dev", "backend-developer" and "Back End Engineer" are one
+# career. career_key() folds case, accents, punctuation, spacing and
+# common synonyms into a single key; it is what RoadmapReference,
+# CareerAlias, the single-flight keys and the question bank match on.
+# Pure string code (no models), so models.py can import it.
+# ============================================================
+MAX_KEY_LENGTH = 100
+
+# Multi-word spellings, matched after punctuation is split to spaces
+PHRASES = {
+    "back end": "backend",
+    "front end": "frontend",
+    "full stack": "fullstack",
+    "dev sec ops": "devsecops",
+    "dev ops": "devops",
+    "machine learning": "ml",
+    "artificial intelligence": "ai",
+    "quality assurance": "qa",
+    "site reliability": "sre",
+    "node js": "nodejs",
+    "react js": "react",
+    "vue js": "vue",
+    "c sharp": "c#",
+}
+
+# Single-word synonyms and abbreviations
+TOKENS = {
+    "dev": "developer",
+    "devs": "developer",
+    "developers": "developer",
+    "engineer": "developer",
+    "engineers": "developer",
+    "eng": "developer",
+    "programmer": "developer",
+    "coder": "developer",
+    "swe": "software developer",
+    "js": "javascript",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "sr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+}
+
+# Words that never tell two careers apart
+NOISE = frozenset({"a", "an", "the", "to", "how", "become", "career", "path", "roadmap"})
+
+# Role words a fuzzy match may ignore ("Backend" ~ "Backend Developer")
+GENERIC = frozenset({"developer"})
+
+_PHRASE_RE = re.compile(r"\b(" + "|".join(sorted(PHRASES, key=len, reverse=True)) + r")\b")
+_SEPARATORS_RE = re.compile(r"[^a-z0-9+#]+")
+
+
+def career_key(career_name):
+    """Canonical lookup key: career_key("Back-End Engineer") == "backend developer"."""
+    text = unicodedata.normalize("NFKD", career_name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _SEPARATORS_RE.sub(" ", text.replace("&", " and "))
+    text = _PHRASE_RE.sub(lambda m: PHRASES[m.group(1)], " ".join(text.split()))
+
+    tokens = []
+    for token in text.split():
+        tokens.extend(TOKENS.get(token, token).split())
+
+    # A name made only of noise ("Career Path") or punctuation keeps
+    # what it has: "" would make every such name one career
+    key = " ".join(t for t in tokens if t not in NOISE)
+    if not key:
+        key = " ".join(tokens) or " ".join((career_name or "").lower().split())
+    return key[:MAX_KEY_LENGTH]
+
+
+# ============================================================
+# Fuzzy matching (typos: "Bakend Developer")
+#
+# A trigram inverted index over career keys narrows a lookup to the
+# few keys sharing the most trigrams; those are then scored word by
+# word, so "java" never matches "javascript" just because the rest
+# of the name is the same. A word within its typo budget (by length,
+# none under 4 letters, never a different number: "web" / "web3")
+# scores by edit distance, anything else by trigram overlap.
+# ============================================================
+_DIGITS_RE = re.compile(r"\D+")
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def max_edits(word):
+    return 0 if len(word) < 4 else 1 if len(word) < 7 else 2
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (a swap of two letters is one edit)."""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+@lru_cache(maxsize=65536)
+def similarity(a, b):
+    if a == b:
+        return 1.0
+    budget = max_edits(min(a, b, key=len))
+    if abs(len(a) - len(b)) <= budget and _DIGITS_RE.sub("", a) == _DIGITS_RE.sub("", b):
+        edits = edit_distance(a, b)
+        if edits <= budget:
+            return 1 - edits / max(len(a), len(b))
+
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+@lru_cache(maxsize=4096)
+def is_generic(token):
+    # Misspelled role words ("develoer") are still role words
+    return token in GENERIC or any(similarity(token, word) >= 0.5 for word in GENERIC)
+
+
+def core_tokens(key):
+    return [token for token in key.split() if not is_generic(token)]
+
+
+def token_score(query, candidate, token_threshold):
+    """Mean word similarity, or 0 unless every word pairs with one of the candidate's."""
+    if len(query) != len(candidate):
+        return 0.0
+
+    unused = list(candidate)
+    total = 0.0
+    for word in query:
+        score, best = max((similarity(word, other), other) for other in unused)
+        if score < token_threshold:
+            return 0.0
+        unused.remove(best)
+        total += score
+    return total / len(query)
+
+
+class TrigramIndex:
+    """In-memory trigram index of (id, career key) pairs."""
+
+    def __init__(self, entries=(), candidates=20):
+        self.candidates = candidates
+        self._tokens = {}
+        self._postings = defaultdict(set)
+        for pk, key in entries:
+            self.add(pk, key)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def add(self, pk, key):
+        tokens = core_tokens(key)
+        if not tokens:
+            return
+        self._tokens[pk] = tokens
+        for token in tokens:
+            for gram in trigrams(token):
+                self._postings[gram].add(pk)
+
+    def search(self, key, threshold=0.6, token_threshold=0.4, margin=0.1):
+        """
+        (id, score) of the closest key scoring at least `threshold`, or
+        None. The match must beat the best key with other words by
+        `margin`: near-ties are not guessed.
+        """
+        tokens = core_tokens(key)
+        if not tokens:
+            return None
+
+        shared = Counter()
+        for gram in set().union(*(trigrams(token) for token in tokens)):
+            shared.update(self._postings.get(gram, ()))
+
+        scored = sorted(
+            ((token_score(tokens, self._tokens[pk], token_threshold), -pk) for pk, _ in shared.most_common(self.candidates)),
+            reverse=True,
+        )
+        if not scored or scored[0][0] < threshold:
+            return None
+
+        score, pk = scored[0][0], -scored[0][1]
+        runner_up = next((s for s, other in scored[1:] if self._tokens[-other] != self._tokens[pk]), 0.0)
+        if score - runner_up < margin:
+            return None
+        return pk, score
@@ -0,0 +1,67 @@
+# pagination.py
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# ============================================================
+# Keyset (cursor) pagination on (created_at, id), newest first
+#
+# The cursor is the (created_at, id) of the last row served, so
+# each page is an index range read of `limit` rows no matter how
+# deep the client has scrolled (no OFFSET, no COUNT).
+# ============================================================
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = parse_datetime(created_at)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if created_at is None or not isinstance(pk, int):
+        raise InvalidCursor("Invalid cursor")
+    return created_at, pk
+
+
+def parse_limit(value):
+    try:
+        limit = int(value) if value else DEFAULT_LIMIT
+    except ValueError:
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def keyset_page(qs, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    `qs` must be a .values() queryset that includes "id" and "created_at".
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    qs = qs.order_by("-created_at", "-id")
+
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(qs[:limit + 1])  # one extra row tells us whether there's a next page
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last["created_at"], last["id"])
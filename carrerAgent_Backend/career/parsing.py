@@ -0,0 +1,266 @@
+# parsing.py
+import json
+import re
+
+
+# ============================================================
+# Incremental, truncation-tolerant JSON parser for LLM output
+#
+# Handles what the model actually sends back:
+#   - ```json fences and chatter before the first { or [
+#   - trailing garbage after the top-level value closes
+#   - output cut off by max_tokens (keeps every COMPLETE member)
+#   - trailing / missing commas, raw newlines inside strings,
+#     Python literals (True / False / None)
+#
+# The same parser serves the streaming path (feed() chunk by chunk,
+# completed members come back as they close) and the non-streaming
+# path (parse_json_lenient on the full text).
+# ============================================================
+LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None,
+}
+
+STRING_SPECIAL = re.compile(r'["\\]')
+SCALAR_CHARS = re.compile(r"[^\s,:\]\}\[\{\"]+")
+
+_MISSING = object()
+
+
+class _Frame:
+    __slots__ = ("container", "parent_key", "key", "expect_key")
+
+    def __init__(self, container, parent_key):
+        self.container = container
+        self.parent_key = parent_key
+        self.key = None
+        self.expect_key = isinstance(container, dict)
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.root = _MISSING
+        self.done = False
+        self._stack = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_buf = []
+        self._scalar_buf = ""
+        self._members = []
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def feed(self, chunk):
+        """
+        Consume the next chunk of model output.
+        Returns the (key, value) object members completed by this chunk.
+        """
+        self._members = []
+        if not self.done and chunk:
+            self._scan(chunk)
+        return self._members
+
+    def result(self):
+        """Best-effort value parsed so far (None if nothing usable)."""
+        return None if self.root is _MISSING else self.root
+
+    # --------------------------------------------------------
+    # Scanner
+    # --------------------------------------------------------
+    def _scan(self, text):
+        i = 0
+        n = len(text)
+
+        if not self._started:
+            starts = [p for p in (text.find("{"), text.find("[")) if p != -1]
+            if not starts:
+                return
+            i = min(starts)
+            self._started = True
+
+        while i < n and not self.done:
+            if self._in_string:
+                i = self._scan_string(text, i)
+                continue
+
+            ch = text[i]
+
+            if self._scalar_buf and not SCALAR_CHARS.match(ch):
+                self._finish_scalar()
+                if self.done:
+                    return
+
+            if ch == '"':
+                self._in_string = True
+                self._string_buf = []
+                i += 1
+            elif ch == "{" or ch == "[":
+                self._open({} if ch == "{" else [])
+                i += 1
+            elif ch == "}" or ch == "]":
+                self._close()
+                i += 1
+            elif ch in " \t\r\n,:":
+                i += 1
+            else:
+                match = SCALAR_CHARS.match(text, i)
+                self._scalar_buf += match.group(0)
+                i = match.end()
+
+    def _scan_string(self, text, i):
+        if self._escape:
+            self._string_buf.append(text[i])
+            self._escape = False
+            return i + 1
+
+        match = STRING_SPECIAL.search(text, i)
+        if match is None:
+            self._string_buf.append(text[i:])
+            return len(text)
+
+        j = match.start()
+        self._string_buf.append(text[i:j])
+
+        if text[j] == "\\":
+            self._string_buf.append("\\")
+            self._escape = True
+            return j + 1
+
+        self._in_string = False
+        raw = "".join(self._string_buf)
+        try:
+            value = json.loads(f'"{raw}"', strict=False)
+        except ValueError:
+            value = raw
+        self._on_string(value)
+        return j + 1
+
+    # --------------------------------------------------------
+    # Tree building
+    # --------------------------------------------------------
+    def _on_string(self, value):
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame.expect_key:
+            frame.key = value
+            frame.expect_key = False
+        else:
+            self._attach(value)
+
+    def _finish_scalar(self):
+        token = self._scalar_buf
+        self._scalar_buf = ""
+
+        if token in LITERALS:
+            value = LITERALS[token]
+        else:
+            try:
+                value = json.loads(token)
+            except ValueError:
+                return  # unquoted junk — skip it
+        self._attach(value)
+
+    def _attach(self, value):
+        if not self._stack:
+            self.root = value
+            self.done = True
+            return
+
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            if frame.key is None:
+                return  # value without a key — drop it
+            frame.container[frame.key] = value
+            self._members.append((frame.key, value))
+            frame.key = None
+            frame.expect_key = True
+        else:
+            frame.container.append(value)
+
+    def _open(self, container):
+        parent_key = None
+
+        if not self._stack:
+            self.root = container
+        else:
+            frame = self._stack[-1]
+            if isinstance(frame.container, dict):
+                if frame.key is None:
+                    # Malformed: container where a key belongs; parse it
+                    # into a detached frame so the brackets stay balanced.
+                    self._stack.append(_Frame(container, None))
+                    return
+                parent_key = frame.key
+                frame.container[frame.key] = container
+                frame.key = None
+                frame.expect_key = True
+            else:
+                frame.container.append(container)
+
+        self._stack.append(_Frame(container, parent_key))
+
+    def _close(self):
+        if not self._stack:
+            return
+
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+        elif frame.parent_key is not None:
+            self._members.append((frame.parent_key, frame.container))
+
+
+def parse_json_lenient(text, default=None):
+    """
+    Parse a full LLM answer. Strict json.loads first (fast path),
+    then the tolerant parser. Returns default if nothing usable.
+    """
+    if not text:
+        return default
+
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    result = parser.result()
+    return default if result is None else result
+
+
+# ============================================================
+# Roadmap shape helpers
+# ============================================================
+STEP_KEY = re.compile(r"^Step \d+$", re.IGNORECASE)
+
+
+def is_step_key(key):
+    return isinstance(key, str) and bool(STEP_KEY.match(key.strip()))
+
+
+def extract_steps(data):
+    """
+    Pull the {"Step N": "..."} mapping out of whatever shape the model
+    returned: {"steps": {...}}, {"roadmap": {"steps": {...}}} or the
+    bare step mapping.
+    """
+    if not isinstance(data, dict):
+        return None
+
+    steps = data.get("steps")
+    if isinstance(steps, dict):
+        return steps
+
+    if data and any(is_step_key(k) for k in data):
+        return {k: v for k, v in data.items() if is_step_key(k)}
+
+    for value in data.values():
+        if isinstance(value, dict):
+            nested = extract_steps(value)
+            if nested:
+                return nested
+
+    return None
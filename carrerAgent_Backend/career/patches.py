@@ -0,0 +1,154 @@
+# patches.py
+import logging
+
+from .chat_context import expand_update
+from .parsing import is_step_key
+
+
+# ============================================================
+# Step-level roadmap patches from chat
+#
+# Instead of re-emitting the whole roadmap for a change, the chat
+# model answers with a few operations on the current steps:
+#
+#   {"op": "replace", "step": "Step 2", "text": "..."}
+#   {"op": "insert",  "after": "Step 3", "text": "..."}   (after: null -> first)
+#   {"op": "delete",  "step": "Step 5"}
+#   {"op": "reorder", "order": ["Step 2", "Step 1", ...]}
+#
+# Step names always refer to the roadmap the model was shown. The
+# server applies the operations and renumbers "Step N" keys, so the
+# client still gets a complete candidate_roadmap to apply.
+# ============================================================
+OPS = ("replace", "insert", "delete", "reorder")
+
+PATCH_FAILED = "I couldn't apply that change: {}. Your roadmap was not modified."
+
+logger = logging.getLogger(__name__)
+
+
+class PatchError(ValueError):
+    def __init__(self, message, op=None):
+        super().__init__(message)
+        self.op = op
+
+
+def _text(op):
+    text = op.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise PatchError("Missing step text", op)
+    return text.strip()
+
+
+def _position(items, name, op):
+    # Inserted steps are stored under None: a missing name must not find them
+    if not isinstance(name, str):
+        raise PatchError(f"Step name required, got {name!r}", op)
+    for i, (step, _) in enumerate(items):
+        if step == name:
+            return i
+    raise PatchError(f"Unknown step: {name}", op)
+
+
+def _reorder(items, order, op):
+    if not isinstance(order, list):
+        raise PatchError("reorder needs an order list", op)
+    rank = {}
+    for name in order:
+        _position(items, name, op)
+        rank.setdefault(name, len(rank))
+
+    # Inserted steps move together with the step they follow (leading
+    # inserts with the step they precede); steps the order leaves out
+    # go last, in their current order
+    groups, leading = [], []
+    for item in items:
+        if item[0] is None:
+            (groups[-1][1] if groups else leading).append(item)
+        else:
+            groups.append((item[0], leading + [item]))
+            leading = []
+    groups.sort(key=lambda group: rank.get(group[0], len(rank)))
+    return [item for _, group in groups for item in group] + leading
+
+
+def _names(roadmap, items):
+    if all(is_step_key(step) for step in roadmap):
+        return [f"Step {i}" for i in range(1, len(items) + 1)]
+
+    # Custom step names are kept; new steps get the next free "Step N"
+    names, used = [], set(roadmap)
+    for step, _ in items:
+        if step is None:
+            n = len(names) + 1
+            while f"Step {n}" in used:
+                n += 1
+            step = f"Step {n}"
+            used.add(step)
+        names.append(step)
+    return names
+
+
+def apply_patch(roadmap, ops):
+    """New {step: text} from applying `ops` to `roadmap` (not modified). Raises PatchError."""
+    if not isinstance(ops, list) or not ops:
+        raise PatchError("Empty patch")
+
+    items = [[step, text] for step, text in roadmap.items()]  # step None: inserted
+
+    for op in ops:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind not in OPS:
+            raise PatchError(f"Unknown operation: {kind}", op)
+
+        if kind == "replace":
+            items[_position(items, op.get("step"), op)][1] = _text(op)
+
+        elif kind == "delete":
+            del items[_position(items, op.get("step"), op)]
+
+        elif kind == "insert":
+            text = _text(op)
+            if op.get("before"):
+                at = _position(items, op["before"], op)
+            elif op.get("after"):
+                at = _position(items, op["after"], op) + 1
+                while at < len(items) and items[at][0] is None:  # keep several inserts in order
+                    at += 1
+            elif "after" in op:
+                at = 0
+            else:
+                at = len(items)
+            items.insert(at, [None, text])
+
+        else:
+            items = _reorder(items, op.get("order"), op)
+
+    if not items:
+        raise PatchError("Patch leaves an empty roadmap")
+
+    return dict(zip(_names(roadmap, items), (text for _, text in items)))
+
+
+def resolve_chat_answer(result, roadmap):
+    """
+    A chat answer with the full `updated_roadmap` clients expect:
+    a "patch" is applied to `roadmap`, a full updated_roadmap has its
+    UNCHANGED placeholders expanded. A patch that doesn't apply is
+    dropped, and the message says so instead of claiming the change.
+    """
+    if not isinstance(result, dict) or "patch" not in result:
+        return expand_update(result, roadmap)
+
+    answer = {key: value for key, value in result.items() if key != "patch"}
+    if not result["patch"]:
+        return expand_update(answer, roadmap)
+
+    try:
+        answer["updated_roadmap"] = apply_patch(roadmap, result["patch"])
+    except PatchError as e:
+        logger.warning("Chat patch error: %s", e)
+        if "updated_roadmap" not in answer:
+            answer["message"] = PATCH_FAILED.format(e)
+        return expand_update(answer, roadmap)
+    return answer
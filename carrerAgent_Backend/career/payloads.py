@@ -0,0 +1,50 @@
+# payloads.py
+
+# ============================================================
+# Response bodies shared by the views and the background jobs
+# (jobs.py), so a polled job result is exactly what the
+# synchronous endpoint would have returned.
+# ============================================================
+def preview_payload(user_id, career_name, steps, reference):
+    return {
+        "roadmap": {
+            "name": career_name,
+            "steps": steps,
+            "progress": {step: "not_started" for step in steps.keys()},
+            "source_url": reference.source_url if reference else None,
+            "preview": True,
+            "version": None,
+            "personalized_for": str(user_id)
+        },
+        "saved": False,
+        "source": "preview"
+    }
+
+
+def chat_payload(ai_response):
+    updated = ai_response.get("updated_roadmap")
+
+    # If AI edited roadmap, return candidate roadmap (NOT SAVED)
+    if updated:
+        return {
+            "message": ai_response.get("message"),
+            "updated": True,
+            "candidate_roadmap": updated,
+            "pending_save": True
+        }
+
+    # Normal chat response
+    return {
+        "message": ai_response.get("message"),
+        "updated": False,
+        "pending_save": False
+    }
+
+
+def regenerate_payload(new_entry):
+    return {
+        "message": "New version created",
+        "version": new_entry.version,
+        "steps": new_entry.roadmap,
+        "progress": new_entry.progress
+    }
@@ -0,0 +1,74 @@
+# progress.py
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CareerRoadmap, progress_counts
+
+
+# ============================================================
+# Atomic progress writes
+#
+# A progress change only ever touches the `progress` column (plus
+# its revision, counters and updated_at) and is applied with compare-and-swap
+# on `progress_revision`: read (progress, revision), merge the
+# changes, then UPDATE ... WHERE revision = <read revision>. If a
+# concurrent write got in first the UPDATE matches no row and the
+# merge is redone on the fresh value, so no click is ever lost.
+# ============================================================
+STATUSES = ("not_started", "in_progress", "completed", "skipped")
+MAX_ATTEMPTS = 10
+
+
+class ProgressError(ValueError):
+    def __init__(self, message, step=None):
+        super().__init__(message)
+        self.step = step
+
+
+class ProgressConflict(RuntimeError):
+    pass
+
+
+def validate_changes(changes, steps):
+    if not isinstance(changes, dict) or not changes:
+        raise ProgressError("No progress changes")
+
+    for step, status in changes.items():
+        if step not in steps:
+            raise ProgressError("Invalid step", step)
+        if status not in STATUSES:
+            raise ProgressError("Invalid status", step)
+
+
+def apply_progress(roadmap_id, changes, steps=None):
+    """
+    Merge {step: status} into the roadmap's progress in one write.
+    `steps` (the roadmap's step names) is used for validation when given.
+    Returns the new progress dict.
+    """
+    if steps is not None:
+        validate_changes(changes, steps)
+
+    for _ in range(MAX_ATTEMPTS):
+        current = (
+            CareerRoadmap.objects
+            .filter(pk=roadmap_id)
+            .values("progress", "progress_revision")
+            .first()
+        )
+        if current is None:
+            raise CareerRoadmap.DoesNotExist
+
+        progress = {**current["progress"], **changes}
+        updated = CareerRoadmap.objects.filter(
+            pk=roadmap_id, progress_revision=current["progress_revision"]
+        ).update(
+            progress=progress,
+            progress_revision=F("progress_revision") + 1,
+            **progress_counts(progress),
+            updated_at=timezone.now(),  # update() skips auto_now
+        )
+        if updated:
+            return progress
+
+    raise ProgressConflict("Progress is being updated concurrently, try again")
@@ -0,0 +1,177 @@
+# question_bank.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from .ai import agenerate_ai_response, generate_ai_response
+from .models import InterviewQuestionBank
+from .names import career_key
+from .singleflight import SingleFlight
+
+
+# ============================================================
+# Shared interview question bank
+#
+# Mock interview questions only depend on the career, so they are
+# generated once per normalized career into a bank every user draws
+# random samples from. A bank is filled lazily on first use (or by
+# `manage.py warm_question_bank`), and topped up in the background
+# when it holds fewer than LOW_WATER questions.
+# ============================================================
+DEFAULTS = {
+    "TARGET_SIZE": 50,          # questions a full bank holds
+    "LOW_WATER": 25,            # below this a background top-up is started
+    "BATCH_SIZE": 25,           # questions asked for per LLM call
+    "SAMPLE_SIZE": 10,          # questions served per request
+    "BACKGROUND_TOPUP": True,
+}
+
+bank_flight = SingleFlight("question_bank")
+_topup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-bank")
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "QUESTION_BANK", {}))
+    return config
+
+
+def normalize_career(career_name):
+    # Same key as reference lookup: "Backend Dev" and "Back End Engineer" share a bank
+    return career_key(career_name)
+
+
+def _question_key(question):
+    return " ".join(question.lower().split()).rstrip("?")
+
+
+# ============================================================
+# Generation
+# ============================================================
+def build_questions_prompt(career_name, count, existing):
+    avoid = "\n".join(f"- {q}" for q in existing[-20:])
+    return f"""
+        Generate {count} distinct mock interview questions for:
+        {career_name}
+
+        Mix fundamentals, practical scenarios and system/design questions.
+        {"Do NOT repeat these:" if avoid else ""}
+        {avoid}
+
+        JSON:
+        {{
+            "questions": []
+        }}
+        """
+
+
+def parse_questions(result):
+    questions = result.get("questions") if isinstance(result, dict) else None
+    if not isinstance(questions, list):
+        return []
+    return [q.strip() for q in questions if isinstance(q, str) and q.strip()]
+
+
+def add_questions(career_name, questions):
+    """Merge new questions into the bank (deduped); returns the bank's questions."""
+    key = normalize_career(career_name)
+
+    with transaction.atomic():
+        bank = InterviewQuestionBank.objects.select_for_update().filter(career_key=key).first()
+        if bank is None:
+            try:
+                with transaction.atomic():
+                    bank = InterviewQuestionBank.objects.create(career_key=key, career_name=career_name)
+            except IntegrityError:
+                bank = InterviewQuestionBank.objects.select_for_update().get(career_key=key)
+
+        seen = {_question_key(q) for q in bank.questions}
+        for question in questions:
+            if _question_key(question) not in seen:
+                seen.add(_question_key(question))
+                bank.questions.append(question)
+
+        bank.save(update_fields=["questions", "updated_at"])
+        return bank.questions
+
+
+def fill_bank(career_name, target=None):
+    """Generate batches until the bank holds `target` questions (sync: commands, top-ups)."""
+    config = get_config()
+    target = target or config["TARGET_SIZE"]
+
+    bank = InterviewQuestionBank.objects.filter(career_key=normalize_career(career_name)).first()
+    existing = list(bank.questions) if bank else []
+
+    # A batch that adds nothing new means the model is repeating itself
+    while len(existing) < target:
+        count = min(config["BATCH_SIZE"], target - len(existing))
+        prompt = build_questions_prompt(career_name, count, existing)
+        new = parse_questions(generate_ai_response(prompt, use_cache=False))
+
+        merged = add_questions(career_name, new)
+        if len(merged) == len(existing):
+            break
+        existing = merged
+
+    return len(existing)
+
+
+def _topup(career_name):
+    try:
+        bank_flight.do(normalize_career(career_name), fill_bank, career_name)
+    except Exception as e:
+        print("Question bank top-up error:", e)
+    finally:
+        close_old_connections()
+
+
+def schedule_topup(career_name):
+    if get_config()["BACKGROUND_TOPUP"] and not bank_flight.in_flight(normalize_career(career_name)):
+        _topup_pool.submit(_topup, career_name)
+
+
+# ============================================================
+# Serving
+# ============================================================
+async def _afill_first_batch(career_name, existing):
+    prompt = build_questions_prompt(career_name, get_config()["BATCH_SIZE"], existing)
+    questions = parse_questions(await agenerate_ai_response(prompt, use_cache=False))
+    if questions:
+        await sync_to_async(add_questions)(career_name, questions)
+    return questions
+
+
+async def _abank_questions(key):
+    return await (
+        InterviewQuestionBank.objects
+        .filter(career_key=key)
+        .values_list("questions", flat=True)
+        .afirst()
+    ) or []
+
+
+async def asample_questions(career_name, count=None):
+    """
+    Random questions for the career; an LLM call only when the bank
+    is empty. A bank smaller than asked for serves what it has and is
+    filled up in the background.
+    """
+    config = get_config()
+    count = count or config["SAMPLE_SIZE"]
+    key = normalize_career(career_name)
+
+    questions = await _abank_questions(key)
+
+    if not questions:
+        # Cold bank: concurrent first requests share a single LLM call
+        await bank_flight.ado(key, _afill_first_batch, career_name, questions)
+        questions = await _abank_questions(key)
+
+    if len(questions) < max(config["LOW_WATER"], count):
+        schedule_topup(career_name)
+
+    return random.sample(questions, min(count, len(questions)))
@@ -0,0 +1,241 @@
+# references.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import CareerAlias, RoadmapReference
+from .names import TrigramIndex, career_key
+from .scraper import scrape_roadmap
+
+
+DEFAULTS = {
+    "INTERVAL": 7 * 24 * 60 * 60,   # re-scrape a reference after this many seconds
+    "RETRY_DELAY": 60 * 60,         # back-off after a failed re-scrape
+    "WORKERS": 4,                   # concurrent scrapes in the refresher
+    "POLL_INTERVAL": 5 * 60,        # refresher loop sleep
+}
+
+
+NAME_DEFAULTS = {
+    "FUZZY_THRESHOLD": 0.6,     # mean word similarity a typo match needs
+    "TOKEN_THRESHOLD": 0.4,     # ... and every single word
+    "FUZZY_MARGIN": 0.1,        # ... and its lead over the next-best career
+    "LEARN_ALIASES": True,      # store fuzzy hits as CareerAlias rows
+    "ALIAS_THRESHOLD": 0.8,     # ... only when they score at least this
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "REFERENCE_REFRESH", {}))
+    return config
+
+
+def names_config():
+    config = dict(NAME_DEFAULTS)
+    config.update(getattr(settings, "CAREER_NAMES", {}))
+    return config
+
+
+# ============================================================
+# Name resolution
+#
+# Every spelling of a career resolves to one reference:
+#   1. name_key == career_key(name)     (indexed column)
+#   2. CareerAlias.alias == key         (indexed, unique)
+#   3. closest key in a trigram index   (typos), remembered as an alias
+#      unless the match is borderline
+# The trigram index is built in memory from name_key and rebuilt
+# only when references are added or removed.
+# ============================================================
+_index = None
+_index_stamp = None
+_index_lock = threading.Lock()
+
+
+def reference_index():
+    global _index, _index_stamp
+    stamp = tuple(RoadmapReference.objects.aggregate(count=Count("id"), last=Max("id")).values())
+
+    if stamp != _index_stamp:
+        with _index_lock:
+            if stamp != _index_stamp:
+                _index = TrigramIndex(RoadmapReference.objects.order_by("id").values_list("id", "name_key"))
+                _index_stamp = stamp
+    return _index
+
+
+def add_alias(alias, reference):
+    """Point another spelling at `reference`; an existing alias is left as is."""
+    key = career_key(alias)
+    if not key or key == reference.name_key:
+        return
+    try:
+        CareerAlias.objects.get_or_create(alias=key, defaults={"reference": reference})
+    except IntegrityError:
+        pass  # a concurrent request learned it first
+
+
+def resolve_reference(career_name, fuzzy=True):
+    """The canonical reference for any spelling of `career_name`, or None."""
+    key = career_key(career_name)
+    if not key:
+        return None
+
+    reference = RoadmapReference.objects.filter(name_key=key).first()
+    if reference is not None:
+        return reference
+
+    alias = CareerAlias.objects.select_related("reference").filter(alias=key).first()
+    if alias is not None:
+        return alias.reference
+
+    if not fuzzy:
+        return None
+
+    config = names_config()
+    match = reference_index().search(
+        key, config["FUZZY_THRESHOLD"], config["TOKEN_THRESHOLD"], config["FUZZY_MARGIN"]
+    )
+    if match is None:
+        return None
+
+    reference = RoadmapReference.objects.filter(pk=match[0]).first()
+    if reference is not None and config["LEARN_ALIASES"] and match[1] >= config["ALIAS_THRESHOLD"]:
+        add_alias(career_name, reference)
+    return reference
+
+
+# ============================================================
+# Upsert
+# ============================================================
+def next_refresh_at():
+    return timezone.now() + timedelta(seconds=get_config()["INTERVAL"])
+
+
+def reference_fields(career_name, scraped):
+    """RoadmapReference column values for a scrape_roadmap() result."""
+    return {
+        "content": {
+            "name": scraped.get("name", career_name),
+            "steps": scraped.get("steps", {}),
+            "source_url": scraped.get("source_url"),
+        },
+        "source_url": scraped.get("source_url"),
+        "etag": scraped.get("etag") or "",
+        "last_modified": scraped.get("last_modified") or "",
+        "auto_refresh_at": next_refresh_at(),
+    }
+
+
+def save_reference(career_name, scraped):
+    """Upsert a scrape_roadmap() result and schedule its next refresh."""
+    fields = reference_fields(career_name, scraped)
+
+    reference = resolve_reference(career_name, fuzzy=False)
+    if reference is None:
+        try:
+            with transaction.atomic():
+                return RoadmapReference.objects.create(name=career_name, **fields)
+        except IntegrityError:
+            # Another worker inserted it first, maybe under another spelling
+            reference = RoadmapReference.objects.get(name_key=career_key(career_name))
+
+    for field, value in fields.items():
+        setattr(reference, field, value)
+    reference.save()
+    return reference
+
+
+def generation_name(career_name, reference):
+    """Career name for the roadmap prompt: every spelling of a known career shares one LLM cache entry."""
+    return reference.name if reference is not None else career_name
+
+
+# ============================================================
+# Request path: cached (even if stale) or scrape once
+# ============================================================
+def get_or_scrape_reference(career_name):
+    """
+    Return the stored reference, however old, so requests never
+    scrape when data exists. Only a true miss (no spelling of the
+    career is stored) scrapes synchronously; stale rows are left to
+    the refresher (refresh_references).
+    """
+    reference = resolve_reference(career_name)
+    if reference is not None:
+        return reference
+
+    scraped = scrape_roadmap(career_name)
+    if not scraped:
+        return None
+
+    return save_reference(career_name, scraped)
+
+
+def get_or_scrape_reference_in_thread(career_name):
+    """get_or_scrape_reference() for a pool thread: its connection is closed afterwards."""
+    close_old_connections()
+    try:
+        return get_or_scrape_reference(career_name)
+    finally:
+        close_old_connections()
+
+
+# ============================================================
+# Background refresh
+# ============================================================
+def due_references(limit=None, force=False):
+    qs = RoadmapReference.objects.order_by("auto_refresh_at")
+    if not force:
+        qs = qs.filter(Q(auto_refresh_at__lte=timezone.now()) | Q(auto_refresh_at__isnull=True))
+    return list(qs[:limit] if limit else qs)
+
+
+def refresh_reference(reference):
+    """Re-scrape one reference. Returns True on success."""
+    close_old_connections()
+    try:
+        scraped = scrape_roadmap(
+            reference.name,
+            etag=reference.etag or None,
+            last_modified=reference.last_modified or None,
+        )
+
+        if scraped and scraped.get("not_modified"):
+            # 304: content unchanged, skip parsing, just reschedule
+            RoadmapReference.objects.filter(pk=reference.pk).update(auto_refresh_at=next_refresh_at())
+            return True
+
+        if scraped:
+            save_reference(reference.name, scraped)
+            return True
+
+        # Keep serving the old content, try again later
+        retry_at = timezone.now() + timedelta(seconds=get_config()["RETRY_DELAY"])
+        RoadmapReference.objects.filter(pk=reference.pk).update(auto_refresh_at=retry_at)
+        return False
+    finally:
+        close_old_connections()
+
+
+def refresh_due_references(workers=None, limit=None, force=False):
+    """Refresh every due reference with at most `workers` scrapes in flight."""
+    workers = workers or get_config()["WORKERS"]
+    references = due_references(limit=limit, force=force)
+    if not references:
+        return {"due": 0, "refreshed": 0, "failed": []}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(refresh_reference, references))
+
+    return {
+        "due": len(references),
+        "refreshed": sum(results),
+        "failed": [ref.name for ref, ok in zip(references, results) if not ok],
+    }
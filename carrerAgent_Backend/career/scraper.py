@@ -1,43 +1,186 @@
 # scraper.py
+import threading
+
 import requests
-from bs4 import BeautifulSoup
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
+from .extract import extract_steps_from_html
+from .http_cache import ResponseCache
 
-def scrape_roadmap(career_name):
-    """
-    Scrape roadmap.sh for the given career name.
-    Returns a dict with steps and source_url.
-    """
-    try:
-        # Prepare URL format (replace spaces with hyphens)
-        career_slug = career_name.lower().replace(" ", "-")
-        url = f"https://roadmap.sh/{career_slug}"
 
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to fetch roadmap: {url}")
-            return None
+DEFAULTS = {
+    "BASE_URL": "https://roadmap.sh",
+    "CONNECT_TIMEOUT": 5,           # seconds
+    "READ_TIMEOUT": 15,             # seconds
+    "POOL_CONNECTIONS": 4,          # distinct hosts kept in the pool
+    "POOL_MAXSIZE": 16,             # keep-alive connections per host
+    "USER_AGENT": "CareerAgent/1.0 (+roadmap reference scraper)",
+    "CACHE_DIR": None,              # on-disk response cache, off when None
+    "CACHE_TTL": 60 * 60,           # serve disk copies younger than this without a request
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "SCRAPER", {}))
+    return config
+
+
+class ScrapeError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================
+# Shared pooled session (keep-alive across scrapes / threads)
+# ============================================================
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                config = get_config()
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config["POOL_CONNECTIONS"],
+                    pool_maxsize=config["POOL_MAXSIZE"],
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = config["USER_AGENT"]
+                _session = session
+
+    return _session
+
+
+def roadmap_url(career_name):
+    # Prepare URL format (replace spaces with hyphens)
+    career_slug = career_name.lower().replace(" ", "-")
+    return f"{get_config()['BASE_URL'].rstrip('/')}/{career_slug}"
+
+
+# ============================================================
+# Conditional fetch
+# Returns {"status": 200 | 304, "body", "etag", "last_modified"}.
+# 304 means the caller's copy (its etag / last_modified) is current.
+# ============================================================
+def fetch(url, etag=None, last_modified=None):
+    config = get_config()
+    cache = ResponseCache(config["CACHE_DIR"]) if config["CACHE_DIR"] else None
+    entry = cache.get(url) if cache else None
+
+    def result(status, source):
+        return {
+            "status": status,
+            "body": source["body"] if status == 200 else None,
+            "etag": source.get("etag"),
+            "last_modified": source.get("last_modified"),
+        }
+
+    # Recent disk copy: no network at all
+    if entry and ResponseCache.is_fresh(entry, config["CACHE_TTL"]):
+        if etag and etag == entry.get("etag"):
+            return result(304, entry)
+        return result(200, entry)
+
+    headers = {}
+    send_etag = etag or (entry or {}).get("etag")
+    send_modified = last_modified or (entry or {}).get("last_modified")
+    if send_etag:
+        headers["If-None-Match"] = send_etag
+    if send_modified:
+        headers["If-Modified-Since"] = send_modified
+
+    response = get_session().get(
+        url,
+        headers=headers,
+        timeout=(config["CONNECT_TIMEOUT"], config["READ_TIMEOUT"]),
+    )
+
+    if response.status_code == 304:
+        if etag or last_modified:
+            if cache and entry:
+                cache.touch(url)
+            return result(304, {"etag": send_etag, "last_modified": send_modified})
+        if entry:
+            return result(200, cache.touch(url))
+        raise ScrapeError(f"Unexpected 304 for {url}")
 
-        soup = BeautifulSoup(response.text, "html.parser")
+    if response.status_code != 200:
+        raise ScrapeError(
+            f"Failed to fetch roadmap: {url} ({response.status_code})",
+            status=response.status_code,
+        )
 
-        # Find all roadmap steps (example selector, adjust if HTML changes)
-        steps = {}
-        step_nodes = soup.find_all("li")  # roadmap.sh uses <li> for steps
-        for i, node in enumerate(step_nodes, start=1):
-            text = node.get_text(strip=True)
-            if text:
-                steps[f"Step {i}"] = text
+    fetched = {
+        "body": response.text,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    if cache:
+        cache.set(url, fetched["body"], fetched["etag"], fetched["last_modified"])
 
-        if not steps:
-            # fallback if no steps found
-            steps = {"Step 1": "Use online resources to learn fundamentals of this career."}
+    return result(200, fetched)
 
+
+# ============================================================
+# HTML -> steps
+# ============================================================
+def parse_roadmap_html(html):
+    # Only the roadmap content is parsed; nav / footer items are skipped
+    return {
+        f"Step {i}": text
+        for i, text in enumerate(extract_steps_from_html(html), start=1)
+    }
+
+
+def fetch_roadmap(career_name, etag=None, last_modified=None):
+    """
+    Like scrape_roadmap but raises on network / HTTP errors.
+    With validators, an unchanged page returns {"not_modified": True, ...}
+    without being parsed.
+    """
+    url = roadmap_url(career_name)
+    page = fetch(url, etag=etag, last_modified=last_modified)
+
+    if page["status"] == 304:
         return {
             "name": career_name,
-            "steps": steps,
-            "source_url": url
+            "source_url": url,
+            "not_modified": True,
+            "etag": page["etag"],
+            "last_modified": page["last_modified"],
         }
 
+    steps = parse_roadmap_html(page["body"])
+    if not steps:
+        # fallback if no steps found
+        steps = {"Step 1": "Use online resources to learn fundamentals of this career."}
+
+    return {
+        "name": career_name,
+        "steps": steps,
+        "source_url": url,
+        "etag": page["etag"],
+        "last_modified": page["last_modified"],
+    }
+
+
+def scrape_roadmap(career_name, etag=None, last_modified=None):
+    """
+    Scrape roadmap.sh for the given career name.
+    Returns a dict with steps and source_url.
+    """
+    try:
+        return fetch_roadmap(career_name, etag=etag, last_modified=last_modified)
+
     except Exception as e:
         print("Error scraping roadmap.sh:", e)
         return None
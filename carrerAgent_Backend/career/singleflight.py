@@ -0,0 +1,263 @@
+# singleflight.py
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-worker locking is unavailable
+    fcntl = None
+
+
+# ============================================================
+# Single-flight request coalescing
+#
+# The first caller for a key runs the work; every concurrent
+# caller with the same key waits for that result instead of
+# starting its own LLM call / scrape.
+#
+#   - threads (sync views, commands):  flight.do(key, fn, ...)
+#   - coroutines (async views):        await flight.ado(key, coro_fn, ...)
+#   - async streams (SSE views):       async for event in flight.astream(key, stream_fn, replay_fn, ...)
+#
+# Both share one table of concurrent.futures.Future, so sync and
+# async callers coalesce with each other and across event loops.
+# Followers get the leader's result or Exception; if the leader is
+# cancelled (its client disconnected), they retry and one of them
+# takes over.
+#
+# Across workers: set SINGLEFLIGHT["LOCK_DIR"] and the leader also
+# takes an flock on a per-key file. Followers in other processes
+# block on it and then run the work themselves, which by then is a
+# hit in the shared LLM cache / RoadmapReference table.
+# ============================================================
+DEFAULTS = {
+    "LOCK_DIR": None,
+    "LOCK_TIMEOUT": 120,  # seconds to wait for another worker
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "SINGLEFLIGHT", {}))
+    return config
+
+
+def canonical_key(*parts):
+    """Stable key for (career, preferences, ...) regardless of dict order / case."""
+    normalized = []
+    for part in parts:
+        if isinstance(part, str):
+            part = " ".join(part.lower().split())
+        normalized.append(part)
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class FileLock:
+    """Advisory cross-process lock; a no-op when LOCK_DIR is unset."""
+
+    def __init__(self, key, lock_dir, timeout):
+        self.path = None
+        self.timeout = timeout
+        self._fd = None
+
+        if lock_dir and fcntl is not None:
+            digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+            self.path = os.path.join(lock_dir, f"{digest}.lock")
+
+    def acquire(self):
+        if self.path is None:
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    # Give up waiting and do the work ourselves
+                    os.close(self._fd)
+                    self._fd = None
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class Abandoned(Exception):
+    """The leader was cancelled / interrupted: waiters retry the call."""
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def _join(self, key):
+        """Return (future, is_leader)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["followers"] += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _file_lock(self, key):
+        config = get_config()
+        return FileLock(f"{self.name}:{key}", config["LOCK_DIR"], config["LOCK_TIMEOUT"])
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    # --------------------------------------------------------
+    # Threads
+    # --------------------------------------------------------
+    def do(self, key, fn, *args, **kwargs):
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except Abandoned:
+                continue
+
+        lock = self._file_lock(key)
+        try:
+            lock.acquire()
+        except BaseException:
+            self._finish(key, future, error=Abandoned())
+            raise
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # KeyboardInterrupt, SystemExit: not the followers' error
+            self._finish(key, future, error=Abandoned())
+            raise
+        finally:
+            lock.release()
+
+        self._finish(key, future, result=result)
+        return result
+
+    # --------------------------------------------------------
+    # Coroutines
+    # --------------------------------------------------------
+    async def _alock(self, key, future):
+        # flock blocks, keep it off the event loop. If we're cancelled
+        # while the thread waits, release the lock once it is taken.
+        lock = self._file_lock(key)
+        acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except BaseException:
+            acquiring.add_done_callback(lambda _: lock.release())
+            self._finish(key, future, error=Abandoned())
+            raise
+        return lock
+
+    async def ado(self, key, coro_fn, *args, **kwargs):
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # shield: a follower that disconnects must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except Abandoned:
+                continue
+
+        lock = await self._alock(key, future)
+        try:
+            result = await coro_fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # Leader cancelled (client went away): waiters retry, one of them leads
+            self._finish(key, future, error=Abandoned())
+            raise
+        finally:
+            lock.release()
+
+        self._finish(key, future, result=result)
+        return result
+
+    # --------------------------------------------------------
+    # Async streams
+    # --------------------------------------------------------
+    async def astream(self, key, stream_fn, replay_fn, *args, **kwargs):
+        """
+        The leader yields the events of stream_fn(*args, **kwargs) as
+        they come; the value of its last event (a tuple ending in the
+        complete result) is the flight's result. Followers, including
+        do() / ado() callers, get that result; astream() followers
+        yield replay_fn(result).
+        """
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except Abandoned:
+                continue
+            async for event in replay_fn(result):
+                yield event
+            return
+
+        lock = await self._alock(key, future)
+        result = None
+        try:
+            async for event in stream_fn(*args, **kwargs):
+                result = event[-1]
+                yield event
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            # Client went away mid-stream (GeneratorExit / cancelled)
+            self._finish(key, future, error=Abandoned())
+            raise
+        finally:
+            lock.release()
+
+        self._finish(key, future, result=result)
+
+
+roadmap_flight = SingleFlight("roadmap")
+scrape_flight = SingleFlight("scrape")
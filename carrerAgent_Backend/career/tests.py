@@ -1,3 +1,2044 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 
-# Create your tests here.
+from unittest import skipUnless
+from unittest.mock import AsyncMock, Mock, patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, close_old_connections, connection
+from django.db.models import F, QuerySet
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .ai import (
+    GENERATION_FAILED,
+    agenerate_ai_response,
+    astream_ai_roadmap,
+    build_chat_prompt,
+    generate_ai_roadmap,
+    parse_roadmap,
+    roadmap_chat_ai,
+    safe_json,
+)
+from .artifacts import _prefetch
+from .chat_context import build_context, expand_update, log_context
+from .crawler import HostRateLimiter, write_results
+from .deltas import apply_delta, make_delta
+from .extract import HTML_PARSER, extract_steps_from_html
+from .http_cache import ResponseCache
+from .jobs import claim_next, requeue_expired, run_pending, submit_job
+from .llm import fake_answer
+from .llm_cache import DatabaseTier, MemoryTier, llm_cache, make_cache_key
+from .models import (
+    CareerAlias,
+    CareerRoadmap,
+    DerivedArtifact,
+    GenerationJob,
+    InterviewQuestionBank,
+    LatestRoadmapVersion,
+    LLMCacheEntry,
+    RoadmapReference,
+)
+from .names import TrigramIndex, career_key
+from .parsing import IncrementalJSONParser, extract_steps, parse_json_lenient
+from .patches import PatchError, apply_patch
+from .payloads import preview_payload
+from .progress import apply_progress
+from .question_bank import build_questions_prompt, fill_bank
+from .references import get_or_scrape_reference, refresh_due_references, resolve_reference, save_reference
+from .scraper import fetch_roadmap
+from .singleflight import SingleFlight, canonical_key
+from . import versions
+from .versions import create_version, latest_version, soft_delete_version
+
+
+LLM_OUTPUTS = Path(__file__).resolve().parent / "testdata" / "llm_outputs"
+HTML_FIXTURES = Path(__file__).resolve().parent / "testdata" / "html"
+
+
+def load_llm_outputs():
+    expected = json.loads((LLM_OUTPUTS / "expected.json").read_text())
+    return [
+        (name, (LLM_OUTPUTS / f"{name}.txt").read_text(), value)
+        for name, value in sorted(expected.items())
+    ]
+
+
+# ============================================================
+# Two-tier LLM response cache (llm_cache.py)
+# ============================================================
+class LLMCacheTests(TestCase):
+    def setUp(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+
+    def test_key_is_stable_across_whitespace_and_param_order(self):
+        messages = [{"role": "user", "content": "Explain\n        Docker  "}]
+        key = make_cache_key("model", messages, max_tokens=800, temperature=0.6)
+
+        same = [{"role": "user", "content": "Explain Docker"}]
+        self.assertEqual(key, make_cache_key("model", same, temperature=0.6, max_tokens=800))
+        self.assertNotEqual(key, make_cache_key("other-model", messages, max_tokens=800, temperature=0.6))
+        self.assertNotEqual(key, make_cache_key("model", messages, max_tokens=800, temperature=0.7))
+
+    def test_memory_tier_expires_and_evicts_the_least_recent(self):
+        tier = MemoryTier(max_entries=2, ttl=10)
+        with patch("career.llm_cache.time.monotonic", return_value=100.0):
+            tier.set("a", 1)
+            tier.set("b", 2)
+            tier.get("a")
+            tier.set("c", 3)
+            self.assertEqual((tier.get("a"), tier.get("b"), tier.get("c")), (1, None, 3))
+
+        with patch("career.llm_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(tier.get("a"))
+        self.assertEqual(tier.evictions, 1)
+
+    def test_db_tier_evicts_every_n_inserts(self):
+        tier = DatabaseTier(max_entries=2, ttl=60, evict_every=2)
+        for key in ("a", "b", "c"):
+            tier.set(key, "model", key)
+        self.assertEqual(LLMCacheEntry.objects.count(), 3)  # next pass on the 4th insert
+
+        with CaptureQueriesContext(connection) as captured:
+            tier.set("c", "model", "c2")  # an update adds no row: no pass
+        self.assertFalse(any("COUNT(" in query["sql"] for query in captured))
+
+        tier.set("d", "model", "d")
+        self.assertEqual(sorted(LLMCacheEntry.objects.values_list("key", flat=True)), ["c", "d"])
+        self.assertEqual(tier.evictions, 2)
+
+        LLMCacheEntry.objects.filter(key="c").update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(tier.get("c"))
+        self.assertEqual(tier.get("d"), "d")
+
+    @override_settings(LLM_BACKEND={"BACKEND": "fake"})
+    def test_uncached_call_still_stores_its_answer(self):
+        with patch("career.llm.fake_answer", side_effect=fake_answer) as answer:
+            fresh = generate_ai_roadmap(user_id=1, career_name="Backend Developer", use_cache=False)
+            cached = generate_ai_roadmap(user_id=1, career_name="Backend Developer")
+            llm_cache.memory.clear()  # another worker: served by the shared table
+            shared = generate_ai_roadmap(user_id=1, career_name="Backend Developer")
+
+        self.assertEqual(answer.call_count, 1)
+        self.assertEqual(fresh, cached)
+        self.assertEqual(fresh, shared)
+        self.assertEqual(LLMCacheEntry.objects.get().hits, 1)
+
+
+# ============================================================
+# Async (ASGI) AI views
+# Each family is requested through the ASGI handler and the WSGI
+# test client; the bodies must match.
+# ============================================================
+@override_settings(LLM_BACKEND={"BACKEND": "fake"}, CHAT_CONTEXT={"LOG": False})
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+
+        self.user = make_user()
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+        RoadmapReference.objects.create(name="Frontend Developer", content={"steps": STEPS})
+        self.roadmap = create_version(self.user, "Backend Developer", roadmap=STEPS)
+
+    async def asgi(self, method, path, body=None):
+        client = AsyncClient()
+        if method == "get":
+            return await client.get(path, headers=self.auth)
+        return await getattr(client, method)(path, json.dumps(body), content_type="application/json", headers=self.auth)
+
+    async def assert_same_over_asgi(self, method, path, body=None):
+        response = await self.asgi(method, path, body)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        expected = await sync_to_async(getattr(self.sync_client, method))(path, body, format="json")
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    async def test_preview(self):
+        body = await self.assert_same_over_asgi("get", "/api/career/roadmap/Frontend Developer/")
+        self.assertEqual(len(body["roadmap"]["steps"]), 8)
+        self.assertFalse(body["saved"])
+
+    async def test_chat(self):
+        body = await self.assert_same_over_asgi(
+            "post", f"/api/career/roadmap/{self.roadmap.id}/chat/", {"message": "How long is step 2?"}
+        )
+        self.assertTrue(body["message"].startswith("Fake mentor answer"))
+
+    async def test_skill_gap(self):
+        body = await self.assert_same_over_asgi("get", f"/api/career/roadmap/{self.roadmap.id}/skills-gap/")
+        self.assertEqual(body["missing_skills"], ["Testing"])
+
+    # ?stream=true: "step" events as they are parsed, then one "roadmap"
+    async def stream(self, career_name, query="stream=true"):
+        response = await self.asgi("get", f"/api/career/roadmap/{career_name}/?{query}")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        raw = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        events = []
+        for block in raw.strip().split("\n\n"):
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        return events
+
+    async def test_stream_sends_steps_then_roadmap(self):
+        events = await self.stream("Frontend Developer")
+
+        self.assertEqual([event for event, _ in events], ["step"] * 8 + ["roadmap"])
+        roadmap = events[-1][1]
+        self.assertEqual(roadmap, await self.assert_same_over_asgi("get", "/api/career/roadmap/Frontend Developer/"))
+        self.assertEqual({e["step"]: e["text"] for _, e in events[:-1]}, roadmap["roadmap"]["steps"])
+        self.assertEqual([e["step"] for _, e in events[:-1]], list(roadmap["roadmap"]["steps"]))
+
+    async def test_stream_replays_cache_hit(self):
+        first = await self.stream("Frontend Developer")
+
+        with patch("career.llm.fake_answer", wraps=fake_answer) as answer:
+            replay = await self.stream("Frontend Developer")
+
+        answer.assert_not_called()
+        self.assertEqual(replay, first)
+
+    async def test_stream_error_sends_only_placeholder_roadmap(self):
+        with override_settings(LLM_BACKEND={"BACKEND": "fake", "FAKE_ERROR_RATE": 1.0}):
+            events = await self.stream("Frontend Developer")
+
+        self.assertEqual([event for event, _ in events], ["roadmap"])
+        self.assertEqual(events[0][1]["roadmap"]["steps"], {"Step 1": GENERATION_FAILED})
+
+        # The failure was not cached: the next stream generates for real
+        events = await self.stream("Frontend Developer")
+        self.assertEqual(len(events), 9)
+
+    async def test_concurrent_streams_share_one_llm_call(self):
+        async def plain_preview():
+            await asyncio.sleep(0.1)  # arrives while the stream is generating
+            return await self.asgi("get", "/api/career/roadmap/Frontend Developer/")
+
+        with override_settings(LLM_BACKEND={"BACKEND": "fake", "FAKE_LATENCY": 0.3}), \
+                patch("career.llm.fake_answer", wraps=fake_answer) as answer:
+            first, second, plain = await asyncio.gather(
+                self.stream("Frontend Developer"),
+                self.stream("Frontend Developer"),
+                plain_preview(),
+            )
+
+        self.assertEqual(answer.call_count, 1)
+        self.assertEqual(second, first)  # the follower replays every step
+        self.assertEqual(plain.json(), first[-1][1])
+
+    async def test_stream_saved_roadmap_is_one_event(self):
+        events = await self.stream("Backend Developer")
+
+        self.assertEqual([event for event, _ in events], ["roadmap"])
+        self.assertTrue(events[0][1]["saved"])
+        self.assertEqual(events[0][1]["roadmap"]["steps"], STEPS)
+
+
+# ============================================================
+# Tolerant JSON parser (parsing.py)
+# ============================================================
+class LenientJSONParserTests(SimpleTestCase):
+    def test_fixture_corpus(self):
+        for name, raw, expected in load_llm_outputs():
+            with self.subTest(fixture=name):
+                self.assertEqual(parse_json_lenient(raw), expected)
+
+    def test_chunked_feed_matches_full_parse(self):
+        for name, raw, expected in load_llm_outputs():
+            for size in (1, 3, 17):
+                with self.subTest(fixture=name, chunk=size):
+                    parser = IncrementalJSONParser()
+                    for i in range(0, len(raw), size):
+                        parser.feed(raw[i:i + size])
+                    self.assertEqual(parser.result(), expected)
+
+    def test_streamed_steps_arrive_once_each_in_order(self):
+        raw = (LLM_OUTPUTS / "truncated_mid_step.txt").read_text()
+        parser = IncrementalJSONParser()
+        seen = []
+        for i in range(0, len(raw), 5):
+            seen += [k for k, v in parser.feed(raw[i:i + 5]) if isinstance(v, str)]
+
+        self.assertEqual(seen, ["Step 1", "Step 2", "Step 3"])
+
+    def test_extract_steps_unwraps_known_shapes(self):
+        steps = {"Step 1": "a", "Step 2": "b"}
+        self.assertEqual(extract_steps({"steps": steps}), steps)
+        self.assertEqual(extract_steps({"roadmap": {"steps": steps}}), steps)
+        self.assertEqual(extract_steps(steps), steps)
+        self.assertIsNone(extract_steps({"message": "hi"}))
+
+
+class RoadmapParsingTests(SimpleTestCase):
+    def test_truncated_roadmap_keeps_complete_steps(self):
+        raw = (LLM_OUTPUTS / "truncated_mid_step.txt").read_text()
+        steps = parse_roadmap(raw)["steps"]
+        self.assertEqual(list(steps), ["Step 1", "Step 2", "Step 3"])
+
+    def test_unparseable_output_falls_back_to_single_step(self):
+        raw = (LLM_OUTPUTS / "not_json.txt").read_text()
+        self.assertEqual(parse_roadmap(raw), {"steps": {"Step 1": raw}})
+        self.assertEqual(safe_json(raw), {"steps": {"Step 1": raw}})
+
+
+# ============================================================
+# Single-flight coalescing (singleflight.py)
+# ============================================================
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = []
+        started = threading.Event()
+
+        def generate():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {"steps": {"Step 1": "a"}}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            first = pool.submit(flight.do, "k", generate)
+            started.wait()
+            rest = [pool.submit(flight.do, "k", generate) for _ in range(7)]
+            results = [first.result()] + [f.result() for f in rest]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == {"steps": {"Step 1": "a"}} for r in results))
+
+    def test_concurrent_coroutines_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def generate(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        async def run():
+            return await asyncio.gather(*[flight.ado("k", generate, i) for i in range(10)])
+
+        self.assertEqual(asyncio.run(run()), [0] * 10)
+        self.assertEqual(calls, [0])
+
+    def test_leader_errors_reach_every_follower(self):
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("scrape failed")
+
+        async def run():
+            return await asyncio.gather(*[flight.ado("k", fail) for _ in range(3)], return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in asyncio.run(run())))
+
+    def test_cancelled_leader_hands_over_to_a_follower(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def generate(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        async def run():
+            leader = asyncio.create_task(flight.ado("k", generate, "leader"))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(flight.ado("k", generate, i)) for i in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()  # the first client disconnects
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        results = asyncio.run(run())
+        self.assertEqual(calls, ["leader", 0])
+        self.assertEqual(results, [0, 0, 0])
+        self.assertFalse(flight.in_flight("k"))
+
+    def test_cancelled_follower_leaves_the_others_waiting(self):
+        flight = SingleFlight("test")
+
+        async def generate():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def run():
+            leader = asyncio.create_task(flight.ado("k", generate))
+            await asyncio.sleep(0.01)
+            quitter = asyncio.create_task(flight.ado("k", generate))
+            stayer = asyncio.create_task(flight.ado("k", generate))
+            await asyncio.sleep(0.01)
+            quitter.cancel()
+            return await asyncio.gather(leader, stayer)
+
+        self.assertEqual(asyncio.run(run()), ["done", "done"])
+
+    def test_stream_leader_publishes_its_last_event(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        async def stream(value):
+            calls.append(value)
+            for i in range(3):
+                await asyncio.sleep(0.02)
+                yield ("part", i)
+            yield ("done", value)
+
+        async def replay(value):
+            yield ("replayed", value)
+
+        async def generate(value):
+            calls.append(value)
+            return value
+
+        async def consume(value):
+            return [event async for event in flight.astream("k", stream, replay, value)]
+
+        async def run():
+            leader = asyncio.create_task(consume("leader"))
+            await asyncio.sleep(0.01)
+            return await asyncio.gather(leader, consume(1), flight.ado("k", generate, 2))
+
+        leader, follower, plain = asyncio.run(run())
+        self.assertEqual(calls, ["leader"])
+        self.assertEqual(leader, [("part", 0), ("part", 1), ("part", 2), ("done", "leader")])
+        self.assertEqual(follower, [("replayed", "leader")])
+        self.assertEqual(plain, "leader")
+        self.assertFalse(flight.in_flight("k"))
+
+    def test_closed_stream_leader_hands_over_to_a_follower(self):
+        flight = SingleFlight("test")
+
+        async def stream(value):
+            yield ("done", value)
+
+        async def generate(value):
+            return value
+
+        async def run():
+            leader = flight.astream("k", stream, None, "leader")
+            await leader.__anext__()  # leading, then the client goes away
+            follower = asyncio.create_task(flight.ado("k", generate, "follower"))
+            await asyncio.sleep(0.01)
+            await leader.aclose()
+            return await follower
+
+        self.assertEqual(asyncio.run(run()), "follower")
+
+    def test_canonical_key_ignores_case_and_dict_order(self):
+        self.assertEqual(
+            canonical_key("Backend  Developer", {"a": 1, "b": 2}),
+            canonical_key("backend developer", {"b": 2, "a": 1}),
+        )
+
+
+# ============================================================
+# Stored references + background refresh (references.py)
+# ============================================================
+SCRAPED = {"name": "Backend Developer", "steps": {"Step 1": "Learn Python"}, "source_url": "https://roadmap.sh/backend", "etag": '"v2"'}
+
+
+class ReferenceStoreTests(TestCase):
+    def test_stale_reference_is_served_without_scraping(self):
+        stale = RoadmapReference.objects.create(
+            name="Backend Developer", content={"steps": {}}, auto_refresh_at=timezone.now() - timedelta(days=30),
+        )
+        with patch("career.references.scrape_roadmap") as scrape:
+            self.assertEqual(get_or_scrape_reference("Backend Developer"), stale)
+        scrape.assert_not_called()
+
+    def test_miss_scrapes_once_and_schedules_a_refresh(self):
+        with patch("career.references.scrape_roadmap", return_value=SCRAPED) as scrape:
+            reference = get_or_scrape_reference("Backend Developer")
+            self.assertEqual(get_or_scrape_reference("Backend Developer"), reference)
+
+        scrape.assert_called_once_with("Backend Developer")
+        self.assertEqual(reference.content["steps"], SCRAPED["steps"])
+        self.assertEqual(reference.etag, '"v2"')
+        self.assertGreater(reference.auto_refresh_at, timezone.now())
+
+    def test_failed_scrape_stores_nothing(self):
+        with patch("career.references.scrape_roadmap", return_value=None):
+            self.assertIsNone(get_or_scrape_reference("Backend Developer"))
+        self.assertFalse(RoadmapReference.objects.exists())
+
+    def test_upsert_race_updates_the_row_inserted_first(self):
+        winner = RoadmapReference.objects.create(name="Backend Developer", content={"steps": {}})
+
+        # The lookup ran before the other worker's insert
+        with patch("career.references.resolve_reference", return_value=None):
+            reference = save_reference("Backend Developer", SCRAPED)
+
+        self.assertEqual(reference.pk, winner.pk)
+        self.assertEqual(RoadmapReference.objects.get().content["steps"], SCRAPED["steps"])
+
+
+class ReferenceRefreshTests(TransactionTestCase):
+    def test_only_due_references_are_refreshed_and_failures_back_off(self):
+        past = timezone.now() - timedelta(hours=1)
+        RoadmapReference.objects.create(name="Backend Developer", content={"steps": {}}, auto_refresh_at=past)
+        RoadmapReference.objects.create(name="Data Scientist", content={"steps": {"Step 1": "Old"}}, auto_refresh_at=past)
+        RoadmapReference.objects.create(
+            name="Frontend Developer", content={"steps": {}}, auto_refresh_at=timezone.now() + timedelta(days=1),
+        )
+
+        def scrape(name, **validators):
+            return SCRAPED if name == "Backend Developer" else None
+
+        with patch("career.references.scrape_roadmap", side_effect=scrape) as mock:
+            result = refresh_due_references(workers=1)
+
+        self.assertEqual(result, {"due": 2, "refreshed": 1, "failed": ["Data Scientist"]})
+        self.assertEqual(sorted(c.args[0] for c in mock.call_args_list), ["Backend Developer", "Data Scientist"])
+
+        failed = RoadmapReference.objects.get(name="Data Scientist")
+        self.assertEqual(failed.content["steps"], {"Step 1": "Old"})  # old content kept
+        self.assertGreater(failed.auto_refresh_at, timezone.now())
+        self.assertEqual(RoadmapReference.objects.get(name="Backend Developer").content["steps"], SCRAPED["steps"])
+
+    def test_not_modified_only_reschedules(self):
+        reference = RoadmapReference.objects.create(
+            name="Backend Developer", content={"steps": {"Step 1": "Old"}}, etag='"v1"',
+            auto_refresh_at=timezone.now() - timedelta(hours=1),
+        )
+        with patch("career.references.scrape_roadmap", return_value={"not_modified": True}) as scrape:
+            call_command("refresh_references", workers=1, stdout=io.StringIO())
+
+        scrape.assert_called_once_with("Backend Developer", etag='"v1"', last_modified=None)
+        reference.refresh_from_db()
+        self.assertEqual(reference.content["steps"], {"Step 1": "Old"})
+        self.assertGreater(reference.auto_refresh_at, timezone.now())
+
+
+# ============================================================
+# Pooled, conditional scraper (scraper.py / http_cache.py)
+# Served by a local stand-in for roadmap.sh.
+# ============================================================
+ROADMAP_PAGE = "<html><body><ul><li>Learn Python</li><li>Learn SQL</li></ul></body></html>"
+
+
+class RoadmapStandIn(BaseHTTPRequestHandler):
+    etag = '"v1"'
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = ROADMAP_PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ScraperFetchTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RoadmapStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        RoadmapStandIn.requests_seen = []
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def scraper_settings(self, **overrides):
+        config = {"BASE_URL": self.base_url, "CACHE_DIR": self.cache_dir.name, "CACHE_TTL": 0}
+        config.update(overrides)
+        return override_settings(SCRAPER=config)
+
+    def test_first_fetch_parses_and_returns_validators(self):
+        with self.scraper_settings():
+            result = fetch_roadmap("Backend Developer")
+
+        self.assertEqual(result["steps"], {"Step 1": "Learn Python", "Step 2": "Learn SQL"})
+        self.assertEqual(result["etag"], '"v1"')
+        self.assertEqual(RoadmapStandIn.requests_seen, [("/backend-developer", None)])
+
+    def test_known_etag_gets_304_and_skips_parsing(self):
+        with self.scraper_settings():
+            result = fetch_roadmap("Backend Developer", etag='"v1"')
+
+        self.assertTrue(result["not_modified"])
+        self.assertNotIn("steps", result)
+        self.assertEqual(RoadmapStandIn.requests_seen, [("/backend-developer", '"v1"')])
+
+    def test_disk_cache_revalidates_then_serves_without_network(self):
+        with self.scraper_settings():
+            fetch_roadmap("Backend Developer")
+            # Stale disk copy: conditional request, body comes from disk
+            again = fetch_roadmap("Backend Developer")
+
+        with self.scraper_settings(CACHE_TTL=3600):
+            # Fresh disk copy: no request at all
+            fresh = fetch_roadmap("Backend Developer")
+
+        self.assertEqual(again["steps"], fresh["steps"])
+        self.assertEqual(RoadmapStandIn.requests_seen, [
+            ("/backend-developer", None),
+            ("/backend-developer", '"v1"'),
+        ])
+
+    def test_concurrent_writes_of_one_url_never_publish_half_a_file(self):
+        cache = ResponseCache(self.cache_dir.name)
+        url = f"{self.base_url}/backend-developer"
+        bodies = [str(i) * 200_000 for i in range(8)]
+        reads = []
+
+        def write(body):
+            for _ in range(5):
+                cache.set(url, body)
+                entry = cache.get(url)
+                reads.append(entry and entry["body"])
+
+        with ThreadPoolExecutor(max_workers=len(bodies)) as pool:
+            for future in [pool.submit(write, body) for body in bodies]:
+                future.result()  # no writer lost its temp file to another
+
+        self.assertTrue(all(body in bodies for body in reads))
+        self.assertIn(cache.get(url)["body"], bodies)
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)  # no temp files left
+
+
+# ============================================================
+# Bulk reference crawler (crawler.py / crawl_references)
+# ============================================================
+class CrawlerStandIn(RoadmapStandIn):
+    # path -> statuses to answer before the page; "/missing..." is always 404
+    failures = {}
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.requests_seen.append((self.path, None))
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        pending = self.failures.get(self.path)
+        if pending:
+            self.requests_seen.append((self.path, None))
+            self.send_response(pending.pop(0))
+            self.end_headers()
+            return
+
+        super().do_GET()
+
+
+class CrawlerTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CrawlerStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        CrawlerStandIn.requests_seen = []
+        CrawlerStandIn.failures = {}
+        scraper_settings = override_settings(SCRAPER={"BASE_URL": self.base_url, "CACHE_DIR": None})
+        scraper_settings.enable()
+        self.addCleanup(scraper_settings.disable)
+
+    def crawl_command(self, *careers, **options):
+        out = io.StringIO()
+        call_command("crawl_references", *careers, json=True, rate=0, backoff=0.001, stdout=out, **options)
+        return json.loads(out.getvalue())
+
+    def test_spellings_are_crawled_once_then_revalidated(self):
+        report = self.crawl_command("Backend Developer", "backend-developer", "BACKEND DEV", "Frontend Developer")
+        self.assertEqual((report["requested"], report["created"], report["failed"]), (2, 2, []))
+        self.assertEqual(RoadmapReference.objects.count(), 2)
+        self.assertEqual(
+            RoadmapReference.objects.get(name_key="backend developer").content["steps"],
+            {"Step 1": "Learn Python", "Step 2": "Learn SQL"},
+        )
+
+        # Stored etags are sent back: both pages answer 304
+        CrawlerStandIn.requests_seen = []
+        again = self.crawl_command("Backend Developer", "Frontend Developer")
+        self.assertEqual((again["created"], again["updated"], again["not_modified"]), (0, 0, 2))
+        self.assertEqual({etag for _, etag in CrawlerStandIn.requests_seen}, {'"v1"'})
+
+    def test_transient_errors_are_retried_and_permanent_ones_are_not(self):
+        CrawlerStandIn.failures = {"/backend-developer": [503, 429]}
+
+        report = self.crawl_command("Backend Developer", "Missing Developer", retries=3)
+
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["retries"], 2)
+        self.assertEqual(len(report["failed"]), 1)
+        self.assertEqual(report["failed"][0]["career"], "Missing Developer")
+        self.assertEqual(report["failed"][0]["attempts"], 1)
+
+    def test_retries_give_up_after_the_limit(self):
+        CrawlerStandIn.failures = {"/backend-developer": [500, 500, 500]}
+
+        report = self.crawl_command("Backend Developer", retries=1)
+
+        self.assertEqual(report["failed"][0]["attempts"], 2)
+        self.assertFalse(RoadmapReference.objects.exists())
+
+    def test_rows_stored_meanwhile_count_as_updated(self):
+        results = [
+            {"career": name, "ok": True, "scraped": {"steps": {"Step 1": name}}, "attempts": 1}
+            for name in ("Backend Developer", "Frontend Developer")
+        ]
+        # A request-time scrape stored one of them after the crawl looked
+        RoadmapReference.objects.create(name="backend dev", content={"steps": {}})
+
+        written = write_results(results, existing={})
+
+        self.assertEqual(written, {"created": 1, "updated": 1, "not_modified": 0})
+        self.assertEqual(RoadmapReference.objects.count(), 2)
+        self.assertEqual(
+            RoadmapReference.objects.get(name_key="backend developer").content["steps"],
+            {"Step 1": "Backend Developer"},
+        )
+
+    def test_rate_limiter_spaces_requests_per_host(self):
+        clock = Mock(monotonic=Mock(return_value=100.0))
+        with patch("career.crawler.time", clock):
+            limiter = HostRateLimiter(rate=4)
+            for _ in range(3):
+                limiter.wait("roadmap.sh")
+            limiter.wait("example.com")
+
+        delays = [call.args[0] for call in clock.sleep.call_args_list]
+        self.assertEqual(delays, [0.25, 0.5])  # first slot free, other host not delayed
+
+
+class HTMLExtractionTests(SimpleTestCase):
+    def test_saved_page_keeps_roadmap_and_drops_chrome(self):
+        html = (HTML_FIXTURES / "backend.html").read_text(encoding="utf-8")
+
+        for parser in {"html.parser", HTML_PARSER}:
+            with self.subTest(parser=parser):
+                steps = extract_steps_from_html(html, parser)
+                self.assertEqual(steps[:3], ["Internet", "How does the internet work?", "What is HTTP?"])
+                self.assertIn("Go", steps)
+                for chrome in ("Roadmaps", "Sign Up", "Privacy", "Share"):
+                    self.assertNotIn(chrome, steps)
+
+    def test_page_without_main_falls_back_to_lists_outside_nav(self):
+        html = "<nav><ul><li>Home</li></ul></nav><ul><li>Learn SQL</li></ul><footer><ul><li>Terms</li></ul></footer>"
+        self.assertEqual(extract_steps_from_html(html, "html.parser"), ["Learn SQL"])
+
+
+# ============================================================
+# Version indexes + latest-version pointer (versions.py)
+# ============================================================
+def make_user(username="alice"):
+    return get_user_model().objects.create_user(
+        username=username, email=f"{username}@example.com", password="pw-123456"
+    )
+
+
+class LatestVersionPointerTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def save_version(self, steps):
+        return self.client.post("/api/career/roadmap/save-version/", {
+            "career_name": "Backend Developer",
+            "roadmap": steps,
+        }, format="json")
+
+    def test_pointer_follows_new_versions_and_soft_deletes(self):
+        self.save_version({"Step 1": "a"})
+        second = self.save_version({"Step 1": "b"}).json()
+
+        self.assertEqual(second["version"], 2)
+        self.assertEqual(latest_version(self.user, "Backend Developer").id, second["roadmap_id"])
+
+        self.client.delete(f"/api/career/roadmap/{second['roadmap_id']}/delete/")
+        self.assertEqual(latest_version(self.user, "Backend Developer").version, 1)
+
+    def test_saved_preview_is_a_single_query(self):
+        create_version(self.user, "Backend Developer", roadmap={"Step 1": "a"}, progress={})
+
+        with self.assertNumQueries(1):
+            roadmap = latest_version(self.user, "Backend Developer")
+            roadmap.reference  # select_related: no extra query
+
+    def test_new_version_numbers_never_collide(self):
+        first = create_version(self.user, "Backend Developer", roadmap={"Step 1": "a"})
+        create_version(self.user, "Backend Developer", roadmap={"Step 1": "b"}, parent=first)
+        # Branching off v1 again still yields v3, not a second v2
+        third = create_version(self.user, "Backend Developer", roadmap={"Step 1": "c"}, parent=first)
+
+        self.assertEqual(third.version, 3)
+        self.assertEqual(LatestRoadmapVersion.objects.get().roadmap_id, third.id)
+
+    def test_deleted_version_numbers_are_not_reused(self):
+        first = create_version(self.user, "Backend Developer", roadmap={"Step 1": "a"})
+        second = create_version(self.user, "Backend Developer", roadmap={"Step 1": "b"}, parent=first)
+        soft_delete_version(second)
+
+        self.assertEqual(create_version(self.user, "Backend Developer", roadmap={"Step 1": "c"}).version, 3)
+
+    def test_concurrent_first_save_retries_behind_the_pointer(self):
+        first = create_version(self.user, "Backend Developer", roadmap={"Step 1": "a"})
+
+        # This save looked before the other one's pointer existed
+        lookups = iter([lambda *args: None, versions._locked_pointer])
+        with patch("career.versions._locked_pointer", side_effect=lambda *args: next(lookups)(*args)):
+            second = create_version(self.user, "Backend Developer", roadmap={"Step 1": "b"})
+
+        self.assertEqual(second.version, 2)
+        self.assertEqual(LatestRoadmapVersion.objects.get().roadmap_id, second.id)
+        self.assertEqual(
+            list(CareerRoadmap.objects.order_by("version").values_list("id", flat=True)), [first.id, second.id]
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output checked is SQLite's")
+class RoadmapIndexPlanTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index_name}", plan)
+        self.assertNotIn("SCAN career_careerroadmap", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_latest_live_version_query_uses_partial_index(self):
+        qs = (
+            CareerRoadmap.objects
+            .filter(user=self.user, career_name="Backend Developer", is_deleted=False)
+            .order_by("-version")
+        )
+        self.assertUsesIndex(qs, "roadmap_user_career_ver_idx")
+
+    def test_pointer_lookup_uses_unique_index(self):
+        plan = (
+            LatestRoadmapVersion.objects
+            .select_related("roadmap__reference")
+            .filter(user=self.user, career_name="Backend Developer")
+            .explain()
+        )
+        self.assertIn("SEARCH career_latestroadmapversion USING INDEX", plan)
+        self.assertNotIn("SCAN", plan)
+
+
+# ============================================================
+# my-roadmaps/ keyset pagination + projection
+# ============================================================
+class RoadmapListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for i in range(7):
+            create_version(self.user, f"Career {i % 3}", roadmap={"Step 1": "x"}, progress={})
+        # Ties on created_at must still page cleanly (id breaks them)
+        CareerRoadmap.objects.filter(version=1).update(created_at=timezone.now())
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            body = self.client.get("/api/career/my-roadmaps/", params).json()
+            seen += [r["id"] for r in body["roadmaps"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        expected = list(
+            CareerRoadmap.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_fields_projection(self):
+        body = self.client.get("/api/career/my-roadmaps/", {"fields": "id,version"}).json()
+        self.assertEqual(set(body["roadmaps"][0]), {"id", "version"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/career/my-roadmaps/", {"fields": "id,career_name"})
+        listing = [q["sql"] for q in ctx.captured_queries if "career_careerroadmap" in q["sql"]]
+        self.assertNotIn('"progress"', listing[-1])
+        self.assertNotIn('"roadmap"', listing[-1])
+
+    def test_bad_input_is_rejected(self):
+        self.assertEqual(self.client.get("/api/career/my-roadmaps/", {"fields": "roadmap"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/career/my-roadmaps/", {"cursor": "nope"}).status_code, 400)
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN output checked is SQLite's")
+    def test_page_query_uses_index_without_sort(self):
+        plan = (
+            CareerRoadmap.objects.filter(user=self.user, is_deleted=False)
+            .order_by("-created_at", "-id").values("id")[:50].explain()
+        )
+        self.assertIn("USING INDEX roadmap_user_created_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+# ============================================================
+# Atomic progress writes (progress.py)
+# ============================================================
+STEPS = {f"Step {i}": f"topic {i}" for i in range(1, 21)}
+
+
+class ProgressWriteTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.roadmap = create_version(
+            self.user, "Backend Developer", roadmap=STEPS,
+            progress={step: "not_started" for step in STEPS},
+        )
+
+    def url(self, suffix):
+        return f"/api/career/roadmap/{self.roadmap.id}/{suffix}/"
+
+    def test_single_update_writes_only_progress(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url("update-progress"), {"step": "Step 2", "status": "completed"})
+
+        self.assertEqual(response.json()["progress"]["Step 2"], "completed")
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"roadmap" =', updates[0])
+
+    def test_batch_is_one_write(self):
+        changes = {"Step 1": "completed", "Step 2": "in_progress", "Step 3": "skipped"}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url("progress/batch"), {"progress": changes}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(q["sql"].startswith("UPDATE") for q in ctx.captured_queries), 1)
+        self.roadmap.refresh_from_db()
+        self.assertEqual({k: self.roadmap.progress[k] for k in changes}, changes)
+        self.assertEqual(self.roadmap.progress_revision, 1)
+
+    def test_batch_is_all_or_nothing(self):
+        response = self.client.post(
+            self.url("progress/batch"),
+            {"progress": {"Step 1": "completed", "Step 99": "completed"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["step"], "Step 99")
+        self.roadmap.refresh_from_db()
+        self.assertEqual(self.roadmap.progress["Step 1"], "not_started")
+
+    def test_stale_revision_is_retried_not_lost(self):
+        # Another writer lands between our read and our UPDATE
+        real_update = QuerySet.update
+        raced = []
+
+        def racing_update(qs, **kwargs):
+            if not raced:
+                raced.append(True)
+                CareerRoadmap.objects.filter(pk=self.roadmap.pk).update(
+                    progress={**self.roadmap.progress, "Step 5": "completed"},
+                    progress_revision=F("progress_revision") + 1,
+                )
+            return real_update(qs, **kwargs)
+
+        with patch.object(QuerySet, "update", racing_update):
+            apply_progress(self.roadmap.pk, {"Step 6": "completed"}, STEPS)
+
+        self.roadmap.refresh_from_db()
+        self.assertEqual(self.roadmap.progress["Step 5"], "completed")
+        self.assertEqual(self.roadmap.progress["Step 6"], "completed")
+        self.assertEqual(self.roadmap.progress_revision, 2)
+
+
+class ConcurrentProgressTests(TransactionTestCase):
+    def test_concurrent_clicks_are_all_kept(self):
+        user = make_user()
+        roadmap = create_version(
+            user, "Backend Developer", roadmap=STEPS,
+            progress={step: "not_started" for step in STEPS},
+        )
+
+        def click(step):
+            try:
+                while True:
+                    try:
+                        return apply_progress(roadmap.pk, {step: "completed"}, STEPS)
+                    except OperationalError:
+                        # In-memory SQLite (shared cache) reports table locks
+                        # instead of waiting on them; just try again.
+                        time.sleep(0.001)
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(click, STEPS))
+
+        roadmap.refresh_from_db()
+        self.assertEqual(set(roadmap.progress.values()), {"completed"})
+        self.assertEqual(roadmap.progress_revision, len(STEPS))
+
+
+# ============================================================
+# Denormalized progress counters + dashboard
+# ============================================================
+class ProgressCounterTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.roadmap = create_version(
+            self.user, "Backend Developer", roadmap=STEPS,
+            progress={step: "not_started" for step in STEPS},
+        )
+
+    def test_counters_follow_every_write_path(self):
+        self.assertEqual(self.roadmap.progress_total, len(STEPS))
+
+        apply_progress(self.roadmap.pk, {"Step 1": "completed", "Step 2": "skipped", "Step 3": "in_progress"})
+        self.roadmap.refresh_from_db()
+        self.assertEqual(
+            (self.roadmap.progress_completed, self.roadmap.progress_skipped, self.roadmap.progress_in_progress),
+            (1, 1, 1),
+        )
+
+        self.roadmap.progress = {"Step 1": "completed"}
+        self.roadmap.save()
+        self.roadmap.refresh_from_db()
+        self.assertEqual((self.roadmap.progress_total, self.roadmap.progress_completed), (1, 1))
+
+    def test_summary_matches_progress(self):
+        apply_progress(self.roadmap.pk, {"Step 1": "completed", "Step 2": "completed", "Step 3": "skipped"})
+        body = self.client.get(f"/api/career/roadmap/{self.roadmap.id}/progress-summary/").json()
+
+        self.assertEqual(body["completed"], 2)
+        self.assertEqual(body["skipped"], 1)
+        self.assertEqual(body["not_started"], len(STEPS) - 3)
+        self.assertEqual(body["completion_percentage"], 10.0)
+        self.assertEqual(body["progress"]["Step 3"], "skipped")
+
+    def test_dashboard_is_two_queries(self):
+        other = create_version(self.user, "DevOps", roadmap={"Step 1": "x"}, progress={"Step 1": "completed"})
+
+        with self.assertNumQueries(2):
+            body = self.client.get("/api/career/progress/dashboard/").json()
+
+        self.assertEqual([r["id"] for r in body["roadmaps"]], [other.id, self.roadmap.id])
+        self.assertEqual(body["overall"]["total_steps"], len(STEPS) + 1)
+        self.assertEqual(body["overall"]["completed"], 1)
+
+    def test_overall_counts_each_career_once(self):
+        for _ in range(4):
+            create_version(
+                self.user, "Backend Developer", roadmap=STEPS,
+                progress={step: "completed" for step in STEPS}, parent=self.roadmap,
+            )
+
+        body = self.client.get("/api/career/progress/dashboard/").json()
+
+        self.assertEqual(len(body["roadmaps"]), 5)
+        self.assertEqual(body["overall"]["total_steps"], len(STEPS))
+        self.assertEqual(body["overall"]["completed"], len(STEPS))  # the latest version only
+
+
+# ============================================================
+# Delta-compressed version storage (deltas.py)
+# ============================================================
+class DeltaTests(SimpleTestCase):
+    OLD = {"Step 1": "a", "Step 2": "b", "Step 3": "c"}
+
+    def test_round_trips(self):
+        cases = [
+            {"Step 1": "a", "Step 2": "B", "Step 3": "c"},               # edit
+            {"Step 1": "a", "Step 3": "c"},                              # delete
+            {"Step 1": "a", "Step 2": "b", "Step 3": "c", "Step 4": "d"}, # append
+            {"Step 1": "a", "Step 1b": "x", "Step 2": "b", "Step 3": "c"},# insert
+            {"Step 3": "c", "Step 1": "a", "Step 2": "b"},               # reorder
+            {},
+        ]
+        for new in cases:
+            delta = make_delta(self.OLD, new)
+            self.assertEqual(list(apply_delta(self.OLD, delta).items()), list(new.items()))
+
+    def test_single_edit_is_small(self):
+        self.assertEqual(make_delta(self.OLD, {**self.OLD, "Step 2": "B"}), {"set": {"Step 2": "B"}})
+
+
+def chat_edit(steps, i):
+    return {**steps, f"Step {i % len(steps) + 1}": f"edited #{i}"}
+
+
+@override_settings(ROADMAP_STORAGE={"SNAPSHOT_EVERY": 4})
+class DeltaStorageTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def make_history(self, n):
+        versions, steps, parent = [], dict(STEPS), None
+        for i in range(n):
+            parent = create_version(self.user, "Backend Developer", roadmap=steps, parent=parent)
+            versions.append((parent.pk, steps))
+            steps = chat_edit(steps, i)
+        return versions
+
+    def test_versions_rebuild_exactly(self):
+        versions = self.make_history(10)
+
+        for pk, steps in versions:
+            with CaptureQueriesContext(connection) as ctx:
+                roadmap = CareerRoadmap.objects.get(pk=pk)
+                self.assertEqual(list(roadmap.roadmap.items()), list(steps.items()))
+            # the row, plus its snapshot group if it's a delta
+            self.assertEqual(len(ctx.captured_queries), 1 if roadmap.snapshot is not None else 2)
+
+    def test_snapshot_every_n_versions(self):
+        versions = self.make_history(9)
+        depths = list(
+            CareerRoadmap.objects.filter(pk__in=[pk for pk, _ in versions])
+            .order_by("id").values_list("chain_depth", flat=True)
+        )
+        self.assertEqual(depths, [0, 1, 2, 3, 0, 1, 2, 3, 0])
+        self.assertEqual(CareerRoadmap.objects.filter(snapshot__isnull=False).count(), 3)
+
+    def test_unrelated_content_is_stored_as_snapshot(self):
+        first = create_version(self.user, "Backend Developer", roadmap=STEPS)
+        second = create_version(self.user, "Backend Developer", roadmap={"Step 1": "something else"}, parent=first)
+        self.assertIsNotNone(CareerRoadmap.objects.get(pk=second.pk).snapshot)
+
+    def test_overwrite_keeps_descendants_intact(self):
+        versions = self.make_history(4)
+        middle = CareerRoadmap.objects.get(pk=versions[1][0])
+
+        middle.roadmap = {**STEPS, "Step 7": "rewritten"}
+        middle.save()
+
+        self.assertEqual(CareerRoadmap.objects.get(pk=middle.pk).roadmap["Step 7"], "rewritten")
+        for pk, steps in versions[2:]:
+            self.assertEqual(CareerRoadmap.objects.get(pk=pk).roadmap, steps)
+
+    async def test_async_rebuild(self):
+        versions = await sync_to_async(self.make_history)(3)
+        roadmap = await CareerRoadmap.objects.aget(pk=versions[-1][0])
+        self.assertEqual(await roadmap.aload_roadmap(), versions[-1][1])
+
+    def expand_all(self, versions):
+        """Pre-migration state: every row a full copy."""
+        for pk, steps in versions:
+            CareerRoadmap.objects.filter(pk=pk).update(
+                snapshot=steps, delta=None, delta_parent=None, chain_base=None, chain_depth=0
+            )
+
+    def test_migration_compresses_existing_history(self):
+        versions = self.make_history(12)
+        self.expand_all(versions)
+
+        migration = import_module("career.migrations.0011_careerroadmap_delta_storage")
+        migration.compress_history(django_apps, None)
+
+        # The migration's own SNAPSHOT_EVERY (10), not this class's settings (4)
+        self.assertEqual(CareerRoadmap.objects.filter(snapshot__isnull=False).count(), 2)
+        for pk, steps in versions:
+            self.assertEqual(CareerRoadmap.objects.get(pk=pk).roadmap, steps)
+
+    def test_migration_round_trip_with_branches(self):
+        versions = self.make_history(3)
+        first = CareerRoadmap.objects.get(pk=versions[0][0])
+        branch = create_version(self.user, "Backend Developer", roadmap=chat_edit(STEPS, 50), parent=first)
+        versions.append((branch.pk, branch.roadmap))
+        other = create_version(self.user, "Data Scientist", roadmap=STEPS)
+        versions.append((other.pk, STEPS))
+        self.expand_all(versions)
+
+        migration = import_module("career.migrations.0011_careerroadmap_delta_storage")
+        migration.compress_history(django_apps, None)
+
+        compressed = dict(CareerRoadmap.objects.values_list("id", "delta_parent_id"))
+        self.assertEqual(compressed[branch.pk], versions[0][0])  # v1 still in memory for its second child
+        self.assertEqual(compressed[versions[2][0]], versions[1][0])
+        self.assertIsNone(compressed[other.pk])
+
+        migration.expand_history(django_apps, None)
+
+        self.assertFalse(CareerRoadmap.objects.filter(snapshot__isnull=True).exists())
+        for pk, steps in versions:
+            self.assertEqual(CareerRoadmap.objects.get(pk=pk).roadmap, steps)
+
+
+# ============================================================
+# Version lineage (lineage.py)
+# ============================================================
+class LineageTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        # v1 -> v2 -> v3 -> ... -> v30, plus a branch v2 -> b
+        self.chain, parent, steps = [], None, dict(STEPS)
+        for i in range(30):
+            parent = create_version(self.user, "Backend Developer", roadmap=steps, parent=parent)
+            self.chain.append(parent)
+            steps = chat_edit(steps, i)
+        self.branch = create_version(
+            self.user, "Backend Developer", roadmap=chat_edit(STEPS, 99), parent=self.chain[1]
+        )
+
+    def lineage(self, roadmap, **params):
+        return self.client.get(f"/api/career/roadmap/{roadmap.id}/lineage/", params)
+
+    def test_two_queries_at_any_depth(self):
+        for roadmap in (self.chain[0], self.chain[15], self.chain[-1], self.branch):
+            with self.assertNumQueries(2):
+                self.assertEqual(self.lineage(roadmap).status_code, 200)
+
+    def test_ancestors_and_descendants(self):
+        body = self.lineage(self.chain[1]).json()
+
+        self.assertEqual([a["id"] for a in body["ancestors"]], [self.chain[0].id])
+        self.assertEqual(
+            [c["id"] for c in body["node"]["children"]], [self.chain[2].id, self.branch.id]
+        )
+
+        deepest = body["node"]
+        while deepest["children"]:
+            deepest = deepest["children"][0]
+        self.assertEqual(deepest["id"], self.chain[-1].id)
+        self.assertNotIn("roadmap", deepest)
+
+        leaf = self.lineage(self.chain[-1]).json()
+        self.assertEqual([a["id"] for a in leaf["ancestors"]], [r.id for r in self.chain[:-1]])
+
+    def test_include_roadmap_rebuilds_deltas_in_the_same_queries(self):
+        with self.assertNumQueries(2):
+            body = self.lineage(self.branch, include="roadmap").json()
+
+        self.assertEqual(body["node"]["roadmap"], self.branch.roadmap)
+        self.assertEqual(body["ancestors"][-1]["roadmap"], CareerRoadmap.objects.get(pk=self.chain[1].pk).roadmap)
+
+    def test_other_users_roadmap_is_404(self):
+        self.client.force_authenticate(make_user("mallory"))
+        self.assertEqual(self.lineage(self.chain[0]).status_code, 404)
+
+    def test_deleted_middle_version_is_skipped(self):
+        soft_delete_version(self.chain[1])
+
+        with self.assertNumQueries(2):
+            body = self.lineage(self.chain[0], include="roadmap").json()
+        children = body["node"]["children"]
+        self.assertEqual([c["id"] for c in children], [self.chain[2].id, self.branch.id])
+        self.assertEqual({c["parent_id"] for c in children}, {self.chain[0].id})
+        self.assertEqual(children[1]["roadmap"], self.branch.roadmap)  # delta still based on the deleted row
+
+        leaf = self.lineage(self.chain[-1]).json()
+        self.assertEqual([a["id"] for a in leaf["ancestors"]], [self.chain[0].id] + [r.id for r in self.chain[2:-1]])
+
+        self.assertEqual(self.lineage(self.chain[1]).status_code, 404)
+        body = self.lineage(self.chain[1], include="deleted").json()
+        self.assertTrue(body["node"]["is_deleted"])
+        self.assertEqual([c["id"] for c in body["node"]["children"]], [self.chain[2].id, self.branch.id])
+
+
+# ============================================================
+# Derived-artifact store (artifacts.py)
+# ============================================================
+class DerivedArtifactTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.roadmap = create_version(
+            self.user, "Backend Developer", roadmap=STEPS,
+            progress={step: "not_started" for step in STEPS},
+        )
+
+        self.llm = AsyncMock(side_effect=lambda prompt, use_cache=True: {
+            "missing_skills": ["sql"], "explanation": prompt.strip()[:40], "week_1": ["sql"],
+        })
+        patcher = patch("career.artifacts.agenerate_ai_response", self.llm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def url(self, suffix):
+        return f"/api/career/roadmap/{self.roadmap.id}/{suffix}/"
+
+    def test_repeat_views_are_served_from_the_store(self):
+        first = self.client.get(self.url("skills-gap")).json()
+        second = self.client.get(self.url("skills-gap")).json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.llm.await_count, 1)
+
+    def test_args_are_part_of_the_key(self):
+        self.client.post(self.url("explain-step"), {"step": "Step 1"})
+        self.client.post(self.url("explain-step"), {"step": "Step 2"})
+        self.client.post(self.url("explain-step"), {"step": "Step 1"})
+
+        self.assertEqual(self.llm.await_count, 2)
+
+    def test_refresh_regenerates_past_every_cache(self):
+        self.client.get(self.url("weekly-plan"))
+        self.client.get(self.url("weekly-plan"), {"refresh": "true"})
+
+        self.assertEqual(self.llm.await_count, 2)
+        self.assertEqual(self.llm.await_args.kwargs, {"use_cache": False})
+        self.assertEqual(DerivedArtifact.objects.count(), 1)
+
+    def test_overwrite_invalidates(self):
+        self.client.get(self.url("skills-gap"))
+        self.client.post(self.url("chat/apply"), {
+            "candidate_roadmap": {**STEPS, "Step 1": "rewritten"}, "save_mode": "overwrite",
+        }, format="json")
+
+        self.assertFalse(DerivedArtifact.objects.exists())
+        self.client.get(self.url("skills-gap"))
+        self.assertEqual(self.llm.await_count, 2)
+
+    def test_failures_are_not_stored(self):
+        self.llm.side_effect = lambda prompt, use_cache=True: {"error": "AI generation failed"}
+
+        self.client.get(self.url("weekly-plan"))
+        self.client.get(self.url("weekly-plan"))
+
+        self.assertEqual(self.llm.await_count, 2)
+        self.assertFalse(DerivedArtifact.objects.exists())
+
+
+# ============================================================
+# Shared interview question bank (question_bank.py)
+# ============================================================
+def fake_questions(prompt, use_cache=True):
+    count = int(re.search(r"Generate (\d+) distinct", prompt).group(1))
+    fake_questions.calls += 1
+    return {"questions": [f"Question {fake_questions.calls}.{i}?" for i in range(count)]}
+
+
+@override_settings(QUESTION_BANK={"BATCH_SIZE": 15, "TARGET_SIZE": 30, "LOW_WATER": 20, "BACKGROUND_TOPUP": False})
+class QuestionBankTests(TestCase):
+    def setUp(self):
+        fake_questions.calls = 0
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        async_llm = AsyncMock(side_effect=fake_questions)
+        for target, mock in (("agenerate_ai_response", async_llm), ("generate_ai_response", fake_questions)):
+            patcher = patch(f"career.question_bank.{target}", mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def interview(self, roadmap, **params):
+        return self.client.get(f"/api/career/roadmap/{roadmap.id}/mock-interview/", params).json()
+
+    def test_bank_is_shared_across_users_and_spelling(self):
+        mine = create_version(self.user, "Backend Developer", roadmap=STEPS)
+        theirs = create_version(make_user("bob"), "  backend   DEVELOPER ", roadmap=STEPS)
+
+        first = self.interview(mine)["questions"]
+        self.client.force_authenticate(theirs.user)
+        second = self.interview(theirs)["questions"]
+
+        self.assertEqual(fake_questions.calls, 1)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(len(second), 10)
+        self.assertEqual(InterviewQuestionBank.objects.get().career_key, "backend developer")
+
+    def test_warm_bank_serves_without_llm(self):
+        call_command("warm_question_bank", "Backend Developer", stdout=io.StringIO())
+        self.assertEqual(len(InterviewQuestionBank.objects.get().questions), 30)
+
+        calls = fake_questions.calls
+        roadmap = create_version(self.user, "Backend Developer", roadmap=STEPS)
+        body = self.interview(roadmap, count=12)
+
+        self.assertEqual(fake_questions.calls, calls)
+        self.assertEqual(len(set(body["questions"])), 12)
+
+    def test_low_bank_schedules_topup(self):
+        roadmap = create_version(self.user, "Backend Developer", roadmap=STEPS)
+        with patch("career.question_bank.schedule_topup") as topup:
+            self.interview(roadmap)
+        topup.assert_called_once_with("Backend Developer")
+
+        fill_bank("Backend Developer")
+        self.assertEqual(len(InterviewQuestionBank.objects.get().questions), 30)
+
+    def test_partial_bank_is_served_and_topped_up_in_the_background(self):
+        InterviewQuestionBank.objects.create(
+            career_key="backend developer", career_name="Backend Developer", questions=["Q1?", "Q2?", "Q3?"],
+        )
+        roadmap = create_version(self.user, "Backend Developer", roadmap=STEPS)
+
+        with patch("career.question_bank.schedule_topup") as topup:
+            body = self.interview(roadmap)
+
+        self.assertEqual(fake_questions.calls, 0)
+        self.assertEqual(sorted(body["questions"]), ["Q1?", "Q2?", "Q3?"])
+        topup.assert_called_once_with("Backend Developer")
+
+
+# ============================================================
+# Batch step explanations + prefetch (artifacts.py)
+# ============================================================
+def explanation(step):
+    return {"explanation": f"About {step}", "resources": [], "examples": []}
+
+
+@override_settings(EXPLAIN={"CONCURRENCY": 3, "PACK_SIZE": 4})
+class BatchExplainTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.steps = {f"Step {i}": f"topic {i}" for i in range(1, 13)}
+        self.roadmap = create_version(self.user, "Backend Developer", roadmap=self.steps)
+
+        self.in_flight = self.peak = 0
+
+        async def llm(prompt, use_cache=True, max_tokens=800):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+
+            if "Explain each of these roadmap steps" in prompt:
+                asked = json.loads(prompt.split("steps in detail:")[1].split("\n")[1])
+                return {step: explanation(step) for step in asked if step != "Step 6"}
+            return explanation(re.search(r"(Step \d+):", prompt).group(1))
+
+        self.llm = AsyncMock(side_effect=llm)
+        patcher = patch("career.artifacts.agenerate_ai_response", self.llm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def explain(self, **data):
+        return self.client.post(f"/api/career/roadmap/{self.roadmap.id}/explain-steps/", data, format="json")
+
+    def test_parallel_fans_out_under_the_cap(self):
+        body = self.explain(steps="all", mode="parallel").json()
+
+        self.assertEqual(list(body["explanations"]), list(self.steps))
+        self.assertEqual(body["explanations"]["Step 7"], explanation("Step 7"))
+        self.assertEqual(self.llm.await_count, 12)
+        self.assertEqual(self.peak, 3)
+
+    def test_packed_uses_few_calls_and_retries_gaps(self):
+        body = self.explain(steps="all", mode="packed").json()
+
+        self.assertEqual(body["explanations"]["Step 6"], explanation("Step 6"))
+        self.assertEqual(self.llm.await_count, 3 + 1)  # 3 packs of 4, Step 6 retried alone
+
+    def test_batch_fills_the_single_step_store(self):
+        self.explain(steps=["Step 2", "Step 3"], mode="packed")
+        calls = self.llm.await_count
+
+        response = self.client.post(f"/api/career/roadmap/{self.roadmap.id}/explain-step/", {"step": "Step 3"})
+        self.assertEqual(response.json(), explanation("Step 3"))
+        self.assertEqual(self.llm.await_count, calls)
+
+        self.explain(steps=["Step 2", "Step 3"])
+        self.assertEqual(self.llm.await_count, calls)
+
+    def test_invalid_input(self):
+        self.assertEqual(self.explain(steps=["Step 99"]).status_code, 400)
+        self.assertEqual(self.explain(steps="all", mode="serial").status_code, 400)
+
+    def test_prefetch_after_save(self):
+        with patch("career.artifacts._prefetch_pool") as pool:
+            response = self.client.post("/api/career/roadmap/save-version/?prefetch=true", {
+                "career_name": "Backend Developer", "roadmap": self.steps,
+            }, format="json")
+        pool.submit.assert_called_once_with(_prefetch, response.json()["roadmap_id"])
+
+        with patch("career.artifacts._prefetch_pool") as pool:
+            self.client.post("/api/career/roadmap/save-version/", {
+                "career_name": "Backend Developer", "roadmap": self.steps,
+            }, format="json")
+        pool.submit.assert_not_called()  # EXPLAIN["PREFETCH"] is off
+
+
+# ============================================================
+# Insight bundle
+# ============================================================
+class InsightBundleTests(TestCase):
+    INSIGHTS = 3
+
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.roadmap = create_version(self.user, "Backend Developer", roadmap=STEPS)
+
+        # Each call waits (up to a timeout) until every insight's call has
+        # started, so sequential calls show up as a peak of 1, not a hang
+        self.running = self.peak = 0
+        self.all_started = None
+
+        async def llm(prompt, use_cache=True, max_tokens=800):
+            if self.all_started is None:
+                self.all_started = asyncio.Event()
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            if self.running == self.INSIGHTS:
+                self.all_started.set()
+            try:
+                await asyncio.wait_for(self.all_started.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self.running -= 1
+
+            if "6-week" in prompt:
+                return {"week_1": ["basics"]}
+            if "mock interview" in prompt:
+                return {"questions": [f"Q{i}?" for i in range(25)]}
+            return {"error": "AI generation failed"}
+
+        for target in ("career.artifacts.agenerate_ai_response", "career.question_bank.agenerate_ai_response"):
+            patcher = patch(target, AsyncMock(side_effect=llm))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_runs_concurrently_with_partial_results(self):
+        body = self.client.get(f"/api/career/roadmap/{self.roadmap.id}/insights/").json()
+
+        self.assertEqual(self.peak, self.INSIGHTS)  # all in flight at once
+        self.assertEqual(body["insights"]["weekly_plan"], {"week_1": ["basics"]})
+        self.assertEqual(len(body["insights"]["mock_interview"]["questions"]), 10)
+        self.assertEqual(body["errors"], {"skill_gap": "AI generation failed"})
+
+    def test_include_selects_insights(self):
+        self.INSIGHTS = 1
+        body = self.client.get(
+            f"/api/career/roadmap/{self.roadmap.id}/insights/", {"include": "weekly_plan"}
+        ).json()
+        self.assertEqual(list(body["insights"]), ["weekly_plan"])
+
+        response = self.client.get(f"/api/career/roadmap/{self.roadmap.id}/insights/", {"include": "horoscope"})
+        self.assertEqual(response.status_code, 400)
+
+
+# ============================================================
+# Background generation jobs (jobs.py)
+# ============================================================
+@override_settings(JOBS={"EMBEDDED_WORKERS": 0, "RETRY_BACKOFF": 0, "MAX_ATTEMPTS": 3})
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.outputs = []
+        self.generate = Mock(side_effect=lambda **kwargs: self.outputs.pop(0) if self.outputs else {"steps": STEPS})
+        for target, mock in (
+            ("career.jobs.generate_ai_roadmap", self.generate),
+            ("career.jobs.get_or_scrape_reference", Mock(return_value=None)),
+        ):
+            patcher = patch(target, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def submit_preview(self, career="Backend Developer", **params):
+        return self.client.get(f"/api/career/roadmap/{career}/", {"async": "true", **params})
+
+    def test_web_process_starts_no_workers_by_default(self):
+        with override_settings(JOBS={}), patch("career.jobs.WorkerPool") as pool:
+            self.assertEqual(self.submit_preview().status_code, 202)
+        pool.assert_not_called()
+
+    def test_preview_job_round_trip(self):
+        response = self.submit_preview()
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        self.assertEqual(self.client.get(f"/api/career/jobs/{job_id}/result/").status_code, 202)
+        self.assertEqual(run_pending(), 1)
+
+        status = self.client.get(f"/api/career/jobs/{job_id}/").json()
+        self.assertEqual(status["status"], "succeeded")
+        result = self.client.get(f"/api/career/jobs/{job_id}/result/").json()
+        self.assertEqual(result, preview_payload(self.user.id, "Backend Developer", STEPS, None))
+
+    def test_identical_live_requests_share_a_job(self):
+        first = self.submit_preview().json()["job_id"]
+        second = self.submit_preview().json()["job_id"]
+        other = self.submit_preview(preferences=json.dumps({"level": "senior"})).json()["job_id"]
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+        run_pending()
+        self.assertNotEqual(self.submit_preview().json()["job_id"], first)  # finished jobs aren't reused
+
+    def test_failed_attempts_are_retried_then_fail(self):
+        failed = {"steps": {"Step 1": GENERATION_FAILED}}
+
+        self.outputs = [failed]
+        job_id = self.submit_preview().json()["job_id"]
+        run_pending()
+        job = GenerationJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.attempts), ("succeeded", 2))
+
+        self.outputs = [failed] * 3
+        job_id = self.submit_preview(career="DevOps").json()["job_id"]
+        run_pending()
+        response = self.client.get(f"/api/career/jobs/{job_id}/result/")
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.json()["attempts"], 3)
+
+    def test_regenerate_job_creates_the_version(self):
+        old = create_version(self.user, "Backend Developer", roadmap={"Step 1": "old"})
+        response = self.client.post(f"/api/career/roadmap/{old.id}/regenerate/?async=true", {}, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(CareerRoadmap.objects.count(), 1)
+
+        run_pending()
+        result = self.client.get(f"/api/career/jobs/{response.json()['job_id']}/result/").json()
+        self.assertEqual((result["version"], result["steps"]), (2, STEPS))
+        self.assertFalse(self.generate.call_args.kwargs["use_cache"])
+
+    def test_regenerate_job_prefetches_like_the_sync_path(self):
+        old = create_version(self.user, "Backend Developer", roadmap={"Step 1": "old"})
+
+        with patch("career.jobs.schedule_prefetch") as prefetch:
+            self.client.post(f"/api/career/roadmap/{old.id}/regenerate/?async=true&prefetch=true", {}, format="json")
+            run_pending()
+
+        new = latest_version(self.user, "Backend Developer")
+        prefetch.assert_called_once_with(new, force=True)
+
+    def test_deleted_roadmap_fails_without_retries(self):
+        old = create_version(self.user, "Backend Developer", roadmap={"Step 1": "old"})
+        job_id = self.client.post(f"/api/career/roadmap/{old.id}/regenerate/?async=true", {}, format="json").json()["job_id"]
+        soft_delete_version(old)
+
+        run_pending()
+
+        job = GenerationJob.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.attempts), ("failed", 1))
+
+    def test_a_job_is_claimed_once(self):
+        job = submit_job(self.user, "preview", {"career_name": "Backend Developer"})
+
+        self.assertEqual(claim_next("worker-a").pk, job.pk)
+        self.assertIsNone(claim_next("worker-b"))
+
+    def test_expired_lease_is_requeued(self):
+        job = submit_job(self.user, "preview", {"career_name": "Backend Developer"})
+        claim_next("worker-that-died")
+        GenerationJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_expired(), 1)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(GenerationJob.objects.get(pk=job.pk).status, "succeeded")
+
+    def test_jobs_are_private(self):
+        job_id = self.submit_preview().json()["job_id"]
+        self.client.force_authenticate(make_user("mallory"))
+        self.assertEqual(self.client.get(f"/api/career/jobs/{job_id}/").status_code, 404)
+
+
+# ============================================================
+# Career name normalization and reference resolution (names.py)
+# ============================================================
+class CareerNameTests(SimpleTestCase):
+    def test_spellings_share_a_key(self):
+        for name in ("Backend Dev", "backend-developer", "Back End Engineer", "  BACKEND   developer roadmap"):
+            self.assertEqual(career_key(name), "backend developer", name)
+
+        self.assertEqual(career_key("Node.js Developer"), "nodejs developer")
+        self.assertNotEqual(career_key("C++ Developer"), career_key("C# Developer"))
+
+        # Only noise words: keep them rather than collapse to ""
+        self.assertEqual(career_key("How to become a Career Path"), "how to become a career path")
+        self.assertEqual(career_key("Backend Developer Roadmap"), "backend developer")
+
+    def test_fuzzy_matches_typos_but_not_other_careers(self):
+        index = TrigramIndex([(1, "backend developer"), (2, "javascript developer"), (3, "android developer")])
+
+        self.assertEqual(index.search(career_key("Bakend Developer"))[0], 1)
+        self.assertEqual(index.search(career_key("Backend"))[0], 1)  # role word optional
+        self.assertIsNone(index.search(career_key("Java Developer")))
+        self.assertIsNone(index.search(career_key("Data Scientist")))
+
+    def test_fuzzy_never_guesses_between_close_careers(self):
+        index = TrigramIndex([(1, "web3 developer"), (2, "devsecops developer")])
+        self.assertIsNone(index.search(career_key("Web Developer")))
+        self.assertIsNone(index.search(career_key("DevOps Engineer")))
+
+        # "Rust" and "Ruby" are both one edit from "Rubt": no clear winner
+        index = TrigramIndex([(1, "rust developer"), (2, "ruby developer")])
+        self.assertIsNone(index.search(career_key("Rubt Developer")))
+        self.assertEqual(index.search(career_key("Rustt Developer"))[0], 1)
+
+
+class ReferenceResolutionTests(TestCase):
+    def setUp(self):
+        self.reference = RoadmapReference.objects.create(name="Backend Developer", content={"steps": {}})
+        RoadmapReference.objects.create(name="Frontend Developer", content={"steps": {}})
+
+    def test_variants_resolve_to_one_reference(self):
+        for name in ("Backend Dev", "backend-developer", "Back End Engineer"):
+            with self.assertNumQueries(1):
+                self.assertEqual(resolve_reference(name), self.reference)
+
+    def test_fuzzy_hit_is_remembered_as_an_alias(self):
+        self.assertEqual(resolve_reference("Bakend Engineer"), self.reference)
+        self.assertTrue(CareerAlias.objects.filter(alias="bakend developer", reference=self.reference).exists())
+
+        with self.assertNumQueries(2):  # name_key miss, alias hit
+            self.assertEqual(resolve_reference("bakend dev"), self.reference)
+
+        self.assertIsNone(resolve_reference("Data Scientist"))
+
+    def test_borderline_fuzzy_hit_is_not_remembered(self):
+        # "Frontnd Dev" is close enough to answer, not to become an alias
+        with override_settings(CAREER_NAMES={"ALIAS_THRESHOLD": 0.95}):
+            self.assertEqual(resolve_reference("Frontnd Dev").name, "Frontend Developer")
+        self.assertFalse(CareerAlias.objects.exists())
+
+        RoadmapReference.objects.create(name="Web3 Developer", content={"steps": {}})
+        self.assertIsNone(resolve_reference("Web Developer"))
+        self.assertFalse(CareerAlias.objects.exists())
+
+    def test_concurrent_miss_under_another_spelling_reuses_the_row(self):
+        winner = RoadmapReference.objects.create(name="Data Engineer", content={"steps": {}})
+
+        with patch("career.references.resolve_reference", return_value=None):
+            reference = save_reference("data developer", {"steps": {"Step 1": "SQL"}})
+
+        self.assertEqual(reference.pk, winner.pk)
+        self.assertEqual(RoadmapReference.objects.filter(name_key="data developer").count(), 1)
+
+    def test_noise_only_names_are_distinct_careers(self):
+        roadmap = save_reference("Roadmap", {"steps": {"Step 1": "Plan"}})
+        career_path = save_reference("Career Path", {"steps": {"Step 1": "Explore"}})
+        plain = RoadmapReference.objects.create(name="!!!", content={"steps": {}})
+
+        self.assertEqual(RoadmapReference.objects.count(), 5)
+        self.assertEqual((roadmap.name_key, career_path.name_key, plain.name_key), ("roadmap", "career path", "!!!"))
+        self.assertEqual(resolve_reference("roadmap", fuzzy=False), roadmap)
+        self.assertEqual(resolve_reference("Career-Path", fuzzy=False), career_path)
+
+    def test_preview_for_a_variant_reuses_the_reference(self):
+        client = APIClient()
+        client.force_authenticate(make_user())
+        generate = AsyncMock(return_value={"steps": STEPS})
+        scrape = Mock(return_value=None)
+
+        with (
+            patch("career.views.agenerate_ai_roadmap", generate),
+            patch("career.views.get_or_scrape_reference_in_thread", scrape),
+        ):
+            response = client.get("/api/career/roadmap/Back End Engineer/")
+
+        self.assertEqual(response.status_code, 200)
+        scrape.assert_not_called()
+        self.assertEqual(generate.call_args.kwargs["career_name"], "Backend Developer")
+        self.assertEqual(response.json()["roadmap"]["name"], "Back End Engineer")
+
+
+# ============================================================
+# Relevance-pruned chat context (chat_context.py)
+# ============================================================
+@override_settings(CHAT_CONTEXT={"BUDGET": 2000, "LOG": False})
+class ChatContextTests(SimpleTestCase):
+    def setUp(self):
+        self.roadmap = {
+            f"Step {i}": f"Topic {i}: " + ("Docker and containers" if i == 7 else "core theory") + " lorem ipsum" * 12
+            for i in range(1, 31)
+        }
+
+    def test_small_roadmaps_keep_the_full_prompt(self):
+        prompt = build_chat_prompt("Explain step 2", STEPS, {"level": "beginner"})
+        self.assertIn(f"Current roadmap:\n{json.dumps(STEPS)}\n\nUser preferences:", prompt)
+        self.assertNotIn("UNCHANGED", prompt)
+
+    def test_relevant_steps_in_full_within_budget(self):
+        context, abbreviated = build_context("Can you split step 4? Also more Docker please", self.roadmap)
+
+        self.assertLessEqual(len(json.dumps(context)), 2000)
+        self.assertGreater(len(json.dumps(self.roadmap)), 2000)
+        self.assertEqual(list(context), list(self.roadmap))
+        self.assertEqual(context["Step 4"], self.roadmap["Step 4"])
+        self.assertEqual(context["Step 7"], self.roadmap["Step 7"])
+        self.assertIn("Step 12", abbreviated)
+        self.assertTrue(context["Step 12"].endswith("..."))
+
+    def test_update_format_is_unchanged(self):
+        # The model keeps abbreviated steps by name (also after moving them)
+        # or echoes their outline; clients still get the full text
+        answer = {
+            "message": "Split step 4 into two steps.",
+            "updated_roadmap": {
+                **{step: "UNCHANGED" for step in self.roadmap if step not in ("Step 4", "Step 5")},
+                "Step 4": "Topic 4a: theory",
+                "Step 5": "UNCHANGED: Step 4",
+                "Step 6": build_context("step 4", self.roadmap)[0]["Step 6"],
+            },
+        }
+
+        with patch("career.ai.generate_ai_response", Mock(return_value=answer)) as generate:
+            result = roadmap_chat_ai("Split step 4 into two", self.roadmap, {})
+
+        self.assertIn("never copy their text", generate.call_args.args[0])
+        self.assertEqual(result["message"], answer["message"])
+        updated = result["updated_roadmap"]
+        self.assertEqual(list(updated), list(answer["updated_roadmap"]))
+        self.assertEqual(updated["Step 4"], "Topic 4a: theory")
+        self.assertEqual(updated["Step 5"], self.roadmap["Step 4"])
+        self.assertEqual(updated["Step 6"], self.roadmap["Step 6"])
+        self.assertEqual(updated["Step 30"], self.roadmap["Step 30"])
+
+        plain = {"message": "Docker is covered in step 7."}
+        with patch("career.ai.generate_ai_response", Mock(return_value=plain)):
+            self.assertEqual(roadmap_chat_ai("Where is Docker?", self.roadmap, {}), plain)
+
+    def test_echoed_outlines_expand_after_renumbering(self):
+        # A step inserted before Step 12 shifts its outline to "Step 13"
+        outlines = build_context("step 4", self.roadmap)[0]
+        updated = {"Step 12": "Topic 11b: new", "Step 13": outlines["Step 12"], "Step 14": outlines["Step 13"]}
+
+        expanded = expand_update({"updated_roadmap": updated}, self.roadmap)["updated_roadmap"]
+
+        self.assertEqual(expanded["Step 12"], "Topic 11b: new")
+        self.assertEqual(expanded["Step 13"], self.roadmap["Step 12"])
+        self.assertEqual(expanded["Step 14"], self.roadmap["Step 13"])
+
+    def test_ambiguous_outline_is_left_as_is(self):
+        roadmap = {"Step 1": "Learn Python basics", "Step 2": "Learn Python packaging"}
+        updated = {"Step 3": "Learn Python..."}
+        self.assertEqual(expand_update({"updated_roadmap": updated}, roadmap)["updated_roadmap"], updated)
+
+    def test_context_size_is_logged(self):
+        context, abbreviated = build_context("step 4", self.roadmap)
+
+        with self.assertLogs("career.chat_context", "INFO") as logs:
+            with override_settings(CHAT_CONTEXT={"BUDGET": 2000, "LOG": True}):
+                log_context(self.roadmap, context, abbreviated)
+        self.assertIn(f"{len(json.dumps(context))}/{len(json.dumps(self.roadmap))} chars", logs.output[0])
+
+        with self.assertNoLogs("career.chat_context"):
+            log_context(self.roadmap, context, abbreviated)
+
+
+# ============================================================
+# Patch-based chat edits (patches.py)
+# ============================================================
+class RoadmapPatchTests(TestCase):
+    def test_operations_apply_and_renumber(self):
+        roadmap = {f"Step {i}": f"Topic {i}" for i in range(1, 6)}
+
+        patched = apply_patch(roadmap, [
+            {"op": "replace", "step": "Step 2", "text": "Topic 2, revised"},
+            {"op": "insert", "after": "Step 3", "text": "New A"},
+            {"op": "insert", "after": "Step 3", "text": "New B"},
+            {"op": "insert", "after": None, "text": "Intro"},
+            {"op": "delete", "step": "Step 5"},
+            {"op": "reorder", "order": ["Step 4", "Step 3"]},
+        ])
+
+        self.assertEqual(list(patched.values()), [
+            "Topic 4", "Topic 3", "New A", "New B", "Intro", "Topic 1", "Topic 2, revised",
+        ])
+        self.assertEqual(list(patched), [f"Step {i}" for i in range(1, 8)])
+        self.assertEqual(roadmap["Step 5"], "Topic 5")  # input untouched
+
+    def test_invalid_patches_are_rejected(self):
+        for ops in (
+            [],
+            [{"op": "rewrite"}],
+            [{"op": "delete", "step": "Step 9"}],
+            [{"op": "replace", "step": "Step 1", "text": ""}],
+            [{"op": "delete", "step": "Step 1"}, {"op": "delete", "step": "Step 2"}],
+            # A missing name must not match an inserted (still unnamed) step
+            [{"op": "insert", "after": "Step 1", "text": "x"}, {"op": "delete"}],
+            [{"op": "insert", "after": "Step 1", "text": "x"}, {"op": "replace", "step": None, "text": "y"}],
+        ):
+            with self.assertRaises(PatchError):
+                apply_patch({"Step 1": "a", "Step 2": "b"}, ops)
+
+    def test_reorder_keeps_a_new_first_step_first(self):
+        patched = apply_patch({"Step 1": "a", "Step 2": "b", "Step 3": "c"}, [
+            {"op": "insert", "after": None, "text": "new first"},
+            {"op": "reorder", "order": ["Step 1", "Step 3", "Step 2"]},
+        ])
+        self.assertEqual(list(patched.values()), ["new first", "a", "c", "b"])
+
+    def test_chat_patch_becomes_candidate_roadmap(self):
+        user = make_user()
+        roadmap = create_version(user, "Backend Developer", roadmap=STEPS)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        answer = {"message": "Added Docker.", "patch": [{"op": "insert", "after": "Step 5", "text": "Docker"}]}
+        with patch("career.ai.agenerate_ai_response", AsyncMock(return_value=answer)):
+            body = client.post(f"/api/career/roadmap/{roadmap.id}/chat/", {"message": "add docker"}, format="json").json()
+
+        candidate = body["candidate_roadmap"]
+        self.assertEqual((body["updated"], body["pending_save"]), (True, True))
+        self.assertEqual(len(candidate), len(STEPS) + 1)
+        self.assertEqual((candidate["Step 6"], candidate["Step 7"]), ("Docker", STEPS["Step 6"]))
+
+        response = client.post(f"/api/career/roadmap/{roadmap.id}/chat/apply/", {
+            "candidate_roadmap": candidate, "save_mode": "new_version",
+        }, format="json")
+        self.assertEqual(latest_version(user, "Backend Developer").roadmap, candidate)
+        self.assertEqual(response.json()["new_version"], 2)
+
+        # A patch that doesn't apply is reported, not claimed as done
+        broken = {"message": "Removed it.", "patch": [{"op": "delete", "step": "Step 99"}]}
+        with patch("career.ai.agenerate_ai_response", AsyncMock(return_value=broken)), \
+                self.assertLogs("career.patches", "WARNING") as logs:
+            body = client.post(f"/api/career/roadmap/{roadmap.id}/chat/", {"message": "drop"}, format="json").json()
+        self.assertEqual(body, {
+            "message": "I couldn't apply that change: Unknown step: Step 99. Your roadmap was not modified.",
+            "updated": False,
+            "pending_save": False,
+        })
+        self.assertIn("Unknown step: Step 99", logs.output[0])
+
+
+# ============================================================
+# Pluggable LLM backends (llm.py)
+# ============================================================
+class LLMBackendTests(TestCase):
+    def generate(self, career="Backend Developer"):
+        return generate_ai_roadmap(user_id=1, career_name=career, use_cache=False)
+
+    @override_settings(LLM_BACKEND={"BACKEND": "fake"})
+    def test_fake_answers_every_prompt_offline(self):
+        roadmap = self.generate()
+        self.assertEqual(len(roadmap["steps"]), 8)
+        self.assertEqual(roadmap, self.generate())
+        self.assertNotEqual(roadmap, self.generate("Data Scientist"))
+
+        prompt = build_questions_prompt("Backend Developer", 12, [])
+        self.assertEqual(len(async_to_sync(agenerate_ai_response)(prompt, use_cache=False)["questions"]), 12)
+
+        async def stream():
+            return [event async for event in astream_ai_roadmap("Backend Developer", use_cache=False)]
+        events = async_to_sync(stream)()
+        self.assertEqual(events[-1][2], roadmap)
+        self.assertEqual([name for kind, name, _ in events if kind == "step"], list(roadmap["steps"]))
+
+    @override_settings(LLM_BACKEND={"BACKEND": "fake", "FAKE_ERROR_RATE": 1.0, "FAKE_LATENCY": 0.01})
+    def test_fake_errors_and_latency(self):
+        start = time.perf_counter()
+        self.assertEqual(self.generate(), {"steps": {"Step 1": GENERATION_FAILED}})
+        self.assertGreaterEqual(time.perf_counter() - start, 0.01)
+
+    def test_record_then_replay(self):
+        with tempfile.TemporaryDirectory() as fixtures:
+            backend = {"RECORD_FROM": "fake", "FIXTURE_DIR": fixtures}
+
+            with override_settings(LLM_BACKEND={**backend, "BACKEND": "replay"}):
+                self.assertEqual(self.generate(), {"steps": {"Step 1": GENERATION_FAILED}})  # nothing recorded yet
+
+            with override_settings(LLM_BACKEND={**backend, "BACKEND": "record"}):
+                recorded = self.generate()
+            self.assertEqual(len(list(Path(fixtures).glob("*.json"))), 1)
+
+            with override_settings(LLM_BACKEND={**backend, "BACKEND": "replay"}):
+                self.assertEqual(self.generate(), recorded)
+
+
+# ============================================================
+# End-to-end API benchmark (management/commands/bench_api.py)
+# ============================================================
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class APIBenchmarkTests(TestCase):
+    def test_every_endpoint_runs_clean_on_the_fake_backend(self):
+        out = io.StringIO()
+        call_command(
+            "bench_api", users=2, careers=2, versions=3, requests=2, baseline="", json=True, current_db=True, stdout=out,
+        )
+        report = json.loads(out.getvalue())
+
+        routed = {
+            str(pattern.pattern)
+            for module in ("career.urls", "users.urls")
+            for pattern in import_module(module).urlpatterns
+        }
+        self.assertGreaterEqual(len(report["endpoints"]), len(routed))
+        for name, row in report["endpoints"].items():
+            self.assertEqual(row["errors"], 0, row.get("first_error"))
+            self.assertLessEqual(row["p50_ms"], row["p99_ms"])
+        self.assertFalse(CareerRoadmap.objects.exists())  # seeded data rolled back
+
+    def test_regressions_against_a_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = Path(tmp) / "baseline.json"
+            options = {
+                "users": 1, "careers": 1, "versions": 2, "requests": 2, "only": "career.detail",
+                "current_db": True, "stdout": io.StringIO(),
+            }
+            call_command("bench_api", baseline=str(baseline), save_baseline=True, **options)
+
+            saved = json.loads(baseline.read_text())
+            saved["endpoints"]["career.detail"]["queries_per_request"] -= 1
+            baseline.write_text(json.dumps(saved))
+
+            with self.assertRaisesRegex(CommandError, "1 endpoint"):
+                call_command("bench_api", baseline=str(baseline), check=True, **options)
+
+    def test_llm_cache_is_cold_unless_asked(self):
+        options = {
+            "users": 1, "careers": 1, "versions": 1, "requests": 5, "only": "career.preview",
+            "baseline": "", "current_db": True, "stdout": io.StringIO(),
+        }
+        calls = []
+        for warm in (False, True):
+            with patch("career.llm.fake_answer", side_effect=fake_answer) as answer:
+                call_command("bench_api", warm_llm_cache=warm, **options)
+            calls.append(answer.call_count)
+
+        # Requests 0 and 4 preview the same career: only a warm cache replays it
+        self.assertEqual(calls, [5, 4])
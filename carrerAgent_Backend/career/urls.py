@@ -8,28 +8,43 @@ from .views import (
     SkillGapView,
     WeeklyPlanView,
     ExplainStepView,
+    ExplainStepsView,
     MockInterviewView,
     UpdateProgressView,
+    BatchProgressView,
     ProgressSummaryView,
+    ProgressDashboardView,
     RoadmapChatView,
     SaveRoadmapVersionView,
     ApplyChatUpdateView,
+    RoadmapLineageView,
+    RoadmapInsightsView,
+    JobStatusView,
+    JobResultView,
     )
 
 urlpatterns = [
-    path('roadmap/<path:career_name>/', CareerRoadmapView.as_view(), name='career_roadmap'),
     path("roadmap/save-version/", SaveRoadmapVersionView.as_view(), name="roadmap-save-version"),
     path("my-roadmaps/", UserRoadmapListView.as_view()),
+    path("jobs/<uuid:job_id>/", JobStatusView.as_view(), name="job-status"),
+    path("jobs/<uuid:job_id>/result/", JobResultView.as_view(), name="job-result"),
+    path("progress/dashboard/", ProgressDashboardView.as_view(), name="progress-dashboard"),
     path("roadmap/<int:pk>/", UserRoadmapDetailView.as_view()),
     path("roadmap/<int:pk>/delete/", UserRoadmapDeleteView.as_view()),
     path("roadmap/<int:pk>/regenerate/", UserRoadmapRegenerateView.as_view()),
     path("roadmap/<int:pk>/skills-gap/", SkillGapView.as_view(), name="skills-gap"),
     path("roadmap/<int:pk>/weekly-plan/", WeeklyPlanView.as_view(), name="weekly-plan"),
     path("roadmap/<int:pk>/explain-step/", ExplainStepView.as_view(), name="explain-step"),
+    path("roadmap/<int:pk>/explain-steps/", ExplainStepsView.as_view(), name="explain-steps"),
     path("roadmap/<int:pk>/mock-interview/", MockInterviewView.as_view(), name="mock-interview"),
     path("roadmap/<int:pk>/update-progress/", UpdateProgressView.as_view(), name="update-progress"),
+    path("roadmap/<int:pk>/progress/batch/", BatchProgressView.as_view(), name="progress-batch"),
     path("roadmap/<int:pk>/progress-summary/", ProgressSummaryView.as_view(), name="progress-summary"),
     path("roadmap/<int:pk>/chat/", RoadmapChatView.as_view(), name="roadmap-chat"),
     path("roadmap/<int:pk>/chat/apply/", ApplyChatUpdateView.as_view(), name="roadmap-chat-apply"),
-    
+    path("roadmap/<int:pk>/insights/", RoadmapInsightsView.as_view(), name="roadmap-insights"),
+    path("roadmap/<int:pk>/lineage/", RoadmapLineageView.as_view(), name="roadmap-lineage"),
+
+    # Catch-all career name: must stay last or it shadows the routes above
+    path('roadmap/<path:career_name>/', CareerRoadmapView.as_view(), name='career_roadmap'),
 ]
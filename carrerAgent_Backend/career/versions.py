@@ -0,0 +1,113 @@
+# versions.py
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import CareerRoadmap, LatestRoadmapVersion
+
+
+# ============================================================
+# Version creation + "latest version" pointer maintenance
+#
+# Every new CareerRoadmap version goes through create_version()
+# so LatestRoadmapVersion stays in step with the table, and
+# version numbers keep increasing per (user, career_name): the
+# number of a soft-deleted version is never handed out again.
+# ============================================================
+CREATE_ATTEMPTS = 3
+def latest_version(user, career_name):
+    """Newest live version for (user, career) via the pointer: one indexed read."""
+    pointer = (
+        LatestRoadmapVersion.objects
+        .select_related("roadmap__reference")
+        .filter(user=user, career_name=career_name)
+        .first()
+    )
+    return pointer.roadmap if pointer else None
+
+
+async def alatest_version(user, career_name):
+    pointer = await (
+        LatestRoadmapVersion.objects
+        .select_related("roadmap__reference")
+        .filter(user=user, career_name=career_name)
+        .afirst()
+    )
+    return pointer.roadmap if pointer else None
+
+
+def _locked_pointer(user, career_name):
+    return (
+        LatestRoadmapVersion.objects
+        .select_for_update()
+        .filter(user=user, career_name=career_name)
+        .first()
+    )
+
+
+def _create_version(user, career_name, fields):
+    pointer = _locked_pointer(user, career_name)
+
+    # Numbered after every row, deleted ones included
+    previous = CareerRoadmap.objects.filter(
+        user=user, career_name=career_name
+    ).aggregate(v=Max("version"))["v"]
+    version = max(previous or 0, pointer.version if pointer else 0) + 1
+
+    roadmap = CareerRoadmap.objects.create(
+        user=user, career_name=career_name, version=version, **fields
+    )
+
+    if pointer:
+        pointer.roadmap = roadmap
+        pointer.version = version
+        pointer.save(update_fields=["roadmap", "version", "updated_at"])
+    else:
+        LatestRoadmapVersion.objects.create(
+            user=user, career_name=career_name, roadmap=roadmap, version=version
+        )
+    return roadmap
+
+
+def create_version(user, career_name, **fields):
+    """
+    Create the next version of (user, career_name) and move the
+    pointer to it. `version` is always the highest version so far + 1.
+    """
+    for attempt in range(CREATE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return _create_version(user, career_name, fields)
+        except IntegrityError:
+            # Without a pointer there is no row to lock: a concurrent
+            # first save created it. Retry, now waiting on its lock.
+            if attempt == CREATE_ATTEMPTS - 1:
+                raise
+
+
+def refresh_latest_pointer(user, career_name):
+    """Re-point after a version disappears (soft delete)."""
+    with transaction.atomic():
+        latest = (
+            CareerRoadmap.objects
+            .filter(user=user, career_name=career_name, is_deleted=False)
+            .order_by("-version")
+            .only("id", "version")
+            .first()
+        )
+
+        if latest is None:
+            LatestRoadmapVersion.objects.filter(user=user, career_name=career_name).delete()
+            return None
+
+        LatestRoadmapVersion.objects.update_or_create(
+            user=user,
+            career_name=career_name,
+            defaults={"roadmap": latest, "version": latest.version},
+        )
+        return latest
+
+
+def soft_delete_version(roadmap):
+    roadmap.is_deleted = True
+    roadmap.save(update_fields=["is_deleted", "updated_at"])
+    refresh_latest_pointer(roadmap.user_id, roadmap.career_name)
@@ -1,23 +1,103 @@
+import asyncio
 import json
 from datetime import datetime, timedelta
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import Sum
+from django.shortcuts import aget_object_or_404, get_object_or_404
+
+from .models import CareerRoadmap, GenerationJob, LatestRoadmapVersion
+from .ai import (
+    agenerate_ai_roadmap,
+    aroadmap_chat_ai,
+    areplay_roadmap,
+    astream_ai_roadmap,
+    generate_ai_roadmap,
+)
+from .artifacts import (
+    EXPLAIN_MODES,
+    aexplain_steps,
+    aget_artifact,
+    invalidate_artifacts,
+    schedule_prefetch,
+)
+from .jobs import submit_job
+from .lineage import version_lineage
+from .pagination import InvalidCursor, keyset_page, parse_limit
+from .payloads import chat_payload, preview_payload, regenerate_payload
+from .progress import ProgressConflict, ProgressError, apply_progress
+from .question_bank import asample_questions
+from .names import career_key
+from .references import generation_name, get_or_scrape_reference_in_thread, resolve_reference
+from .singleflight import canonical_key, roadmap_flight, scrape_flight
+from .versions import alatest_version, create_version, latest_version, soft_delete_version
+
+# AI-backed views subclass adrf's AsyncAPIView: served through
+# backend/asgi.py, an in-flight LLM call only parks a coroutine
+# instead of holding a whole worker for the full generation.
+
+
+async def aget_roadmap_or_404(**lookup):
+    """aget_object_or_404 with the roadmap steps already rebuilt (async-safe)."""
+    roadmap = await aget_object_or_404(CareerRoadmap, **lookup)
+    await roadmap.aload_roadmap()
+    return roadmap
+
+
+def wants_prefetch(request):
+    """?prefetch=true on a save: explain every step in the background."""
+    return request.GET.get("prefetch") == "true"
+
+
+def wants_job(request):
+    """?async=true: queue the LLM work as a GenerationJob and answer 202."""
+    return request.GET.get("async") == "true"
+
+
+def job_body(job):
+    return {
+        "job_id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "error": job.error or None,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "status_url": f"/api/career/jobs/{job.id}/",
+        "result_url": f"/api/career/jobs/{job.id}/result/",
+    }
+
+
+def job_accepted(job):
+    return Response(job_body(job), status=202)
 
-from .models import CareerRoadmap, RoadmapReference
-from .ai import generate_ai_roadmap, generate_ai_response, roadmap_chat_ai
-from .scraper import scrape_roadmap
+
+# ============================================================
+# Server-Sent Events helpers
+# ============================================================
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
 
 
 
 # ============================================================
 # 1) MAIN: Generate Roadmap PREVIEW (NOT SAVED)
 # ============================================================
-class CareerRoadmapView(APIView):
+class CareerRoadmapView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, career_name):
+    async def get(self, request, career_name):
         user = request.user
 
         # Parse preferences
@@ -27,17 +107,20 @@ class CareerRoadmapView(APIView):
         except:
             preferences = {}
 
+        # ?refresh=true bypasses the LLM response cache
+        use_cache = request.GET.get("refresh") != "true"
+
+        # ?stream=true sends each step over SSE as soon as it is parsed
+        stream = request.GET.get("stream") == "true"
+
         # Check if user already saved roadmap for this career
-        saved_roadmap = (
-            CareerRoadmap.objects
-            .filter(user=user, career_name=career_name, is_deleted=False)
-            .order_by("-version")
-            .first()
-        )
+        # (latest-version pointer: one indexed read, no version sort)
+        saved_roadmap = await alatest_version(user, career_name)
 
         # Return last SAVED version
         if saved_roadmap:
-            return Response({
+            await saved_roadmap.aload_roadmap()
+            payload = {
                 "roadmap": {
                     "name": career_name,
                     "steps": saved_roadmap.roadmap,
@@ -48,42 +131,88 @@ class CareerRoadmapView(APIView):
                 },
                 "saved": True,
                 "source": "user_db"
+            }
+
+            if stream:
+                async def saved_events():
+                    yield sse_event("roadmap", payload)
+                return sse_response(saved_events())
+
+            return Response(payload)
+
+        # ?async=true: queue the generation, client polls jobs/<id>/
+        if wants_job(request):
+            job = await sync_to_async(submit_job)(user, "preview", {
+                "career_name": career_name,
+                "preferences": preferences,
+                "use_cache": use_cache,
             })
+            return job_accepted(job)
 
-        # Otherwise generate preview
-        reference = RoadmapReference.objects.filter(name__iexact=career_name).first()
-        reference_content = reference.content if reference else None
+        # Otherwise generate preview. A stored reference is used as-is,
+        # even if stale (refresh_references re-scrapes it later); only a
+        # miss scrapes, once per career, and the result is persisted.
+        # Any spelling of the career ("Backend Dev", "back-end engineer")
+        # resolves to the same reference and the same flight keys.
+        reference = await sync_to_async(resolve_reference)(career_name)
 
         if not reference:
             try:
-                reference_content = scrape_roadmap(career_name)
+                reference = await scrape_flight.ado(
+                    canonical_key(career_key(career_name)),
+                    # A cold scrape blocks on HTTP: keep it off the shared sync thread
+                    sync_to_async(get_or_scrape_reference_in_thread, thread_sensitive=False),
+                    career_name,
+                )
             except:
-                reference_content = None
+                reference = None
+
+        reference_content = reference.content if reference else None
+
+        if stream:
+            return sse_response(self.stream_preview(
+                user, career_name, reference, reference_content, preferences, use_cache
+            ))
 
-        # Generate unsaved roadmap preview
-        ai_output = generate_ai_roadmap(
+        # Generate unsaved roadmap preview; identical concurrent
+        # requests (career + preferences) share one LLM call
+        ai_output = await roadmap_flight.ado(
+            canonical_key(career_key(career_name), preferences),
+            agenerate_ai_roadmap,
             user_id=user.id,
-            career_name=career_name,
+            career_name=generation_name(career_name, reference),
             reference_content=reference_content,
-            preferences=preferences
+            preferences=preferences,
+            use_cache=use_cache
         )
 
-        steps = ai_output.get("steps", {})
-        preview_progress = {step: "not_started" for step in steps.keys()}
+        return Response(preview_payload(user.id, career_name, ai_output.get("steps", {}), reference))
 
-        return Response({
-            "roadmap": {
-                "name": career_name,
-                "steps": steps,
-                "progress": preview_progress,
-                "source_url": reference.source_url if reference else None,
-                "preview": True,
-                "version": None,
-                "personalized_for": str(user.id)
-            },
-            "saved": False,
-            "source": "preview"
-        })
+    async def stream_preview(self, user, career_name, reference, reference_content, preferences, use_cache):
+        """
+        SSE stream for the preview:
+            event: step     -> {"step": "Step N", "text": "..."}   (one per step)
+            event: roadmap  -> same body as the non-streaming response
+        """
+        # Leads the same flight as the non-streaming preview: identical
+        # requests (streamed or not) wait for this stream's roadmap,
+        # and a stream that arrives second replays it
+        events = roadmap_flight.astream(
+            canonical_key(career_key(career_name), preferences),
+            astream_ai_roadmap,
+            areplay_roadmap,
+            career_name=generation_name(career_name, reference),
+            reference_content=reference_content,
+            preferences=preferences,
+            use_cache=use_cache,
+        )
+
+        async for kind, name, value in events:
+            if kind == "step":
+                yield sse_event("step", {"step": name, "text": value})
+                continue
+
+            yield sse_event("roadmap", preview_payload(user.id, career_name, value.get("steps", {}), reference))
 
 
 
@@ -104,29 +233,24 @@ class SaveRoadmapVersionView(APIView):
             return Response({"error": "Missing fields"}, status=400)
 
         # Fetch last version
-        last = CareerRoadmap.objects.filter(
-            user=user,
-            career_name=career_name,
-            is_deleted=False
-        ).order_by("-version").first()
+        last = latest_version(user, career_name)
 
-        version = last.version + 1 if last else 1
         progress = {step: "not_started" for step in roadmap.keys()}
 
-        new_entry = CareerRoadmap.objects.create(
+        new_entry = create_version(
             user=user,
             career_name=career_name,
             roadmap=roadmap,
             preferences=preferences,
             reference=None,
-            version=version,
             progress=progress,
             parent=last if last else None
         )
+        schedule_prefetch(new_entry, force=wants_prefetch(request))
 
         return Response({
             "message": "Roadmap saved successfully",
-            "version": version,
+            "version": new_entry.version,
             "roadmap_id": new_entry.id
         })
 
@@ -135,39 +259,26 @@ class SaveRoadmapVersionView(APIView):
 # ============================================================
 # 3) CHAT WITH AI (Preview Update Only — NO SAVE)
 # ============================================================
-class RoadmapChatView(APIView):
+class RoadmapChatView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, pk):
+    async def post(self, request, pk):
         user_message = request.data.get("message")
 
-        roadmap_obj = get_object_or_404(
-            CareerRoadmap, pk=pk, user=request.user, is_deleted=False
-        )
+        if wants_job(request):
+            await aget_object_or_404(CareerRoadmap, pk=pk, user=request.user, is_deleted=False)
+            job = await sync_to_async(submit_job)(request.user, "chat", {"roadmap_id": pk, "message": user_message})
+            return job_accepted(job)
+
+        roadmap_obj = await aget_roadmap_or_404(pk=pk, user=request.user, is_deleted=False)
 
-        ai_response = roadmap_chat_ai(
+        ai_response = await aroadmap_chat_ai(
             user_message=user_message,
             roadmap=roadmap_obj.roadmap,
             preferences=roadmap_obj.preferences
         )
 
-        updated = ai_response.get("updated_roadmap")
-
-        # If AI edited roadmap, return candidate roadmap (NOT SAVED)
-        if updated:
-            return Response({
-                "message": ai_response.get("message"),
-                "updated": True,
-                "candidate_roadmap": updated,
-                "pending_save": True
-            })
-
-        # Normal chat response
-        return Response({
-            "message": ai_response.get("message"),
-            "updated": False,
-            "pending_save": False
-        })
+        return Response(chat_payload(ai_response))
 
 
 
@@ -198,23 +309,21 @@ class ApplyChatUpdateView(APIView):
 
         # Save as NEW version
         if save_mode == "new_version":
-            new_version = roadmap.version + 1
-
-            new_entry = CareerRoadmap.objects.create(
+            new_entry = create_version(
                 user=request.user,
                 career_name=roadmap.career_name,
                 roadmap=new_steps,
                 preferences=roadmap.preferences,
                 reference=roadmap.reference,
-                version=new_version,
                 progress=new_progress,
                 parent=roadmap
             )
+            schedule_prefetch(new_entry, force=wants_prefetch(request))
 
             return Response({
                 "message": "New version created",
                 "saved": True,
-                "new_version": new_version,
+                "new_version": new_entry.version,
                 "roadmap": new_steps
             })
 
@@ -222,7 +331,10 @@ class ApplyChatUpdateView(APIView):
         if save_mode == "overwrite":
             roadmap.roadmap = new_steps
             roadmap.progress = new_progress
+            roadmap.progress_revision += 1  # in-flight progress writes must re-read
             roadmap.save()
+            invalidate_artifacts(roadmap)
+            schedule_prefetch(roadmap, force=wants_prefetch(request))
 
             return Response({
                 "message": "Roadmap overwritten",
@@ -237,31 +349,52 @@ class ApplyChatUpdateView(APIView):
 # 5) LIST ALL USER ROADMAPS
 # ============================================================
 class UserRoadmapListView(APIView):
+    """
+    GET my-roadmaps/?career=&tag=&limit=&cursor=&fields=id,career_name,...
+
+    Newest first, keyset-paginated; pass back `next_cursor` as `cursor`
+    for the next page. Only the requested columns are read, never the
+    roadmap JSON itself.
+    """
     permission_classes = [IsAuthenticated]
 
+    LIST_FIELDS = ("id", "career_name", "preferences", "version", "created_at", "progress", "tags", "updated_at")
+    DEFAULT_FIELDS = ("id", "career_name", "preferences", "version", "created_at", "progress")
+
     def get(self, request):
         user = request.user
 
         career_filter = request.GET.get("career")
         tag_filter = request.GET.get("tag")
 
-        qs = CareerRoadmap.objects.filter(user=user, is_deleted=False).order_by("-created_at")
+        fields = self.DEFAULT_FIELDS
+        if request.GET.get("fields"):
+            fields = tuple(f.strip() for f in request.GET["fields"].split(",") if f.strip())
+            unknown = set(fields) - set(self.LIST_FIELDS)
+            if unknown:
+                return Response({"error": f"Unknown fields: {', '.join(sorted(unknown))}"}, status=400)
+
+        qs = CareerRoadmap.objects.filter(user=user, is_deleted=False)
 
         if career_filter:
             qs = qs.filter(career_name__icontains=career_filter)
         if tag_filter:
             qs = qs.filter(tags__contains=[tag_filter])
 
-        data = [{
-            "id": r.id,
-            "career_name": r.career_name,
-            "preferences": r.preferences,
-            "version": r.version,
-            "created_at": r.created_at,
-            "progress": r.progress,
-        } for r in qs]
+        # id + created_at are always read: they make up the cursor
+        columns = list(dict.fromkeys(("id", "created_at") + fields))
+        try:
+            rows, next_cursor = keyset_page(
+                qs.values(*columns),
+                cursor=request.GET.get("cursor"),
+                limit=parse_limit(request.GET.get("limit")),
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
 
-        return Response({"roadmaps": data})
+        data = [{field: row[field] for field in fields} for row in rows]
+
+        return Response({"roadmaps": data, "next_cursor": next_cursor})
 
 
 
@@ -301,8 +434,7 @@ class UserRoadmapDeleteView(APIView):
         roadmap = get_object_or_404(
             CareerRoadmap, pk=pk, user=request.user, is_deleted=False
         )
-        roadmap.is_deleted = True
-        roadmap.save()
+        soft_delete_version(roadmap)
 
         return Response({"message": "Roadmap deleted (soft delete)"})
 
@@ -320,6 +452,15 @@ class UserRoadmapRegenerateView(APIView):
         )
 
         new_preferences = request.data.get("preferences", {})
+
+        if wants_job(request):
+            job = submit_job(request.user, "regenerate", {
+                "roadmap_id": old.pk,
+                "preferences": new_preferences,
+                "prefetch": wants_prefetch(request),
+            })
+            return job_accepted(job)
+
         reference_content = old.reference.content if old.reference else None
         career_name = old.career_name
 
@@ -327,204 +468,352 @@ class UserRoadmapRegenerateView(APIView):
             user_id=request.user.id,
             career_name=career_name,
             reference_content=reference_content,
-            preferences=new_preferences
+            preferences=new_preferences,
+            use_cache=False  # regenerate must never replay a cached roadmap
         )
 
         new_steps = new_data.get("steps", {})
         new_progress = {step: "not_started" for step in new_steps.keys()}
 
-        new_version = old.version + 1
-
-        new_entry = CareerRoadmap.objects.create(
+        new_entry = create_version(
             user=request.user,
             career_name=career_name,
             roadmap=new_steps,
             preferences=new_preferences,
             reference=old.reference,
-            version=new_version,
             progress=new_progress,
             parent=old,
         )
+        schedule_prefetch(new_entry, force=wants_prefetch(request))
 
-        return Response({
-            "message": "New version created",
-            "version": new_version,
-            "steps": new_steps,
-            "progress": new_progress
-        })
+        return Response(regenerate_payload(new_entry))
 
 
 
 # ============================================================
 # 9) UPDATE PROGRESS
 # ============================================================
+def roadmap_steps_or_404(request, pk):
+    """Step names of a live roadmap, without loading the rest of the row."""
+    roadmap = (
+        CareerRoadmap.objects
+        .filter(pk=pk, user=request.user, is_deleted=False)
+        .only(*CareerRoadmap.STORAGE_FIELDS)
+        .first()
+    )
+    if roadmap is None:
+        raise Http404
+    return roadmap.roadmap
+
+
+def progress_write(pk, changes, steps):
+    try:
+        progress = apply_progress(pk, changes, steps)
+    except ProgressError as e:
+        body = {"error": str(e)}
+        if e.step is not None:
+            body["step"] = e.step
+        return Response(body, status=400)
+    except ProgressConflict as e:
+        return Response({"error": str(e)}, status=409)
+
+    return Response({
+        "message": "Progress updated",
+        "progress": progress
+    })
+
+
 class UpdateProgressView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        roadmap = get_object_or_404(
-            CareerRoadmap, pk=pk, user=request.user, is_deleted=False
-        )
+        steps = roadmap_steps_or_404(request, pk)
 
         step = request.data.get("step")
         status = request.data.get("status")
 
-        if step not in roadmap.roadmap:
-            return Response({"error": "Invalid step"}, status=400)
+        return progress_write(pk, {step: status}, steps)
 
-        if status not in ["not_started", "in_progress", "completed", "skipped"]:
-            return Response({"error": "Invalid status"}, status=400)
 
-        roadmap.progress[step] = status
-        roadmap.save()
+class BatchProgressView(APIView):
+    """POST {"progress": {"Step 1": "completed", "Step 2": "in_progress"}}: one write."""
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            "message": "Progress updated",
-            "progress": roadmap.progress
-        })
+    def post(self, request, pk):
+        steps = roadmap_steps_or_404(request, pk)
+        return progress_write(pk, request.data.get("progress"), steps)
 
 
 
 # ============================================================
 # 10) PROGRESS SUMMARY
 # ============================================================
+COUNTER_FIELDS = ("progress_total", "progress_completed", "progress_in_progress", "progress_skipped")
+
+
+def progress_summary(row):
+    """Summary from the denormalized counters: no walk over `progress`."""
+    total = row["progress_total"]
+    completed = row["progress_completed"]
+    in_progress = row["progress_in_progress"]
+    skipped = row["progress_skipped"]
+
+    return {
+        "total_steps": total,
+        "completed": completed,
+        "in_progress": in_progress,
+        "skipped": skipped,
+        "not_started": total - completed - in_progress - skipped,
+        "completion_percentage": round((completed / total * 100), 2) if total > 0 else 0,
+    }
+
+
 class ProgressSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        roadmap = get_object_or_404(
-            CareerRoadmap, pk=pk, user=request.user, is_deleted=False
+        row = (
+            CareerRoadmap.objects
+            .filter(pk=pk, user=request.user, is_deleted=False)
+            .values("progress", *COUNTER_FIELDS)
+            .first()
         )
+        if row is None:
+            raise Http404
 
-        progress = roadmap.progress
-        total = len(progress)
+        return Response({**progress_summary(row), "progress": row["progress"]})
 
-        completed = sum(1 for s in progress.values() if s == "completed")
-        in_progress = sum(1 for s in progress.values() if s == "in_progress")
-        skipped = sum(1 for s in progress.values() if s == "skipped")
-        not_started = total - completed - in_progress - skipped
 
-        percent = round((completed / total * 100), 2) if total > 0 else 0
+class ProgressDashboardView(APIView):
+    """
+    Summaries for every live roadmap of the user (one query) and an
+    overall summary of the latest version per career, summed in the
+    database (one query).
+    """
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            "total_steps": total,
-            "completed": completed,
-            "in_progress": in_progress,
-            "skipped": skipped,
-            "not_started": not_started,
-            "completion_percentage": percent,
-            "progress": progress
-        })
+    def get(self, request):
+        rows = (
+            CareerRoadmap.objects
+            .filter(user=request.user, is_deleted=False)
+            .order_by("-created_at", "-id")
+            .values("id", "career_name", "version", "created_at", *COUNTER_FIELDS)
+        )
+
+        roadmaps = [{
+            "id": row["id"],
+            "career_name": row["career_name"],
+            "version": row["version"],
+            "created_at": row["created_at"],
+            **progress_summary(row),
+        } for row in rows]
+
+        # Older versions of a career would count its progress again
+        totals = (
+            LatestRoadmapVersion.objects
+            .filter(user=request.user)
+            .aggregate(**{field: Sum(f"roadmap__{field}") for field in COUNTER_FIELDS})
+        )
+        totals = {field: value or 0 for field, value in totals.items()}
+
+        return Response({"overall": progress_summary(totals), "roadmaps": roadmaps})
 
 
 
 # ============================================================
 # 11) SKILL GAP ANALYSIS
 # ============================================================
-class SkillGapView(APIView):
+# Views 11-13 are served from the per-version artifact store
+# (artifacts.py); ?refresh=true regenerates.
+class SkillGapView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
-        roadmap = get_object_or_404(CareerRoadmap, pk=pk, user=request.user)
-
-        prompt = f"""
-        Given this roadmap:
-        {json.dumps(roadmap.roadmap)}
+    async def get(self, request, pk):
+        roadmap = await aget_roadmap_or_404(pk=pk, user=request.user)
+        refresh = request.GET.get("refresh") == "true"
 
-        And user skills (preferences):
-        {json.dumps(roadmap.preferences)}
-
-        Return JSON:
-        {{
-            "missing_skills": [],
-            "priority_skills": [],
-            "suggestions": ""
-        }}
-        """
-
-        return Response(generate_ai_response(prompt))
+        return Response(await aget_artifact(roadmap, "skill_gap", refresh=refresh))
 
 
 
 # ============================================================
 # 12) WEEKLY PLAN GENERATION
 # ============================================================
-class WeeklyPlanView(APIView):
+class WeeklyPlanView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
-        roadmap = get_object_or_404(CareerRoadmap, pk=pk, user=request.user)
-
-        prompt = f"""
-        Convert this roadmap:
-        {json.dumps(roadmap.roadmap)}
-
-        Into a 6-week learning plan.
-
-        Return JSON:
-        {{
-            "week_1": [],
-            "week_2": [],
-            "week_3": [],
-            "week_4": [],
-            "week_5": [],
-            "week_6": []
-        }}
-        """
+    async def get(self, request, pk):
+        roadmap = await aget_roadmap_or_404(pk=pk, user=request.user)
+        refresh = request.GET.get("refresh") == "true"
 
-        return Response(generate_ai_response(prompt))
+        return Response(await aget_artifact(roadmap, "weekly_plan", refresh=refresh))
 
 
 
 # ============================================================
 # 13) STEP EXPLAINER
 # ============================================================
-class ExplainStepView(APIView):
+class ExplainStepView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def post(self, request, pk):
+    async def post(self, request, pk):
         step = request.data.get("step")
-        roadmap = get_object_or_404(CareerRoadmap, pk=pk, user=request.user)
+        roadmap = await aget_roadmap_or_404(pk=pk, user=request.user)
+        refresh = request.GET.get("refresh") == "true"
 
         if step not in roadmap.roadmap:
             return Response({"error": "Invalid step"}, status=400)
 
-        step_text = roadmap.roadmap.get(step)
+        return Response(await aget_artifact(roadmap, "explain_step", {"step": step}, refresh=refresh))
 
-        prompt = f"""
-        Explain this step in detail:
-        {step}: {step_text}
 
-        Provide examples, resources.
-        JSON only:
-        {{
-            "explanation": "",
-            "resources": [],
-            "examples": []
-        }}
-        """
 
-        return Response(generate_ai_response(prompt))
+class ExplainStepsView(AsyncAPIView):
+    """
+    POST {"steps": ["Step 1", "Step 3"] | "all", "mode": "packed" | "parallel"}
+    -> {"explanations": {step: {...}}}
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request, pk):
+        roadmap = await aget_roadmap_or_404(pk=pk, user=request.user)
+        refresh = request.GET.get("refresh") == "true"
+
+        steps = request.data.get("steps", "all")
+        if steps == "all":
+            steps = list(roadmap.roadmap)
+        if not isinstance(steps, list) or not steps:
+            return Response({"error": "steps must be a list of step names or \"all\""}, status=400)
+
+        invalid = [step for step in steps if step not in roadmap.roadmap]
+        if invalid:
+            return Response({"error": "Invalid step", "steps": invalid}, status=400)
+
+        mode = request.data.get("mode")
+        if mode is not None and mode not in EXPLAIN_MODES:
+            return Response({"error": "Invalid mode"}, status=400)
+
+        steps = list(dict.fromkeys(steps))
+        explanations = await aexplain_steps(roadmap, steps, mode=mode, refresh=refresh)
+
+        return Response({"explanations": explanations})
 
 
 
 # ============================================================
 # 14) MOCK INTERVIEW QUESTIONS
 # ============================================================
-class MockInterviewView(APIView):
+class MockInterviewView(AsyncAPIView):
+    """Random sample from the shared per-career question bank (question_bank.py)."""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, pk):
+        roadmap = await aget_object_or_404(CareerRoadmap, pk=pk, user=request.user)
+
+        try:
+            count = min(max(int(request.GET.get("count", 0)), 0), 25) or None
+        except ValueError:
+            count = None
+
+        return Response({"questions": await asample_questions(roadmap.career_name, count)})
+
+
+
+# ============================================================
+# 15) VERSION LINEAGE
+# ============================================================
+class RoadmapLineageView(APIView):
+    """GET roadmap/<pk>/lineage/?include=roadmap,deleted: ancestors + descendant tree."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        roadmap = get_object_or_404(CareerRoadmap, pk=pk, user=request.user)
+        include = request.GET.get("include", "").split(",")
 
-        prompt = f"""
-        Generate 10 mock interview questions for:
-        {roadmap.career_name}
+        lineage = version_lineage(
+            pk, request.user,
+            include_roadmap="roadmap" in include,
+            include_deleted="deleted" in include,
+        )
+        if lineage is None:
+            raise Http404
 
-        JSON:
-        {{
-            "questions": []
-        }}
-        """
+        return Response(lineage)
+
+
+
+# ============================================================
+# 16) INSIGHT BUNDLE (skill gap + weekly plan + mock interview)
+# ============================================================
+INSIGHTS = {
+    "skill_gap": lambda roadmap, refresh: aget_artifact(roadmap, "skill_gap", refresh=refresh),
+    "weekly_plan": lambda roadmap, refresh: aget_artifact(roadmap, "weekly_plan", refresh=refresh),
+    "mock_interview": lambda roadmap, refresh: amock_interview(roadmap.career_name),
+}
+
+
+async def amock_interview(career_name):
+    return {"questions": await asample_questions(career_name)}
+
+
+class RoadmapInsightsView(AsyncAPIView):
+    """
+    GET roadmap/<pk>/insights/?include=skill_gap,weekly_plan,mock_interview
+
+    Runs the selected insights concurrently, so the response takes about
+    as long as the slowest one. A failed insight is reported under
+    "errors" and doesn't fail the others.
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, pk):
+        include = [name for name in request.GET.get("include", "").split(",") if name] or list(INSIGHTS)
+        unknown = [name for name in include if name not in INSIGHTS]
+        if unknown:
+            return Response({"error": f"Unknown insights: {', '.join(unknown)}"}, status=400)
+
+        roadmap = await aget_roadmap_or_404(pk=pk, user=request.user, is_deleted=False)
+        refresh = request.GET.get("refresh") == "true"
+
+        include = list(dict.fromkeys(include))
+        results = await asyncio.gather(
+            *(INSIGHTS[name](roadmap, refresh) for name in include),
+            return_exceptions=True,
+        )
+
+        insights, errors = {}, {}
+        for name, result in zip(include, results):
+            if isinstance(result, Exception):
+                print(f"Insight {name} error:", result)
+                errors[name] = "AI generation failed"
+            elif isinstance(result, dict) and "error" in result:
+                errors[name] = result["error"]
+            else:
+                insights[name] = result
+
+        return Response({"insights": insights, "errors": errors})
+
+
+
+# ============================================================
+# 17) GENERATION JOBS (status + result polling)
+# ============================================================
+class JobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(GenerationJob.objects.defer("result"), pk=job_id, user=request.user)
+        return Response(job_body(job))
+
+
+class JobResultView(APIView):
+    """200 with the endpoint's usual body once done, 202 while pending, 502 if it failed."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(GenerationJob, pk=job_id, user=request.user)
 
-        return Response(generate_ai_response(prompt))
+        if job.status == GenerationJob.SUCCEEDED:
+            return Response(job.result)
+        if job.status == GenerationJob.FAILED:
+            return Response({**job_body(job), "error": job.error}, status=502)
+        return Response(job_body(job), status=202)